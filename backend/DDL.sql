@@ -63,9 +63,46 @@ CREATE TABLE IF NOT EXISTS content_image (
   sort_order int NOT NULL DEFAULT 0,
   width integer NOT NULL DEFAULT 0,    -- NOT NULL ve DEFAULT 0 eklendi
   height integer NOT NULL DEFAULT 0,   -- NOT NULL ve DEFAULT 0 eklendi
+  placeholder text NOT NULL DEFAULT '',     -- LQIP data URI (upload'da hesaplanır)
+  dominant_color text NOT NULL DEFAULT '',  -- "#rrggbb"
   created_at timestamptz NOT NULL DEFAULT now(),
   updated_at timestamptz NOT NULL DEFAULT now(),
-  CONSTRAINT content_image_url_ck CHECK (btrim(url) <> '' AND url ~ '^(https?://|/|s3://)')
+  CONSTRAINT content_image_url_ck CHECK (btrim(url) <> '' AND url ~ '^(https?://|/|s3://)'),
+  CONSTRAINT uq_content_image_sort UNIQUE (content_id, sort_order) DEFERRABLE INITIALLY IMMEDIATE
+);
+
+-- Sunucu tarafı markdown render önbelleği (revision = içerik + görsellerin özeti; mevcut içerikler
+-- render.backfill işiyle doldurulur)
+CREATE TABLE IF NOT EXISTS content_render (
+  content_id uuid PRIMARY KEY REFERENCES content(id) ON DELETE CASCADE,
+  revision text NOT NULL,
+  html text NOT NULL,
+  rendered_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Arka plan iş kuyruğu (app/core/jobs.py; işçiler FOR UPDATE SKIP LOCKED ile iş alır)
+CREATE TABLE IF NOT EXISTS job (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  kind text NOT NULL,
+  payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+  status text NOT NULL DEFAULT 'queued' CHECK (status IN ('queued','running','done','failed')),
+  attempts int NOT NULL DEFAULT 0,
+  max_attempts int NOT NULL DEFAULT 3,
+  run_after timestamptz NOT NULL DEFAULT now(),
+  locked_by text,
+  locked_at timestamptz,
+  result jsonb,
+  error text,
+  finished_at timestamptz,
+  created_at timestamptz NOT NULL DEFAULT now(),
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Silinen / URL'si değişen görsellerin dosyaları; uploads GC grace süresinden sonra siler
+-- (app/core/uploads_gc.py). Trigger ile yazıldığı için kaskad silmeler de aynı transaction'da kayda geçer.
+CREATE TABLE IF NOT EXISTS upload_tombstone (
+  url text PRIMARY KEY,
+  deleted_at timestamptz NOT NULL DEFAULT now()
 );
 
 -- 3) HELPERS / FUNCTIONS
@@ -94,102 +131,185 @@ BEGIN
   RETURN NEW;
 END;$$;
 
+-- Slug tahsisi döngüsüz: önce taban slug için tek index probe; doluysa aynı kapsamdaki
+-- "taban-N" kardeşlerinin en büyük N'i (slug_base, slug_suffix DESC) expression index'inden
+-- tek satır okunarak N + 1 verilir. Kapsamdaki kardeş sayısından bağımsızdır: aynı başlıklı
+-- toplu eklemeler O(n log n). Eşzamanlı iki ekleme aynı slug'ı seçerse unique index hatası döner.
+
+-- "taban-N" -> "taban" (N en fazla 9 hane); sonek yoksa slug'ın kendisi
+CREATE OR REPLACE FUNCTION slug_base(slug text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT regexp_replace(slug, '-[0-9]{1,9}$', '')
+$$;
+
+-- "taban-N" -> N; soneksiz slug 1 sayılır (ilk kopya "-2" alır)
+CREATE OR REPLACE FUNCTION slug_suffix(slug text)
+RETURNS int
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT COALESCE(substring(slug from '-([0-9]{1,9})$')::int, 1)
+$$;
+
 CREATE OR REPLACE FUNCTION set_category_slug()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
-DECLARE base text; s text; i int := 2;
+DECLARE base text; n int;
 BEGIN
+  IF TG_OP = 'UPDATE' AND NEW.name IS NOT DISTINCT FROM OLD.name THEN
+    NEW.slug := OLD.slug;  -- isim değişmediyse URL sabit kalır
+    RETURN NEW;
+  END IF;
+
   base := normalize_slug(NEW.name);
-  s := base;
-  WHILE EXISTS (SELECT 1 FROM category c WHERE c.slug = s AND c.id <> COALESCE(NEW.id, '00000000-0000-0000-0000-000000000000'::uuid)) LOOP
-    s := base || '-' || i; i := i + 1;
-  END LOOP;
-  NEW.slug := s;
+  NEW.slug := base;
+  IF EXISTS (SELECT 1 FROM category c WHERE c.slug = base AND c.id <> NEW.id) THEN
+    SELECT slug_suffix(c.slug) INTO n FROM category c
+    WHERE slug_base(c.slug) = base AND c.id <> NEW.id
+    ORDER BY slug_suffix(c.slug) DESC LIMIT 1;
+    NEW.slug := base || '-' || (COALESCE(n, 1) + 1);
+  END IF;
   RETURN NEW;
 END;$$;
 
 CREATE OR REPLACE FUNCTION set_heading_slug()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
-DECLARE base text; s text; i int := 2;
+DECLARE base text; n int;
 BEGIN
-  base := normalize_slug(NEW.title);
-  s := base;
+  IF TG_OP = 'UPDATE' AND NEW.title IS NOT DISTINCT FROM OLD.title THEN
+    NEW.slug := OLD.slug;
+    RETURN NEW;
+  END IF;
 
+  base := normalize_slug(NEW.title);
+  NEW.slug := base;
   IF NEW.level = 1 THEN
-    WHILE EXISTS (
+    IF EXISTS (
       SELECT 1 FROM heading h
-      WHERE h.level = 1 AND h.category_id = NEW.category_id AND h.slug = s
-            AND h.id <> COALESCE(NEW.id, '00000000-0000-0000-0000-000000000000'::uuid)
-    ) LOOP
-      s := base || '-' || i; i := i + 1;
-    END LOOP;
+      WHERE h.level = 1 AND h.category_id = NEW.category_id AND h.slug = base AND h.id <> NEW.id
+    ) THEN
+      SELECT slug_suffix(h.slug) INTO n FROM heading h
+      WHERE h.level = 1 AND h.category_id = NEW.category_id
+            AND slug_base(h.slug) = base AND h.id <> NEW.id
+      ORDER BY slug_suffix(h.slug) DESC LIMIT 1;
+      NEW.slug := base || '-' || (COALESCE(n, 1) + 1);
+    END IF;
 
   ELSE
-    WHILE EXISTS (
+    IF EXISTS (
       SELECT 1 FROM heading h
-      WHERE h.level = 2 AND h.parent_heading_id = NEW.parent_heading_id AND h.slug = s
-            AND h.id <> COALESCE(NEW.id, '00000000-0000-0000-0000-000000000000'::uuid)
-    ) LOOP
-      s := base || '-' || i; i := i + 1;
-    END LOOP;
+      WHERE h.level = 2 AND h.parent_heading_id = NEW.parent_heading_id AND h.slug = base AND h.id <> NEW.id
+    ) THEN
+      SELECT slug_suffix(h.slug) INTO n FROM heading h
+      WHERE h.level = 2 AND h.parent_heading_id = NEW.parent_heading_id
+            AND slug_base(h.slug) = base AND h.id <> NEW.id
+      ORDER BY slug_suffix(h.slug) DESC LIMIT 1;
+      NEW.slug := base || '-' || (COALESCE(n, 1) + 1);
+    END IF;
   END IF;
-
-  NEW.slug := s;
   RETURN NEW;
 END;$$;
 
-CREATE OR REPLACE FUNCTION prevent_l2_when_parent_has_content()
+-- Heading bütünlüğü tek trigger'da: level değişmez, L2'nin ebeveyni L1 olmalı ve
+-- içerik barındırmamalı. Ebeveyn satırı tek sorguda okunur; parent/level'a dokunmayan
+-- UPDATE'ler hiçbir sorgu çalıştırmadan döner.
+CREATE OR REPLACE FUNCTION heading_integrity()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
-DECLARE has_content boolean;
+DECLARE p_level smallint; p_has_content boolean;
 BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    IF NEW.level IS DISTINCT FROM OLD.level THEN
+      RAISE EXCEPTION 'Heading level sonradan değiştirilemez (immutable).';
+    END IF;
+    IF NEW.parent_heading_id IS NOT DISTINCT FROM OLD.parent_heading_id THEN
+      RETURN NEW;
+    END IF;
+  END IF;
+
   IF NEW.level = 2 THEN
-    SELECT EXISTS (SELECT 1 FROM content c WHERE c.heading_id = NEW.parent_heading_id)
-      INTO has_content;
-    IF has_content THEN
+    SELECT p.level, EXISTS (SELECT 1 FROM content c WHERE c.heading_id = p.id)
+      INTO p_level, p_has_content
+      FROM heading p WHERE p.id = NEW.parent_heading_id;
+    IF p_level IS DISTINCT FROM 1 THEN
+      RAISE EXCEPTION 'L2 heading''in ebeveyni level=1 olmalı.';
+    END IF;
+    IF p_has_content THEN
       RAISE EXCEPTION 'Ana başlık (L1) içerik barındırıyorken alt başlık (L2) oluşturulamaz/güncellenemez.';
     END IF;
   END IF;
   RETURN NEW;
 END;$$;
 
-CREATE OR REPLACE FUNCTION heading_parent_guard()
+CREATE OR REPLACE FUNCTION enforce_content_vs_children()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
-DECLARE p_level smallint;
 BEGIN
-  IF NEW.level = 2 THEN
-    SELECT level INTO p_level FROM heading WHERE id = NEW.parent_heading_id;
-    IF p_level IS DISTINCT FROM 1 THEN
-      RAISE EXCEPTION 'L2 heading''in ebeveyni level=1 olmalı.';
-    END IF;
+  IF TG_OP = 'UPDATE' AND NEW.heading_id = OLD.heading_id THEN
+    RETURN NEW;
+  END IF;
+  -- Alt başlığı olabilen tek seviye L1 (heading_integrity); idx_heading_parent_l2 ile tek probe
+  IF EXISTS (SELECT 1 FROM heading h WHERE h.parent_heading_id = NEW.heading_id AND h.level = 2) THEN
+    RAISE EXCEPTION 'L1 heading alt başlık içerirken kendisine içerik eklenemez.';
   END IF;
   RETURN NEW;
 END;$$;
 
-CREATE OR REPLACE FUNCTION prevent_level_update()
+-- Değişiklik akışı: uygulama LISTEN docs_changes ile önbellekleri geçersiz kılar (app/core/changes.py;
+-- kanal adı orada CHANNEL sabitiyle aynı olmalı).
+-- Statement başına tek bildirim (geçiş tablosu: new_rows / old_rows): kaskad silme, reorder ve
+-- toplu ekleme satır sayısı kadar NOTIFY üretmez. Satırlar ebeveyne göre gruplanır:
+--   {"entity", "op", "groups": [[parent_entity, parent_id, [id, ...]], ...]}
+-- NOTIFY 8000 bayt sınırını aşacaksa yalnızca "truncated": true gider; alıcı her şeyi boşaltır.
+CREATE OR REPLACE FUNCTION notify_change()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
+DECLARE parent text; groups json; payload text;
 BEGIN
-  IF TG_OP = 'UPDATE' AND NEW.level IS DISTINCT FROM OLD.level THEN
-    RAISE EXCEPTION 'Heading level sonradan değiştirilemez (immutable).';
+  parent := CASE TG_TABLE_NAME
+    WHEN 'heading' THEN 'CASE WHEN level = 1 THEN ''category'' ELSE ''heading'' END, '
+                        'CASE WHEN level = 1 THEN category_id ELSE parent_heading_id END'
+    WHEN 'content' THEN '''heading'', heading_id'
+    WHEN 'content_image' THEN '''content'', content_id'
+    ELSE 'NULL::text, NULL::uuid'
+  END;
+  EXECUTE format(
+    'SELECT json_agg(json_build_array(pe, pid, ids)) FROM ('
+    '  SELECT pe, pid, json_agg(id) AS ids FROM (SELECT %s, id FROM %I) AS r(pe, pid, id)'
+    '  GROUP BY pe, pid) AS g',
+    parent, CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END
+  ) INTO groups;
+  IF groups IS NULL THEN
+    RETURN NULL;  -- hiçbir satır etkilenmedi
   END IF;
-  RETURN NEW;
+
+  payload := json_build_object('entity', TG_TABLE_NAME, 'op', lower(TG_OP), 'groups', groups)::text;
+  IF octet_length(payload) > 7900 THEN
+    payload := json_build_object('entity', TG_TABLE_NAME, 'op', lower(TG_OP), 'truncated', true)::text;
+  END IF;
+  PERFORM pg_notify('docs_changes', payload);
+  RETURN NULL;
 END;$$;
 
-CREATE OR REPLACE FUNCTION enforce_content_vs_children()
+-- content_image.url -> uploads/ altındaki dosya adı (yerel upload değilse NULL). Aynı dosya
+-- /static/x, /api/static/x ve http(s)://<host>/(api/)static/x olarak kaydedilebilir; "dosya hâlâ
+-- kullanılıyor mu" kontrolleri URL'yi değil bunu karşılaştırır. app.core.storage.upload_name ile aynı
+-- kural (varsayılan STATIC_MOUNT_PATH=/static).
+CREATE OR REPLACE FUNCTION upload_name(url text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT substring(url from '^(?:https?://[^/?#]*)?(?:/api)?/static/([^/?#.][^/?#]*)(?:[?#].*)?$')
+$$;
+
+CREATE OR REPLACE FUNCTION tombstone_upload()
 RETURNS trigger
 LANGUAGE plpgsql AS $$
-DECLARE child_count int;
 BEGIN
-  IF (SELECT level FROM heading WHERE id = NEW.heading_id) = 1 THEN
-    SELECT COUNT(*) INTO child_count FROM heading WHERE parent_heading_id = NEW.heading_id;
-    IF child_count > 0 THEN
-      RAISE EXCEPTION 'L1 heading alt başlık içerirken kendisine içerik eklenemez.';
-    END IF;
+  IF TG_OP = 'DELETE' OR NEW.url IS DISTINCT FROM OLD.url THEN
+    INSERT INTO upload_tombstone (url) VALUES (OLD.url)
+    ON CONFLICT (url) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
   END IF;
-  RETURN NEW;
+  RETURN NULL;
 END;$$;
 
 CREATE OR REPLACE FUNCTION search_all_trgm(q text, limit_count int DEFAULT 50)
@@ -238,6 +358,10 @@ CREATE TRIGGER trg_content_image_updated
 BEFORE UPDATE ON content_image
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
 
+CREATE TRIGGER trg_job_updated
+BEFORE UPDATE ON job
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
 CREATE TRIGGER trg_set_category_slug
 BEFORE INSERT OR UPDATE OF name, slug ON category
 FOR EACH ROW EXECUTE FUNCTION set_category_slug();
@@ -250,17 +374,69 @@ CREATE TRIGGER trg_content_parent_rule
 BEFORE INSERT OR UPDATE OF heading_id ON content
 FOR EACH ROW EXECUTE FUNCTION enforce_content_vs_children();
 
-CREATE TRIGGER trg_heading_parent_guard
-BEFORE INSERT OR UPDATE OF parent_heading_id, level ON heading
-FOR EACH ROW EXECUTE FUNCTION heading_parent_guard();
+-- Eski kurulumlar: üç ayrı guard trigger'ı heading_integrity ile değiştirildi
+DROP TRIGGER IF EXISTS trg_heading_parent_guard ON heading;
+DROP TRIGGER IF EXISTS trg_prevent_l2_when_parent_has_content ON heading;
+DROP TRIGGER IF EXISTS trg_prevent_level_update ON heading;
+DROP FUNCTION IF EXISTS heading_parent_guard();
+DROP FUNCTION IF EXISTS prevent_l2_when_parent_has_content();
+DROP FUNCTION IF EXISTS prevent_level_update();
 
-CREATE TRIGGER trg_prevent_l2_when_parent_has_content
+CREATE TRIGGER trg_heading_integrity
 BEFORE INSERT OR UPDATE OF parent_heading_id, level ON heading
-FOR EACH ROW EXECUTE FUNCTION prevent_l2_when_parent_has_content();
+FOR EACH ROW EXECUTE FUNCTION heading_integrity();
+
+CREATE TRIGGER trg_category_notify_ins
+AFTER INSERT ON category REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_category_notify_upd
+AFTER UPDATE ON category REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_category_notify_del
+AFTER DELETE ON category REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_heading_notify_ins
+AFTER INSERT ON heading REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_heading_notify_upd
+AFTER UPDATE ON heading REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
 
-CREATE TRIGGER trg_prevent_level_update
-BEFORE UPDATE OF level ON heading
-FOR EACH ROW EXECUTE FUNCTION prevent_level_update();
+CREATE TRIGGER trg_heading_notify_del
+AFTER DELETE ON heading REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_notify_ins
+AFTER INSERT ON content REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_notify_upd
+AFTER UPDATE ON content REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_notify_del
+AFTER DELETE ON content REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_image_notify_ins
+AFTER INSERT ON content_image REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_image_notify_upd
+AFTER UPDATE ON content_image REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_image_notify_del
+AFTER DELETE ON content_image REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION notify_change();
+
+CREATE TRIGGER trg_content_image_tombstone
+AFTER DELETE OR UPDATE OF url ON content_image
+FOR EACH ROW EXECUTE FUNCTION tombstone_upload();
 
 -- 5) UNIQUE & PERFORMANCE INDEXES
 
@@ -273,6 +449,16 @@ CREATE UNIQUE INDEX IF NOT EXISTS uq_heading_level1_slug
 CREATE UNIQUE INDEX IF NOT EXISTS uq_heading_level2_slug
   ON heading(parent_heading_id, slug) WHERE level = 2;
 
+-- Slug tahsisi: kapsamdaki "taban-N" kardeşlerinin en büyük N'i tek index satırından
+CREATE INDEX IF NOT EXISTS idx_category_slug_suffix
+  ON category(slug_base(slug), slug_suffix(slug) DESC);
+
+CREATE INDEX IF NOT EXISTS idx_heading_l1_slug_suffix
+  ON heading(category_id, slug_base(slug), slug_suffix(slug) DESC) WHERE level = 1;
+
+CREATE INDEX IF NOT EXISTS idx_heading_l2_slug_suffix
+  ON heading(parent_heading_id, slug_base(slug), slug_suffix(slug) DESC) WHERE level = 2;
+
 CREATE INDEX IF NOT EXISTS idx_heading_category_l1
   ON heading(category_id) WHERE level = 1;
 
@@ -306,5 +492,30 @@ CREATE INDEX IF NOT EXISTS idx_content_desc_trgm
 CREATE INDEX IF NOT EXISTS idx_content_image_order
   ON content_image(content_id, sort_order, id);
 
-CREATE UNIQUE INDEX IF NOT EXISTS uq_content_image_sort
-  ON content_image(content_id, sort_order);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_upload_tombstone_deleted
+  ON upload_tombstone(deleted_at);
+
+CREATE INDEX IF NOT EXISTS idx_content_image_upload_name
+  ON content_image(upload_name(url));
+
+-- Yalnızca bekleyen işler: claim sorgusu küçük bir index'ten okur
+CREATE INDEX IF NOT EXISTS idx_job_queued
+  ON job(run_after, created_at) WHERE status = 'queued';
+
+CREATE INDEX IF NOT EXISTS idx_job_created
+  ON job(created_at DESC);
+
+-- uq_content_image_sort artık tablo kısıtı (DEFERRABLE); eski kurulumlardaki index'i dönüştür
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_content_image_sort') THEN
+    DROP INDEX IF EXISTS uq_content_image_sort;
+    ALTER TABLE content_image
+      ADD CONSTRAINT uq_content_image_sort UNIQUE (content_id, sort_order)
+      DEFERRABLE INITIALLY IMMEDIATE;
+  END IF;
+END$$;
+
+-- Upload'da hesaplanan görsel placeholder'ı ve baskın renk (eski kurulumlar; mevcut satırlar images.backfill işiyle doldurulur)
+ALTER TABLE content_image ADD COLUMN IF NOT EXISTS placeholder text NOT NULL DEFAULT '';
+ALTER TABLE content_image ADD COLUMN IF NOT EXISTS dominant_color text NOT NULL DEFAULT '';
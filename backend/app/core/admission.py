@@ -0,0 +1,261 @@
+# app/core/admission.py
+"""Kabul kontrolü ve yük atma (router'lardan önce, saf ASGI).
+
+Ani trafik artışında istekler DB havuzunda zaman aşımına kadar birikmesin diye:
+  * Route sınıfı başına eşzamanlılık limiti + sınırlı bekleme kuyruğu: slot yoksa istek en
+    fazla ADMISSION_QUEUE_TIMEOUT bekler; kuyruk doluysa ya da süre dolarsa hızlı 503.
+  * İstemci (IP) başına token bucket: RATE_LIMIT_RPS / RATE_LIMIT_BURST aşılırsa 429.
+  * Gövde okunmadan Content-Length kontrolü: upload limiti aşılıyorsa 413; Content-Length
+    yoksa (chunked) akış sayılarak aynı limit uygulanır.
+Reddedilen yanıtlar `Retry-After` başlığı taşır.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import (
+    ADMISSION_ENABLED, ADMISSION_LIMITS, ADMISSION_QUEUE_TIMEOUT, MAX_UPLOAD_BYTES,
+    RATE_LIMIT_BURST, RATE_LIMIT_RPS, UPLOAD_BATCH_MAX_FILES,
+)
+from app.core.metrics import registry
+
+# multipart sınırları ve form alanları için pay
+MULTIPART_OVERHEAD = 64 * 1024
+# Gövdesi olmayan/küçük istekler için üst sınır (JSON gövdeler)
+MAX_BODY_BYTES = 1024 * 1024
+MAX_TRACKED_CLIENTS = 10_000
+
+# Uzun ömürlü (SSE) ya da DB'ye dokunmayan yollar sınırlanmaz
+_EXEMPT = ("/events", "/healthz", "/metrics")
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requests rejected before reaching a router", ("route_class", "reason"))
+ADMISSION_WAIT = registry.histogram(
+    "admission_wait_seconds", "Time spent waiting for a concurrency slot", ("route_class",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0))
+ADMISSION_ACTIVE = registry.gauge(
+    "admission_active", "Admitted requests in flight by route class", ("route_class",))
+ADMISSION_QUEUED = registry.gauge(
+    "admission_queued", "Requests waiting for a concurrency slot by route class", ("route_class",))
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, reason: str, detail: str, retry_after: Optional[float] = None):
+        self.status = status
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def route_class(scope) -> Optional[str]:
+    """Yol ve metoda göre limit sınıfı; None = sınırsız."""
+    path: str = scope["path"]
+    if path in _EXEMPT or path.startswith("/static/") or path.startswith("/api/static/"):
+        return None
+    if path.startswith("/admin"):
+        if path.startswith("/admin/content-images/upload"):
+            return "upload"  # tek istekli upload ve resumable oturum parçaları (PATCH)
+        return "search" if path == "/admin/search" else "admin"
+    return "search" if path == "/search" else "public"
+
+
+def parse_limits(raw: str) -> Dict[str, Tuple[int, int]]:
+    """"public=64:128,search=8:16" -> {"public": (64, 128), ...} (eşzamanlılık:kuyruk)."""
+    out: Dict[str, Tuple[int, int]] = {}
+    for part in raw.split(","):
+        if "=" not in part:
+            continue
+        name, spec = part.split("=", 1)
+        limit, _, queue = spec.partition(":")
+        out[name.strip()] = (int(limit), int(queue or 0))
+    return out
+
+
+class ConcurrencyLimiter:
+    """Sınırlı bekleme kuyruklu semafor: kuyruk doluysa beklemeden reddeder."""
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue = queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: "OrderedDict[asyncio.Future, None]" = OrderedDict()
+        self._ewma_hold = 0.1  # slot tutma süresi tahmini (Retry-After için)
+
+    def _retry_after(self) -> float:
+        return max(1.0, self._ewma_hold * (len(self._waiters) + 1) / max(1, self.limit))
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue:
+            raise Rejected(503, "queue_full", "Server busy, try again later", self._retry_after())
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[fut] = None
+        ADMISSION_QUEUED.inc(self.name)
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                self.release(0.0)  # tam zaman aşımında slot verilmişti: devret
+            raise Rejected(503, "queue_timeout", "Server busy, try again later", self._retry_after())
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release(0.0)
+            raise
+        finally:
+            self._waiters.pop(fut, None)
+            ADMISSION_QUEUED.dec(self.name)
+            ADMISSION_WAIT.observe(time.perf_counter() - t0, self.name)
+
+    def release(self, held: float) -> None:
+        if held:
+            self._ewma_hold = 0.9 * self._ewma_hold + 0.1 * held
+        # Slot'u doğrudan sıradaki bekleyene devret (active sayısı değişmez)
+        while self._waiters:
+            fut, _ = self._waiters.popitem(last=False)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+
+class TokenBuckets:
+    """İstemci başına token bucket; en eski istemciler LRU ile unutulur."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str) -> Optional[float]:
+        """Token varsa None, yoksa bir sonraki token'a kalan saniye."""
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1.0:
+            tokens -= 1.0
+            wait = None
+        else:
+            wait = (1.0 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for k, v in scope.get("headers", ()):
+        if k == name:
+            return v
+    return None
+
+
+def _client_key(scope) -> str:
+    # Proxy arkasında client, FORWARDED_ALLOW_IPS'teki proxy'lerin X-Forwarded-For'undan gelen gerçek IP'dir
+    client = scope.get("client")
+    return client[0] if client else "-"
+
+
+def body_limit(cls: str, path: str = "") -> int:
+    if cls != "upload":
+        return MAX_BODY_BYTES
+    files = UPLOAD_BATCH_MAX_FILES if path.endswith("/upload-batch") else 1
+    return files * (MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD)
+
+
+async def _reject(send, exc: Rejected) -> None:
+    headers = [(b"content-type", b"application/json")]
+    if exc.retry_after is not None:
+        headers.append((b"retry-after", str(max(1, math.ceil(exc.retry_after))).encode()))
+    if exc.status == 413:
+        headers.append((b"connection", b"close"))
+    await send({"type": "http.response.start", "status": exc.status, "headers": headers})
+    await send({"type": "http.response.body", "body": json.dumps({"detail": exc.detail}).encode()})
+
+
+class AdmissionMiddleware:
+    def __init__(self, app, enabled: bool = ADMISSION_ENABLED, limits: str = ADMISSION_LIMITS,
+                 queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+                 rate: float = RATE_LIMIT_RPS, burst: float = RATE_LIMIT_BURST):
+        self.app = app
+        self.enabled = enabled
+        self.limiters = {
+            name: ConcurrencyLimiter(name, limit, queue, queue_timeout)
+            for name, (limit, queue) in parse_limits(limits).items()
+        }
+        self.buckets = TokenBuckets(rate, burst) if rate > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        cls = route_class(scope)
+        if cls is None:
+            return await self.app(scope, receive, send)
+
+        limit = body_limit(cls, scope["path"])
+        started = False
+        overflow = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if overflow:
+                # Gövde limiti akış sırasında aşıldı: içerinin (400/500) yanıtı yerine 413
+                if message["type"] == "http.response.start" and not started:
+                    started = True
+                    await _reject(send, Rejected(413, "too_large", "Request body too large"))
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        received = 0
+
+        async def receive_wrapper():
+            nonlocal received, overflow
+            if overflow:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Content-Length'siz (chunked) gövde: okumayı keser, yanıtı send_wrapper değiştirir
+                    overflow = True
+                    ADMISSION_REJECTED.inc(cls, "too_large")
+                    return {"type": "http.disconnect"}
+            return message
+
+        limiter = self.limiters.get(cls)
+        acquired = False
+        t0 = 0.0
+        try:
+            length = _header(scope, b"content-length")
+            if length is not None and length.isdigit() and int(length) > limit:
+                raise Rejected(413, "too_large", "Request body too large")
+            if self.buckets is not None:
+                wait = self.buckets.take(_client_key(scope))
+                if wait is not None:
+                    raise Rejected(429, "rate_limited", "Too many requests", wait)
+            if limiter is not None:
+                await limiter.acquire()
+                acquired = True
+                ADMISSION_ACTIVE.inc(cls)
+                t0 = time.perf_counter()
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Rejected as exc:
+            ADMISSION_REJECTED.inc(cls, exc.reason)
+            if started:
+                raise
+            await _reject(send, exc)
+        finally:
+            if acquired:
+                ADMISSION_ACTIVE.dec(cls)
+                limiter.release(time.perf_counter() - t0)
@@ -0,0 +1,70 @@
+# app/core/cancellation.py
+"""İstemci bağlantıyı kesince GET işleyicisini iptal etme (saf ASGI).
+
+Starlette GET işleyicisi çalışırken istemcinin gidip gitmediğine bakmaz: ağır bir arama
+ya da menü sorgusu tarayıcı kapandıktan sonra da Postgres'te sürer. Bu middleware gövdesiz
+isteklerde ilk `http.request` mesajını işleyiciye verir, ardından `receive`'i kendisi
+dinler; `http.disconnect` gelirse işleyici task'ını iptal eder. asyncpg iptal edilen
+sorgu için sunucuya cancel isteği gönderir; app.db.session bunu
+`db_query_cancellations_total` ile sayar. Single-flight ile birleşmiş okumalar yalnızca
+son bekleyen de ayrılınca iptal olur (app.core.singleflight).
+"""
+import asyncio
+
+from app.core.admission import route_class
+from app.core.config import CANCEL_ON_DISCONNECT
+from app.core.metrics import registry
+
+HTTP_CLIENT_DISCONNECTS = registry.counter(
+    "http_client_disconnects_total", "Requests cancelled because the client went away", ("route_class",))
+
+
+class CancelOnDisconnectMiddleware:
+    def __init__(self, app, enabled: bool = CANCEL_ON_DISCONNECT):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        cls = route_class(scope)
+        if cls is None:
+            # SSE kendi disconnect'ini yönetir; static/healthz/metrics DB'ye dokunmaz
+            return await self.app(scope, receive, send)
+
+        first = await receive()
+        if first["type"] == "http.disconnect":
+            HTTP_CLIENT_DISCONNECTS.inc(cls)
+            return
+        gone = asyncio.Event()
+        delivered = False
+
+        async def inner_receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return first
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        loop = asyncio.get_running_loop()
+        handler = loop.create_task(self.app(scope, inner_receive, send))
+        watcher = loop.create_task(receive())
+        try:
+            while True:
+                await asyncio.wait((handler, watcher), return_when=asyncio.FIRST_COMPLETED)
+                if handler.done():
+                    return handler.result()
+                if watcher.result()["type"] == "http.disconnect":
+                    break
+                watcher = loop.create_task(receive())  # beklenmeyen ek gövde parçası: dinlemeye devam
+            gone.set()
+            HTTP_CLIENT_DISCONNECTS.inc(cls)
+            handler.cancel()
+            await asyncio.wait((handler,))
+            if not handler.cancelled():
+                handler.exception()  # iptalden hemen önce bitmiş olabilir
+        finally:
+            for task in (handler, watcher):
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,178 @@
+# app/core/cdn.py
+"""CDN surrogate-key etiketleri ve hedefli purge.
+
+Public handler'lar yanıtı `tag_response` ile etiketler: `Surrogate-Key` başlığı
+(category:<id> heading:<id> content:<id> content_image:<id> ve menü/listeler için tree).
+CDN_SURROGATE_MAX_AGE > 0 ise `Surrogate-Control: max-age=..` ile edge'de saatlerce
+tutulur (Cache-Control'e, yani tarayıcıya dokunulmaz). Aynı etiketler paylaşılan yanıt
+önbelleğinde (app.core.sharedcache) de geçersiz kılma için kullanılır.
+
+Admin yazmaları (app.core.changes, yalnızca yerel yayınlar) etkilenen anahtarları kısa bir
+gecikmeyle toplayıp CDN_PURGE_URL'e göre seçilen istemciyle purge eder:
+    ""/noop://           hiçbir şey yapmaz
+    record://            purge'leri bellekte tutar (geliştirme/test)
+    fastly://SERVICE_ID  Fastly surrogate-key purge (CDN_PURGE_TOKEN = API token)
+    http(s)://...        webhook: POST {"keys": [...]} (CDN_PURGE_TOKEN varsa Bearer)
+"""
+import asyncio
+import logging
+from typing import Iterable, List, Optional, Set
+
+from app.core.config import CDN_PURGE_DELAY, CDN_PURGE_TOKEN, CDN_PURGE_URL, CDN_SURROGATE_MAX_AGE
+from app.core.metrics import registry
+
+log = logging.getLogger(__name__)
+
+SURROGATE_KEY_HEADER = b"surrogate-key"
+PURGE_BATCH = 256  # Fastly: istek başına en fazla 256 anahtar
+PURGE_ATTEMPTS = 3
+PURGE_RETRY_SECONDS = 30.0  # denemeleri tükenen anahtarlar bu kadar sonra yeniden kuyruğa
+PURGE_TIMEOUT = 10.0
+
+CDN_PURGED_KEYS = registry.counter("cdn_purged_keys_total", "Surrogate keys sent to the CDN purge API", ("result",))
+
+
+def tag_response(response, *tags: str) -> None:
+    """Handler yanıtını surrogate key'lerle işaretler (doğrudan çağrılarda response None)."""
+    if response is None:
+        return
+    response.headers["Surrogate-Key"] = " ".join(tags)
+    if CDN_SURROGATE_MAX_AGE > 0:
+        response.headers["Surrogate-Control"] = f"max-age={CDN_SURROGATE_MAX_AGE}"
+
+
+def response_tags(headers) -> List[str]:
+    return [t for k, v in headers if k == SURROGATE_KEY_HEADER for t in v.decode("latin-1").split()]
+
+
+def change_tags(change) -> Set[str]:
+    """app.core.changes olayından geçersiz kılınacak anahtarlar."""
+    tags = {f"{change.entity}:{change.id}"}
+    if change.parent_entity:
+        tags.add(f"{change.parent_entity}:{change.parent_id}")
+    if change.entity != "content_image":
+        tags.add("tree")  # menü/kategori/başlık listeleri görünürlüğe bağlı
+    return tags
+
+
+# ---- purge istemcileri ----
+class NoopPurgeClient:
+    async def purge(self, keys: List[str]) -> None:
+        pass
+
+
+class RecordingPurgeClient:
+    def __init__(self):
+        self.purged: List[List[str]] = []
+
+    async def purge(self, keys: List[str]) -> None:
+        self.purged.append(list(keys))
+
+
+class FastlyPurgeClient:
+    API = "https://api.fastly.com"
+
+    def __init__(self, service_id: str, token: str, soft: bool = True):
+        self.service_id = service_id
+        self.token = token
+        self.soft = soft  # soft purge: içerik "stale" işaretlenir, origin hatasında yine servis edilir
+
+    async def purge(self, keys: List[str]) -> None:
+        import httpx
+
+        headers = {"Fastly-Key": self.token, "Surrogate-Key": " ".join(keys), "Accept": "application/json"}
+        if self.soft:
+            headers["Fastly-Soft-Purge"] = "1"
+        async with httpx.AsyncClient(timeout=PURGE_TIMEOUT) as client:
+            r = await client.post(f"{self.API}/service/{self.service_id}/purge", headers=headers)
+            r.raise_for_status()
+
+
+class WebhookPurgeClient:
+    def __init__(self, url: str, token: str = ""):
+        self.url = url
+        self.token = token
+
+    async def purge(self, keys: List[str]) -> None:
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        async with httpx.AsyncClient(timeout=PURGE_TIMEOUT) as client:
+            r = await client.post(self.url, json={"keys": keys}, headers=headers)
+            r.raise_for_status()
+
+
+def make_client(url: str, token: str = ""):
+    if not url or url.startswith("noop://"):
+        return NoopPurgeClient()
+    if url.startswith("record://"):
+        return RecordingPurgeClient()
+    if url.startswith("fastly://"):
+        return FastlyPurgeClient(url[len("fastly://"):].strip("/"), token)
+    if url.startswith(("http://", "https://")):
+        return WebhookPurgeClient(url, token)
+    raise ValueError(f"unsupported CDN_PURGE_URL: {url}")
+
+
+class CdnPurger:
+    def __init__(self, client, delay: float = CDN_PURGE_DELAY):
+        self.client = client
+        self.delay = delay
+        self._pending: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return not isinstance(self.client, NoopPurgeClient)
+
+    def on_change(self, change) -> None:
+        # None (LISTEN koptu) yerel bir yazma değildir: CDN'i toptan boşaltmayız
+        if change is None or not self.enabled:
+            return
+        self.request(change_tags(change))
+
+    def request(self, keys: Iterable[str]) -> None:
+        self._pending.update(keys)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _purge(self, batch: List[str]) -> bool:
+        for attempt in range(PURGE_ATTEMPTS):
+            try:
+                await self.client.purge(batch)
+                CDN_PURGED_KEYS.inc("ok", amount=len(batch))
+                return True
+            except Exception as e:
+                log.warning("CDN purge failed (attempt %s/%s): %s", attempt + 1, PURGE_ATTEMPTS, e)
+                if attempt + 1 < PURGE_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        CDN_PURGED_KEYS.inc("failed", amount=len(batch))
+        return False
+
+    async def _flush(self) -> None:
+        # Aynı istekteki ardışık yazmaları (ör. reorder) tek purge'te topla
+        await asyncio.sleep(self.delay)
+        while self._pending:
+            keys, self._pending = sorted(self._pending), set()
+            failed: List[str] = []
+            for i in range(0, len(keys), PURGE_BATCH):
+                batch = keys[i:i + PURGE_BATCH]
+                if not await self._purge(batch):
+                    failed.extend(batch)
+            if failed:
+                # CDN erişilemiyor: anahtarlar düşürülmez (edge bayat kalırdı), arada gelenlerle
+                # birlikte yeniden denenir
+                self._pending.update(failed)
+                await asyncio.sleep(PURGE_RETRY_SECONDS)
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Kapanışta bekleyen purge'leri göndermeye çalışır."""
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            log.warning("CDN purge pending at shutdown: %s keys", len(self._pending))
+
+
+cdn = CdnPurger(make_client(CDN_PURGE_URL, CDN_PURGE_TOKEN))
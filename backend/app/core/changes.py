@@ -0,0 +1,195 @@
+# app/core/changes.py
+"""İçerik değişiklik akışı.
+
+Admin yazmaları yerelde `publish` ile yayınlanır; diğer worker/node'lardaki
+yazmalar DDL.sql'deki notify_change() tetikleyicilerinden LISTEN ile gelir (statement başına
+tek bildirim; etkilenen her satır ayrı bir Change olarak dağıtılır).
+Aboneler (önbellekler) her iki kaynaktan aynı Change olayını alır; None olayı
+"her şeyi boşalt" demektir (ör. LISTEN bağlantısı koptu, bildirim kaçmış olabilir).
+`local_only=True` aboneler yalnızca bu süreçteki yazmaları alır (ör. CDN purge'ü
+her node'da değil, yazmayı yapan node'da bir kez tetiklensin).
+
+Yerel publish edilen yazmanın NOTIFY'ı aynı sürece de döner. Bu yankı, bildirimi gönderen
+backend pid'i bu sürecin havuzundaysa ve aynı (entity, id, op) için bekleyen bir publish varsa
+atılır; zaman penceresiyle değil birebir eşleşmeyle: aynı satıra arka arkaya iki kaydetme iki
+olay olarak kalır. Yankı publish'ten önce gelirse ECHO_HOLD_SECONDS bekletilir; o sürede publish
+gelmezse (kaskadla silinen çocuklar, publish etmeyen yazmalar) normal olay olarak dağıtılır.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import DATABASE_URL
+
+log = logging.getLogger(__name__)
+
+# DDL.sql notify_change() içindeki pg_notify kanalı; trigger'lar ayardan okuyamadığı için sabit
+CHANNEL = "docs_changes"
+
+KEEPALIVE_SECONDS = 30
+MAX_BACKOFF_SECONDS = 30
+ECHO_WAIT_SECONDS = 10.0  # publish edilen yazmanın yankısı en geç bu sürede gelir
+ECHO_HOLD_SECONDS = 1.0   # publish'ten önce gelen yankı bu kadar bekletilir
+
+
+@dataclass(frozen=True)
+class Change:
+    entity: str                 # category | heading | content | content_image
+    id: uuid.UUID
+    op: str                     # insert | update | delete
+    parent_entity: Optional[str] = None
+    parent_id: Optional[uuid.UUID] = None
+
+
+Subscriber = Callable[[Optional[Change]], None]
+EchoKey = Tuple[str, str, str]
+
+
+def _echo_key(change: Change) -> EchoKey:
+    return change.entity, str(change.id), change.op
+
+
+def _parse(payload: str) -> Optional[List[Change]]:
+    """notify_change() yükü -> satır başına Change; None: yük sığmadı, her şey boşaltılmalı."""
+    d = json.loads(payload)
+    if d.get("truncated"):
+        return None
+    return [
+        Change(d["entity"], uuid.UUID(id), d["op"], parent_entity,
+               uuid.UUID(parent_id) if parent_id else None)
+        for parent_entity, parent_id, ids in d["groups"]
+        for id in ids
+    ]
+
+
+class ChangeFeed:
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self._subscribers: List[Tuple[Subscriber, bool]] = []
+        self._task: Optional[asyncio.Task] = None
+        # Yankı eşleştirme; her iki tarafta da süresi dolunca düşen zamanlayıcılar (FIFO)
+        self._awaiting_echo: Dict[EchoKey, Deque[asyncio.TimerHandle]] = {}
+        self._held: Dict[EchoKey, Deque[asyncio.TimerHandle]] = {}
+
+    def subscribe(self, fn: Subscriber, local_only: bool = False) -> None:
+        self._subscribers.append((fn, local_only))
+
+    def _dispatch(self, change: Optional[Change], local: bool) -> None:
+        for fn, local_only in self._subscribers:
+            if local_only and not local:
+                continue
+            try:
+                fn(change)
+            except Exception:
+                log.exception("change subscriber failed")
+
+    def publish(self, entity: str, id, op: str,
+                parent_entity: Optional[str] = None, parent_id=None) -> None:
+        """Bu süreçte yapılan yazmayı abonelere hemen iletir."""
+        change = Change(entity, id, op, parent_entity, parent_id)
+        if self._task is not None and not self._task.done():
+            key = _echo_key(change)
+            if self._held.get(key):
+                self._pop(self._held, key).cancel()  # yankı önce gelmişti: bekletilen atılır
+            else:
+                self._push(self._awaiting_echo, key, ECHO_WAIT_SECONDS, lambda: None)
+        self._dispatch(change, local=True)
+
+    @staticmethod
+    def _push(table: Dict[EchoKey, Deque[asyncio.TimerHandle]], key: EchoKey, delay: float,
+              expire: Callable[[], None]) -> None:
+        def fire():
+            ChangeFeed._pop(table, key)
+            expire()
+
+        table.setdefault(key, deque()).append(asyncio.get_running_loop().call_later(delay, fire))
+
+    @staticmethod
+    def _pop(table: Dict[EchoKey, Deque[asyncio.TimerHandle]], key: EchoKey) -> asyncio.TimerHandle:
+        handles = table[key]
+        handle = handles.popleft()
+        if not handles:
+            del table[key]
+        return handle
+
+    def _on_remote(self, change: Change, pid: int) -> None:
+        from app.db.session import backend_pids
+
+        if pid not in backend_pids:
+            self._dispatch(change, local=False)
+            return
+        key = _echo_key(change)
+        if self._awaiting_echo.get(key):
+            self._pop(self._awaiting_echo, key).cancel()  # yerel publish'in yankısı
+            return
+        self._push(self._held, key, ECHO_HOLD_SECONDS, lambda: self._dispatch(change, local=False))
+
+    def flush_all(self) -> None:
+        self._dispatch(None, local=False)
+
+    # ---- LISTEN ----
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        try:
+            parsed = _parse(payload)
+        except Exception:
+            log.warning("bad change payload: %r", payload)
+            return
+        if parsed is None:
+            self.flush_all()
+            return
+        for change in parsed:
+            self._on_remote(change, pid)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        backoff = 1
+        first_attempt = True
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(self.channel, self._on_notify)
+                if not first_attempt:
+                    # Kopukken gelen bildirimler kayıp: önbellekleri tamamen boşalt
+                    self.flush_all()
+                backoff = 1
+                while not conn.is_closed():
+                    await asyncio.sleep(KEEPALIVE_SECONDS)
+                    await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("change feed disconnected: %s", e)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            first_attempt = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+changes = ChangeFeed(
+    make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False),
+    CHANNEL,
+)
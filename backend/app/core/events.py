@@ -0,0 +1,94 @@
+# app/core/events.py
+"""Değişiklik olaylarının SSE istemcilerine dağıtımı.
+
+app.core.changes abonesidir. Her istemcinin sınırlı bir kuyruğu vardır; kuyruğu
+dolan (yavaş) istemciye `reset` gönderilip bağlantısı kapatılır, istemci de
+listelerini baştan çekip yeniden bağlanır. `revision` süreç içi artan sıradır
+(SSE `id:` alanı).
+"""
+import asyncio
+import json
+from typing import Set
+
+from app.core.metrics import registry
+
+QUEUE_SIZE = 100
+MAX_CLIENTS = 1000
+KEEPALIVE_SECONDS = 15
+
+_RESET = object()
+
+
+class _Client:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+
+class EventHub:
+    def __init__(self):
+        self._clients: Set[_Client] = set()
+        self._revision = 0
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def _offer(self, client: _Client, item) -> None:
+        if client.dropped:
+            return
+        try:
+            client.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            client.dropped = True  # akış bir sonraki okumada reset ile kapanır
+
+    def on_change(self, change) -> None:
+        if change is None:
+            for c in list(self._clients):
+                self._offer(c, _RESET)
+            return
+
+        # Yerel publish'in NOTIFY yankısını app.core.changes eler: her olay ayrı bir değişikliktir
+        self._revision += 1
+        data = json.dumps({
+            "entity": change.entity,
+            "id": str(change.id),
+            "op": change.op,
+            "parent_entity": change.parent_entity,
+            "parent_id": str(change.parent_id) if change.parent_id else None,
+            "revision": self._revision,
+        }, separators=(",", ":"))
+        item = f"id: {self._revision}\nevent: change\ndata: {data}\n\n"
+        for c in list(self._clients):
+            self._offer(c, item)
+
+    @property
+    def full(self) -> bool:
+        return len(self._clients) >= MAX_CLIENTS
+
+    async def stream(self):
+        client = _Client()
+        self._clients.add(client)
+        try:
+            yield f"retry: 3000\nevent: hello\ndata: {json.dumps({'revision': self._revision})}\n\n"
+            while True:
+                if client.dropped:
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+                try:
+                    item = await asyncio.wait_for(client.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if item is _RESET:
+                    yield "event: reset\ndata: {}\n\n"
+                    continue
+                yield item
+        finally:
+            self._clients.discard(client)
+
+
+hub = EventHub()
+registry.gauge("sse_clients", "Connected /events clients", fn=lambda: hub.client_count)
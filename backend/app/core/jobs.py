@@ -0,0 +1,235 @@
+# app/core/jobs.py
+"""Postgres tabanlı arka plan iş kuyruğu (job tablosu).
+
+Admin istekleri ağır işi `enqueue` ile kuyruğa yazıp hemen döner (ya da `enqueue_stmt`
+ile kendi transaction'ına ekler); her uygulama sürecindeki JOB_WORKERS işçi
+`FOR UPDATE SKIP LOCKED` ile birbirini beklemeden iş alır. Çalışan iş kalp atışıyla
+locked_at'ı tazeler; süreç ölürse iş JOB_LEASE_SECONDS sonra (deneme hakkı kaldıysa) yeniden kuyruğa döner.
+Başarısız iş max_attempts'e kadar üstel gecikmeyle tekrar denenir.
+
+İş tipleri modül içinde kaydedilir:
+
+    @jobs.handler("images.backfill")
+    async def _backfill(payload: dict) -> dict | None: ...
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import exists, func, insert, literal, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.config import JOB_LEASE_SECONDS, JOB_POLL_SECONDS, JOB_WORKERS
+from app.core.metrics import registry
+from app.db.models import job as t_job
+from app.db.session import execute, fetch_one
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[Optional[dict]]]
+
+RETRY_BASE_SECONDS = 5
+REAP_EVERY_SECONDS = 60
+
+JOB_COLUMNS = (
+    t_job.c.id, t_job.c.kind, t_job.c.status, t_job.c.payload, t_job.c.attempts,
+    t_job.c.max_attempts, t_job.c.run_after, t_job.c.result, t_job.c.error,
+    t_job.c.created_at, t_job.c.updated_at, t_job.c.finished_at,
+)
+
+_CLAIM_SQL = text("""
+    UPDATE job SET status = 'running', attempts = attempts + 1,
+                   locked_by = :worker, locked_at = now()
+    WHERE id = (
+      SELECT id FROM job
+      WHERE status = 'queued' AND run_after <= now()
+      ORDER BY run_after, created_at
+      FOR UPDATE SKIP LOCKED
+      LIMIT 1
+    )
+    RETURNING id, kind, payload, attempts, max_attempts
+""").columns(t_job.c.id, t_job.c.kind, t_job.c.payload, t_job.c.attempts, t_job.c.max_attempts)
+
+# Süreci ölen işler: hakkı kalan kuyruğa döner, son denemesini kaybeden failed olur
+# (aksi halde her çöküşte yeniden alınıp max_attempts'i aşardı)
+_REAP_SQL = """
+    UPDATE job SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                   finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE now() END,
+                   error = 'worker lost: lease expired', locked_by = NULL, locked_at = NULL
+    WHERE status = 'running' AND locked_at < now() - make_interval(secs => :lease)
+    RETURNING kind, status
+"""
+
+JOBS_TOTAL = registry.counter("jobs_total", "Finished job runs by kind and result", ("kind", "result"))
+JOB_DURATION = registry.histogram(
+    "job_duration_seconds", "Job handler run time", ("kind",),
+    buckets=(0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0))
+
+
+def enqueue_stmt(kind: str, payload: Optional[dict] = None, max_attempts: int = 3, unique: bool = False):
+    """İş ekleme ifadesi; execute_many adımı olarak yazmayla aynı transaction'a girer.
+
+    unique=True: aynı tipte bekleyen/çalışan iş varsa satır eklenmez (periyodik işler için).
+    """
+    if not unique:
+        return (
+            insert(t_job)
+            .values(kind=kind, payload=payload or {}, max_attempts=max_attempts)
+            .returning(*JOB_COLUMNS)
+        )
+    pending = select(t_job.c.id).where(t_job.c.kind == kind, t_job.c.status.in_(("queued", "running")))
+    return (
+        insert(t_job)
+        .from_select(
+            ["kind", "payload", "max_attempts"],
+            select(literal(kind), literal(payload or {}, JSONB), literal(max_attempts)).where(~exists(pending)),
+        )
+        .returning(*JOB_COLUMNS)
+    )
+
+
+class JobQueue:
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._running = 0
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def handler(self, kind: str):
+        def register(fn: Handler) -> Handler:
+            self._handlers[kind] = fn
+            return fn
+        return register
+
+    def wake(self) -> None:
+        """Bu süreçte kuyruğa iş eklendi: bekleyen işçileri poll süresini beklemeden uyandır."""
+        self._wake.set()
+
+    async def enqueue(self, kind: str, payload: Optional[dict] = None, max_attempts: int = 3,
+                      unique: bool = False):
+        rows = await execute(enqueue_stmt(kind, payload, max_attempts, unique))
+        if not rows:
+            return None  # unique: zaten kuyrukta
+        self.wake()
+        return rows[0]
+
+    # ---- işçi ----
+    async def _claim(self):
+        # execute: talep (status/lease/attempts) commit edilmeli; fetch_one'ın bağlantısı kapanırken
+        # geri alınır ve aynı iş tekrar tekrar alınırdı
+        rows = await execute(_CLAIM_SQL.bindparams(worker=self.worker_id))
+        return rows[0] if rows else None
+
+    async def _heartbeat(self, job_id) -> None:
+        while True:
+            await asyncio.sleep(max(1, JOB_LEASE_SECONDS // 3))
+            # Tek bir DB hatası kalp atışını durdurmasın: lease dolup iş ikinci kez alınırdı
+            try:
+                await execute(update(t_job).where(t_job.c.id == job_id).values(locked_at=func.now()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("job %s heartbeat failed: %s", job_id, e)
+
+    async def _finish(self, job_id, **values) -> None:
+        await execute(
+            update(t_job).where(t_job.c.id == job_id)
+            .values(locked_by=None, locked_at=None, **values)
+        )
+
+    async def _run(self, row) -> None:
+        kind = row["kind"]
+        fn = self._handlers.get(kind)
+        beat = asyncio.get_running_loop().create_task(self._heartbeat(row["id"]))
+        self._running += 1
+        t0 = time.perf_counter()
+        try:
+            if fn is None:
+                raise LookupError(f"unknown job kind: {kind}")
+            result = await fn(dict(row["payload"] or {}))
+        except asyncio.CancelledError:
+            # Kapanış: iş yarıda kaldı, deneme sayılmadan kuyruğa geri
+            await asyncio.shield(self._finish(row["id"], status="queued", attempts=t_job.c.attempts - 1))
+            raise
+        except Exception as e:
+            retry = row["attempts"] < row["max_attempts"]
+            log.warning("job %s (%s) failed, attempt %s/%s: %s",
+                        row["id"], kind, row["attempts"], row["max_attempts"], e)
+            JOBS_TOTAL.inc(kind, "retry" if retry else "failed")
+            error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            if retry:
+                delay = RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1)
+                await self._finish(row["id"], status="queued", error=error,
+                                   run_after=func.now() + timedelta(seconds=delay))
+            else:
+                await self._finish(row["id"], status="failed", error=error, finished_at=func.now())
+        else:
+            JOBS_TOTAL.inc(kind, "done")
+            await self._finish(row["id"], status="done", result=result, error=None, finished_at=func.now())
+        finally:
+            self._running -= 1
+            beat.cancel()
+            JOB_DURATION.observe(time.perf_counter() - t0, kind)
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                row = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("job claim failed: %s", e)
+                await asyncio.sleep(JOB_POLL_SECONDS * 5)
+                continue
+            if row is not None:
+                try:
+                    await self._run(row)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Sonuç yazılamadı (DB koptu): iş "running" kalır, reaper kuyruğa geri alır
+                    log.exception("job %s bookkeeping failed", row["id"])
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reap(self) -> None:
+        while True:
+            try:
+                for r in await execute(_REAP_SQL, {"lease": float(JOB_LEASE_SECONDS)}) or ():
+                    JOBS_TOTAL.inc(r["kind"], "retry" if r["status"] == "queued" else "failed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("job reaper failed: %s", e)
+            await asyncio.sleep(REAP_EVERY_SECONDS)
+
+    def start(self, workers: int = JOB_WORKERS) -> None:
+        if self._tasks or workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._work()) for _ in range(workers)]
+        self._tasks.append(loop.create_task(self._reap()))
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+jobs = JobQueue()
+registry.gauge("jobs_running", "Jobs currently running in this process", fn=lambda: jobs.running)
@@ -0,0 +1,254 @@
+# app/core/lastgood.py
+"""DB kesintisinde public okumalar için son başarılı yanıtlar (degraded mode).
+
+Handler'ın `app.core.cdn.tag_response` ile etiketlediği her 200 public yanıt, gövdesi
+değiştiyse <ABS_LASTGOOD_DIR>/<sha1(istek)>.bin dosyasına atomik olarak yazılır (toplam boyut
+LASTGOOD_MAX_BYTES ile sınırlı, en eski kullanılan önce silinir). Disk işi yanıt gönderildikten
+sonra bir thread'de yapılır; istek yolunu ve event loop'u bekletmez. Kayıt biçimi paylaşılan
+önbellekle aynıdır (app.core.sharedcache.encode_entry).
+
+Bir istek DB'ye ulaşamadığında (bağlantı hatası, havuz zaman aşımı) `db_health` degraded
+olur: cacheable public GET'ler DB'ye hiç gitmeden diskteki son yanıttan `X-Degraded:
+last-good` ve `Age` başlıklarıyla döner (paylaşılan önbellek/CDN saklamasın diye etiketsiz
+ve `Cache-Control: no-store`). Kaydı olmayan yollar 503 alır. Arka planda her
+DB_PROBE_INTERVAL saniyede `SELECT 1` denenir; başarılı olunca (ya da /healthz geçince)
+normal moda dönülür. Bu sürede /healthz 200 ve `degraded: true` döner: node yük dengeleyicide
+kalır ve last-good yanıtları servis etmeyi sürdürür.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import exc as sa_exc
+
+from app.core.cdn import SURROGATE_KEY_HEADER, response_tags
+from app.core.config import ABS_LASTGOOD_DIR, DB_PROBE_INTERVAL, LASTGOOD_ENABLED, LASTGOOD_MAX_BYTES
+from app.core.metrics import registry
+from app.core.sharedcache import decode_entry, encode_entry
+from app.core.singleflight import CapturedResponse, capture
+
+log = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 2.0
+RETRY_AFTER_SECONDS = 5
+
+# Son başarılı yanıtı saklanan public okumalar (handler'lar ayrıca etiketlemeli)
+_FALLBACK_PREFIXES = ("/menu", "/categories", "/page/", "/contents/")
+# Saklanan yanıttan geri dönerken atılan başlıklar (önbellek/CDN etiketleri)
+_DROPPED_HEADERS = (SURROGATE_KEY_HEADER, b"surrogate-control", b"cache-control", b"etag")
+
+LASTGOOD_RESPONSES = registry.counter(
+    "lastgood_responses_total", "Public reads during a DB outage by outcome", ("result",))  # served | missing
+DB_OUTAGES = registry.counter("db_outages_total", "Transitions into degraded (DB unavailable) mode")
+
+
+def is_db_unavailable(e: BaseException) -> bool:
+    """Bağlantı/havuz kaynaklı hata mı (sorgu hatası değil)? __cause__ zinciri de taranır."""
+    while e is not None:
+        if isinstance(e, BaseExceptionGroup):  # BaseHTTPMiddleware task grubundan gelebilir
+            return any(is_db_unavailable(x) for x in e.exceptions)
+        if isinstance(e, (sa_exc.TimeoutError, OSError, asyncio.TimeoutError)):
+            return True  # havuz zaman aşımı, bağlantı reddi/kopması
+        if isinstance(e, sa_exc.DBAPIError) and (
+                e.connection_invalidated or isinstance(e, (sa_exc.OperationalError, sa_exc.InterfaceError))):
+            return True
+        e = e.__cause__
+    return False
+
+
+class DbHealth:
+    def __init__(self, interval: float = DB_PROBE_INTERVAL):
+        self.interval = interval
+        self.degraded = False
+        self.since: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe: Optional[asyncio.Task] = None
+
+    def mark_down(self, e: BaseException) -> None:
+        self.last_error = f"{type(e).__name__}: {e}"
+        if self.degraded:
+            return
+        self.degraded = True
+        self.since = time.time()
+        DB_OUTAGES.inc()
+        log.warning("database unavailable, serving last-good public responses: %s", self.last_error)
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    def mark_up(self) -> None:
+        if self.degraded:
+            log.warning("database reachable again after %.1fs", time.time() - (self.since or time.time()))
+        self.degraded = False
+        self.since = None
+        self.last_error = None
+
+    async def _probe_loop(self) -> None:
+        from app.db.session import fetch_one
+
+        while self.degraded:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.wait_for(fetch_one("SELECT 1 AS ok"), PROBE_TIMEOUT)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                continue
+            self.mark_up()
+
+    async def stop(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+
+    def as_dict(self) -> dict:
+        return {"degraded": self.degraded, "degraded_since": self.since, "db_error": self.last_error}
+
+
+db_health = DbHealth()
+registry.gauge("db_degraded", "1 while public reads are served from last-good responses",
+               fn=lambda: float(db_health.degraded))
+
+
+class LastGoodStore:
+    """Boyutu sınırlı, dosya başına bir yanıt tutan disk önbelleği (tüm worker'lar paylaşır)."""
+
+    def __init__(self, root: str, max_bytes: int = LASTGOOD_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # dosya adı -> (boyut, gövde crc32); mtime sırasına göre LRU. Diğer worker'ların
+        # yazdıkları ilk taramadan sonra sayılmaz: sınır worker başına yaklaşıktır
+        self._index: Optional["OrderedDict[str, Tuple[int, int]]"] = None
+        self._bytes = 0
+        self._lock = threading.Lock()  # put() thread'lerde çalışır
+
+    @staticmethod
+    def key(scope) -> str:
+        host = next((v for k, v in scope.get("headers", ()) if k == b"host"), b"").decode("latin-1")
+        qs = scope.get("query_string", b"").decode("latin-1")
+        raw = f"{scope['scheme']}://{host}{scope['path']}?{qs}"
+        return hashlib.sha1(raw.encode()).hexdigest() + ".bin"
+
+    def _load_index(self) -> "OrderedDict[str, Tuple[int, int]]":
+        if self._index is None:
+            self._index = OrderedDict()
+            self._bytes = 0
+            try:
+                files = sorted((p.stat().st_mtime, p.name, p.stat().st_size) for p in self.root.glob("*.bin"))
+            except FileNotFoundError:
+                files = []
+            for _, name, size in files:
+                self._index[name] = (size, -1)  # crc bilinmiyor: ilk başarılı yanıtta yeniden yazılır
+                self._bytes += size
+        return self._index
+
+    def get(self, name: str) -> Optional[Tuple[CapturedResponse, float]]:
+        try:
+            return decode_entry((self.root / name).read_bytes())
+        except (FileNotFoundError, ValueError, zlib.error, KeyError):
+            return None
+
+    def put(self, name: str, res: CapturedResponse) -> None:
+        with self._lock:
+            self._put(name, res)
+
+    def _put(self, name: str, res: CapturedResponse) -> None:
+        index = self._load_index()
+        crc = zlib.crc32(res.body)
+        known = index.get(name)
+        if known is not None and known[1] == crc:
+            index.move_to_end(name)  # aynı gövde: disk yazması yok
+            return
+        data = encode_entry(res, (), time.time())
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".{name}.{os.getpid()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.root / name)
+        if known is not None:
+            self._bytes -= known[0]
+        index[name] = (len(data), crc)
+        index.move_to_end(name)
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes and len(index) > 1:
+            old, (size, _) = index.popitem(last=False)
+            (self.root / old).unlink(missing_ok=True)
+            self._bytes -= size
+
+
+lastgood = LastGoodStore(ABS_LASTGOOD_DIR)
+
+
+def _degraded_headers(res: CapturedResponse, created: float):
+    headers = [(k, v) for k, v in res.headers if k not in _DROPPED_HEADERS and k != b"age"]
+    age = str(int(max(0.0, time.time() - created))).encode()
+    return headers, ((b"x-degraded", b"last-good"), (b"age", age), (b"cache-control", b"no-store"))
+
+
+async def _unavailable(send) -> None:
+    await send({"type": "http.response.start", "status": 503, "headers": [
+        (b"content-type", b"application/json"), (b"retry-after", str(RETRY_AFTER_SECONDS).encode())]})
+    await send({"type": "http.response.body",
+                "body": json.dumps({"detail": "Service temporarily unavailable"}).encode()})
+
+
+class LastGoodMiddleware:
+    def __init__(self, app, enabled: bool = LASTGOOD_ENABLED, store: LastGoodStore = lastgood,
+                 health: DbHealth = db_health):
+        self.app = app
+        self.enabled = enabled
+        self.store = store
+        self.health = health
+        self._writes: Dict[str, asyncio.Task] = {}  # yazılmakta olan kayıtlar: aynı yol için tek yazma
+
+    def _eligible(self, scope) -> bool:
+        if scope["method"] != "GET" or not scope["path"].startswith(_FALLBACK_PREFIXES):
+            return False
+        return not any(k in (b"authorization", b"cookie") for k, _ in scope.get("headers", ()))
+
+    async def _serve_last_good(self, scope, send, name: str) -> bool:
+        found = await asyncio.to_thread(self.store.get, name)
+        if found is None:
+            LASTGOOD_RESPONSES.inc("missing")
+            return False
+        res, created = found
+        headers, extra = _degraded_headers(res, created)
+        LASTGOOD_RESPONSES.inc("served")
+        await CapturedResponse(res.status, headers, res.body).replay(scope, send, extra)
+        return True
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled or not self._eligible(scope):
+            return await self.app(scope, receive, send)
+
+        name = self.store.key(scope)
+        if self.health.degraded:
+            # Kesinti sürerken havuz zaman aşımlarını beklemeden diskteki yanıtı ver
+            if not await self._serve_last_good(scope, send, name):
+                await _unavailable(send)
+            return
+
+        try:
+            res = await capture(self.app, scope)
+        except Exception as e:
+            if not is_db_unavailable(e):
+                raise
+            self.health.mark_down(e)
+            if not await self._serve_last_good(scope, send, name):
+                await _unavailable(send)
+            return
+        if res.status == 200 and response_tags(res.headers) and name not in self._writes:
+            self._writes[name] = asyncio.get_running_loop().create_task(self._write(name, res))
+        await res.replay(scope, send)
+
+    async def _write(self, name: str, res: CapturedResponse) -> None:
+        try:
+            await asyncio.to_thread(self.store.put, name, res)
+        except OSError as e:
+            log.warning("last-good store write failed: %s", e)
+        finally:
+            self._writes.pop(name, None)
@@ -0,0 +1,198 @@
+# app/core/metrics.py
+"""Prometheus metin formatında süreç içi metrikler (bağımlılıksız, sürekli açık kalacak kadar ucuz).
+
+Her worker kendi sayaçlarını tutar; /metrics o worker'ın değerlerini döner.
+"""
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *a, **kw):
+        super().__init__(*a, **kw)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *a, fn: Callable[[], float] | None = None, **kw):
+        super().__init__(*a, **kw)
+        self._values: Dict[LabelValues, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> List[str]:
+        if self._fn is not None:
+            try:
+                self._values[()] = float(self._fn())
+            except Exception:
+                pass
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.labels, k)} {v}" for k, v in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *a, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kw):
+        super().__init__(*a, **kw)
+        self.buckets = buckets
+        self._series: Dict[LabelValues, list] = {}  # [bucket_counts..., sum, count]
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, b in enumerate(self.buckets):
+            if value <= b:
+                s[i] += 1
+                break
+        s[-2] += value
+        s[-1] += 1
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for k, s in self._series.items():
+            cum = 0
+            for i, b in enumerate(self.buckets):
+                cum += s[i]
+                le = f'le="{b}"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {cum}")
+            le = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels, k, le)} {s[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, k)} {s[-2]}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, k)} {s[-1]}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), fn=None) -> Gauge:
+        return self.register(Gauge(name, help, labels, fn=fn))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets=buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ---- HTTP ----
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+# ---- Cache (hit ratio = hit / (hit + miss)) ----
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+# O an işlenen isteğin ASGI scope'u (DB katmanı yavaş sorguları route ile etiketler)
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("metrics_route", "<unmatched>")
+
+
+class MetricsMiddleware:
+    """Saf ASGI middleware: route şablonu (ör. /page/{category_slug}/...) başına gecikme ve sayım."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        token = request_scope.set(scope)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            request_scope.reset(token)
+            label = route_label(scope)
+            HTTP_LATENCY.observe(time.perf_counter() - t0, scope["method"], label)
+            HTTP_REQUESTS.inc(scope["method"], label, status)
@@ -0,0 +1,79 @@
+# app/core/querybudget.py
+"""Geliştirme modunda istek başına sorgu bütçesi ve N+1 dedektörü.
+
+Her isteğin sorgu sayısı ve toplam DB süresi `Server-Timing: db;dur=..` olarak
+eklenir. Bütçeyi aşan route'lar (ya da aynı sorguyu N_PLUS_ONE_THRESHOLD kez
+tekrarlayanlar) `log` modunda uyarı yazar, `raise` modunda QueryBudgetExceeded
+fırlatır; böylece TestClient ile koşan testler CI'da kırılır.
+"""
+import logging
+from typing import Dict
+
+from app.core.config import (
+    QUERY_BUDGET, QUERY_BUDGET_MODE, QUERY_BUDGET_OVERRIDES, N_PLUS_ONE_THRESHOLD,
+)
+from app.db.session import QueryStats, request_query_stats
+
+log = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def _parse_overrides(raw: str) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for part in raw.split(","):
+        if "=" in part:
+            route, n = part.rsplit("=", 1)
+            out[route.strip()] = int(n)
+    return out
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE, budget: int = QUERY_BUDGET,
+                 overrides: str = QUERY_BUDGET_OVERRIDES):
+        self.app = app
+        self.mode = mode
+        self.budget = budget
+        self.overrides = _parse_overrides(overrides)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_query_stats.reset(token)
+        self._check(scope, stats)
+
+    def _check(self, scope, stats: QueryStats) -> None:
+        route = getattr(scope.get("route"), "path", scope["path"])
+        key = f"{scope['method']} {route}"
+        limit = self.overrides.get(key, self.budget)
+        problems = []
+        if stats.count > limit:
+            problems.append(f"{stats.count} queries > budget {limit}")
+        repeated = {fp: n for fp, n in stats.by_fingerprint.items() if n >= N_PLUS_ONE_THRESHOLD}
+        if repeated:
+            problems.append(f"possible N+1: {repeated}")
+        if not problems:
+            return
+        msg = f"{key}: " + "; ".join(problems) + f" ({stats.seconds * 1000:.1f} ms in DB)"
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(msg)
+        log.warning(msg)
@@ -0,0 +1,112 @@
+# app/core/render.py
+"""content.body (markdown) -> sanitize edilmiş HTML.
+
+Frontend'deki ContentBody.tsx ile aynı kurallar: `<--image-->` yer tutucuları
+sırayla content_image kayıtlarıyla doldurulur, başlıklara slug id verilir. remark-gfm'in
+`extra`da olmayan kısımları (üstü çizili, görev listesi, çıplak URL) app/core/render_gfm.py'de.
+"""
+import hashlib
+import html
+import re
+import unicodedata
+from urllib.parse import urlparse
+
+IMAGE_PLACEHOLDER = "<--image-->"
+
+_ALLOWED_TAGS = {
+    "p", "br", "hr", "h1", "h2", "h3", "h4", "h5", "h6",
+    "strong", "em", "b", "i", "del", "s", "sup", "sub", "abbr",
+    "code", "pre", "blockquote", "ul", "ol", "li", "dl", "dt", "dd",
+    "a", "img", "table", "thead", "tbody", "tr", "th", "td", "input",
+}
+_ALLOWED_ATTRS = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title", "width", "height", "loading", "style"},
+    "code": {"class"},
+    "th": {"align"},
+    "td": {"align"},
+    "abbr": {"title"},
+    "input": {"type", "checked", "disabled"},
+    **{f"h{i}": {"id"} for i in range(1, 7)},
+}
+# img style yalnızca _img_tag'in ürettiği yer tutucu arka planı olabilir (markdown'daki elle yazılmış
+# style'lar atılır)
+_PLACEHOLDER_STYLE = re.compile(
+    r"background:#[0-9a-f]{6}(?: url\(data:image/webp;base64,[A-Za-z0-9+/]+=*\) center/cover no-repeat)?")
+
+
+def slugify(value: str, separator: str = "-") -> str:
+    # shared/utils/slug.ts ile aynı: TOC id'leri iki tarafta da eşleşsin
+    s = unicodedata.normalize("NFD", value.lower())
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = re.sub(r"[^a-z0-9]+", separator, s)
+    return s.strip(separator)
+
+
+def static_path(url: str) -> str:
+    """Kayıtlı görsel URL'sini host'tan bağımsız yola çevirir (/static -> /api/static)."""
+    if url.startswith("http://") or url.startswith("https://"):
+        parsed = urlparse(url)
+        if parsed.hostname not in {"localhost", "127.0.0.1"}:
+            return url
+        url = parsed.path
+    if not url.startswith("/"):
+        url = "/" + url
+    if url.startswith("/static/"):
+        return "/api" + url
+    return url
+
+
+def render_revision(updated_at, images) -> str:
+    """İçerik ve görsellerinden türetilen revizyon anahtarı; render önbelleğinin geçerlilik ölçütü."""
+    h = hashlib.sha1(str(updated_at).encode())
+    for im in images:
+        h.update(f"|{im['id']}:{im['url']}:{im['alt']}:{im['width']}x{im['height']}:{im['dominant_color']}"
+                 f":{im['updated_at']}".encode())
+    return h.hexdigest()
+
+
+def _img_tag(im) -> str:
+    attrs = [
+        f'src="{html.escape(static_path(im["url"]))}"',
+        f'alt="{html.escape(im["alt"] or "Image")}"',
+    ]
+    if im["width"] and im["height"]:
+        attrs.append(f'width="{int(im["width"])}" height="{int(im["height"])}"')
+    if im["dominant_color"]:
+        style = f"background:{im['dominant_color']}"
+        if im["placeholder"]:
+            style += f" url({im['placeholder']}) center/cover no-repeat"
+        attrs.append(f'style="{html.escape(style)}"')
+    attrs.append('loading="lazy"')
+    return f"<img {' '.join(attrs)}>"
+
+
+def render_body(body: str, images) -> str:
+    """Markdown'u HTML'e çevirip sanitize eder (CPU işi; threadpool'da çağırın)."""
+    import markdown
+    import nh3
+
+    from app.core.render_gfm import GfmExtension
+
+    for im in images:
+        if IMAGE_PLACEHOLDER not in body:
+            break
+        body = body.replace(IMAGE_PLACEHOLDER, _img_tag(im), 1)
+
+    raw = markdown.markdown(
+        body,
+        extensions=["extra", "sane_lists", "toc", GfmExtension()],
+        extension_configs={"toc": {"slugify": slugify}},
+        output_format="html",
+    )
+    return nh3.clean(raw, tags=_ALLOWED_TAGS, attributes=_ALLOWED_ATTRS, attribute_filter=_filter_attr)
+
+
+def _filter_attr(tag: str, attr: str, value: str):
+    if attr == "style" and not _PLACEHOLDER_STYLE.fullmatch(value):
+        return None
+    # Yalnızca görev listesi kutucukları (render_gfm); form alanı enjekte edilemez
+    if tag == "input" and attr == "type" and value != "checkbox":
+        return None
+    return value
@@ -0,0 +1,62 @@
+# app/core/render_gfm.py
+"""Python-Markdown için GFM eklentileri (frontend'deki remark-gfm ile aynı çıktı için).
+
+`extra` tabloları ve dipnotları zaten kapsar; burada eksik kalanlar:
+    ~~üstü çizili~~ / ~üstü çizili~   -> <del>
+    - [ ] / - [x] görev listeleri     -> <input type="checkbox" disabled>
+    https://.. / www... çıplak URL'ler -> <a href>
+
+render.py bu modülü render_body içinde lazy import eder (markdown import maliyeti).
+"""
+import re
+import xml.etree.ElementTree as etree
+
+from markdown.extensions import Extension
+from markdown.inlinepatterns import InlineProcessor, SimpleTagInlineProcessor
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AtomicString
+
+_STRIKE_RE = r"(?<!~)(~~?)(?!~)(.+?)(?<!~)\1(?!~)"
+# \x02/\x03: Python-Markdown'un saklanan HTML/placeholder işaretleri, URL'ye dahil edilmez
+_BARE_URL_RE = r"(?<![\w/.@:-])(?:https?://|www\.)[^\s<>\x02\x03]+"
+_TASK = re.compile(r"\[([ xX])\]\s+")
+# GFM: sondaki noktalama bağlantıya dahil değil
+_TRAILING = "?!.,:;*_~'\""
+
+
+class _BareUrlProcessor(InlineProcessor):
+    ANCESTOR_EXCLUDES = ("a",)  # [https://..](..) metni ikinci kez bağlanmasın
+
+    def handleMatch(self, m, data):
+        url = m.group(0)
+        while url and (url[-1] in _TRAILING or (url[-1] == ")" and url.count(")") > url.count("("))):
+            url = url[:-1]
+        el = etree.Element("a")
+        el.set("href", "http://" + url if url.startswith("www.") else url)
+        el.text = AtomicString(url)
+        return el, m.start(0), m.start(0) + len(url)
+
+
+class _TaskListProcessor(Treeprocessor):
+    def run(self, root):
+        for li in root.iter("li"):
+            # Gevşek listede metin <p> içinde
+            target = li[0] if len(li) and li[0].tag == "p" and not (li.text or "").strip() else li
+            m = _TASK.match(target.text or "")
+            if not m:
+                continue
+            box = etree.Element("input", {"type": "checkbox", "disabled": "disabled"})
+            if m.group(1) != " ":
+                box.set("checked", "checked")
+            box.tail = " " + target.text[m.end():]  # remark-gfm: "<input ..> metin"
+            target.text = None
+            target.insert(0, box)
+
+
+class GfmExtension(Extension):
+    def extendMarkdown(self, md):
+        # Öncelikler: kod/link/<autolink> (190/160/120) önce; vurgudan (60) önce ki URL'deki _ korunur
+        md.inlinePatterns.register(_BareUrlProcessor(_BARE_URL_RE, md), "gfm_autolink", 105)
+        md.inlinePatterns.register(SimpleTagInlineProcessor(_STRIKE_RE, "del"), "gfm_strike", 45)
+        # inline işlendikten (20) sonra: görev işareti li metninin başında kalmış olur
+        md.treeprocessors.register(_TaskListProcessor(md), "gfm_tasklist", 15)
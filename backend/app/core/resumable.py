@@ -0,0 +1,193 @@
+# app/core/resumable.py
+"""Kesintiden sonra kaldığı yerden devam eden (resumable) görsel yüklemeleri.
+
+Protokol (admin router):
+    POST   /admin/content-images/uploads                 oturum aç: content_id, content_type, length, ...
+    HEAD   /admin/content-images/uploads/{id}            `Upload-Offset`: sunucuya ulaşan bayt sayısı
+    PATCH  /admin/content-images/uploads/{id}            `Upload-Offset` + ham gövde (en fazla MAX_UPLOAD_BYTES)
+    POST   /admin/content-images/uploads/{id}/finalize   tamamlanan dosya doğrulanır, content_image eklenir
+    DELETE /admin/content-images/uploads/{id}            iptal
+
+Durum dosya sisteminde tutulur (aynı makinedeki tüm worker'lar paylaşır):
+<ABS_UPLOADS_DIR>/.partial/<id>.json meta + son kullanma zamanı, <id>.part veri — dosyanın
+boyutu ofsetin kendisidir, yarıda kesilen parçanın yazılan kısmı da korunur. Her parça
+süreyi UPLOAD_SESSION_TTL_SECONDS uzatır; süresi dolan oturumları uploads GC siler
+(`.` ile başlayan klasör tam taramada atlanır).
+
+PATCH, finalize ve iptal <id>.lock üzerinde özel flock alır (worker'lar arası); kilit
+tutuluyorsa SessionBusy (router 409 döner). Aynı ofsete eşzamanlı iki PATCH ya da çift
+finalize böylece dosyayı birlikte yazamaz / taşımaya çalışamaz.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import AsyncIterator, Iterator, Optional, Tuple
+
+from app.core.config import ABS_UPLOADS_DIR, RESUMABLE_MAX_BYTES, UPLOAD_SESSION_TTL_SECONDS
+from app.core.storage import _allowed_mimes
+
+
+class SessionNotFound(LookupError):
+    pass
+
+
+class SessionBusy(Exception):
+    pass
+
+
+class OffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        super().__init__(f"Upload offset is {offset}")
+        self.offset = offset
+
+
+@dataclass
+class UploadSession:
+    id: str
+    content_id: str
+    content_type: str
+    length: int
+    alt: str = ""
+    sort_order: Optional[int] = None
+    width: int = 0
+    height: int = 0
+    expires_at: float = 0.0
+    offset: int = 0  # kaydedilmez: .part dosyasının boyutu
+
+
+class UploadSessions:
+    def __init__(self, root: str = ABS_UPLOADS_DIR, ttl: int = UPLOAD_SESSION_TTL_SECONDS,
+                 max_bytes: int = RESUMABLE_MAX_BYTES):
+        self.dir = Path(root) / ".partial"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def _paths(self, id: str) -> Tuple[Path, Path]:
+        name = uuid.UUID(str(id)).hex  # yol enjeksiyonuna karşı
+        return self.dir / f"{name}.json", self.dir / f"{name}.part"
+
+    def _lock_path(self, id) -> Path:
+        return self._paths(id)[0].with_suffix(".lock")
+
+    @contextmanager
+    def locked(self, id) -> Iterator[None]:
+        """Oturumu blok boyunca tüm worker'lara karşı kilitler; başka istek tutuyorsa SessionBusy."""
+        try:
+            fd = os.open(self._lock_path(id), os.O_RDWR | os.O_CREAT, 0o600)
+        except FileNotFoundError:
+            raise SessionNotFound(str(id))  # .partial hiç oluşmamış
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise SessionBusy(str(id))
+            yield
+        finally:
+            os.close(fd)  # kilidi de bırakır
+
+    def _save(self, s: UploadSession) -> None:
+        meta, _ = self._paths(s.id)
+        data = asdict(s)
+        data.pop("offset")
+        tmp = meta.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, meta)
+
+    def create(self, content_id, content_type: str, length: int, alt: str = "",
+               sort_order: Optional[int] = None, width: int = 0, height: int = 0) -> UploadSession:
+        if content_type not in _allowed_mimes():
+            raise ValueError("Unsupported file type")
+        if length <= 0 or length > self.max_bytes:
+            raise ValueError("File too large" if length > 0 else "Empty file")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        s = UploadSession(
+            id=uuid.uuid4().hex, content_id=str(content_id), content_type=content_type, length=length,
+            alt=alt or "", sort_order=sort_order, width=width or 0, height=height or 0,
+            expires_at=time.time() + self.ttl,
+        )
+        self._paths(s.id)[1].touch()
+        self._save(s)
+        return s
+
+    def get(self, id) -> UploadSession:
+        meta, part = self._paths(id)
+        try:
+            s = UploadSession(**json.loads(meta.read_text()))
+            s.offset = part.stat().st_size
+        except (FileNotFoundError, ValueError, TypeError):
+            raise SessionNotFound(str(id))
+        if s.expires_at < time.time():
+            self.discard(id)
+            raise SessionNotFound(str(id))
+        return s
+
+    async def append(self, id, offset: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """Parçayı ofsetten itibaren yazar; ofset sunucudakiyle uyuşmazsa OffsetMismatch."""
+        with self.locked(id):
+            s = self.get(id)
+            if offset != s.offset:
+                raise OffsetMismatch(s.offset)
+            _, part = self._paths(id)
+            too_long = False
+            with open(part, "r+b") as f:
+                f.seek(offset)
+                async for chunk in chunks:
+                    room = s.length - s.offset
+                    if len(chunk) > room:
+                        chunk, too_long = chunk[:room], True
+                    # Disk yazması event loop'u tutmasın
+                    await asyncio.to_thread(f.write, chunk)
+                    s.offset += len(chunk)
+                    if too_long:
+                        break
+            s.expires_at = time.time() + self.ttl
+            self._save(s)
+        if too_long:
+            raise ValueError("Chunk exceeds declared upload length")
+        return s
+
+    def complete(self, id) -> Tuple[UploadSession, Path]:
+        """Tamamlanan dosyayı döner; çağıran `locked(id)` içinde olmalı (taşıma da kilit altında)."""
+        s = self.get(id)
+        if s.offset != s.length:
+            raise OffsetMismatch(s.offset)
+        return s, self._paths(id)[1]
+
+    def discard(self, id) -> None:
+        for p in (*self._paths(id), self._lock_path(id)):
+            p.unlink(missing_ok=True)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Süresi dolan oturumları siler (uploads GC); silinen oturum sayısını döner."""
+        now = time.time() if now is None else now
+        removed = 0
+        if not self.dir.is_dir():
+            return 0
+        for meta in self.dir.glob("*.json"):
+            try:
+                expired = json.loads(meta.read_text())["expires_at"] < now
+            except FileNotFoundError:
+                continue  # başka bir worker tamamladı/sildi
+            except (ValueError, KeyError):
+                expired = True  # bozuk meta
+            if expired:
+                self.discard(meta.stem)
+                removed += 1
+        # Meta'sı yazılamamış ya da silinmiş sahipsiz parçalar ve kilit dosyaları
+        for orphan in (*self.dir.glob("*.part"), *self.dir.glob("*.lock")):
+            try:
+                stale = orphan.stat().st_mtime < now - self.ttl
+            except FileNotFoundError:
+                continue
+            if stale and not orphan.with_suffix(".json").exists():
+                orphan.unlink(missing_ok=True)
+        return removed
+
+
+upload_sessions = UploadSessions()
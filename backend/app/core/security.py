@@ -4,14 +4,26 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
+from functools import lru_cache
 
 from app.core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_DELTA
 from app.db.session import fetch_one
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/login")
 
+@lru_cache(maxsize=1)
+def _pwd_context():
+    # passlib + bcrypt backend'i ilk login/parola işleminde yüklenir (soğuk başlangıç)
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def hash_password(password: str) -> str:
+    return _pwd_context().hash(password)
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return _pwd_context().verify(password, password_hash)
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or ACCESS_TOKEN_EXPIRE_DELTA)
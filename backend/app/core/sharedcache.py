@@ -0,0 +1,304 @@
+# app/core/sharedcache.py
+"""Node'lar arası paylaşılan public yanıt önbelleği (isteğe bağlı, Redis protokolü).
+
+SHARED_CACHE_URL boşsa kapalıdır; `redis://...` Redis (ya da uyumlu bir sunucu),
+`memory://` süreç içi yerel yedek (geliştirme/test) kullanır.
+
+Yalnızca handler'ın `app.core.cdn.tag_response` ile (Surrogate-Key) etiketlediği 200 yanıtları saklanır; gövde
+serileştirilmiş hâliyle (eşikten büyükse zlib ile sıkıştırılmış) yazılır. Yaş:
+  * < SHARED_CACHE_TTL                  -> HIT
+  * < TTL + SHARED_CACHE_SWR            -> STALE döner, arka planda (node'lar arası kilitle
+                                           tek kez) yeniden doldurulur
+  * < TTL + SHARED_CACHE_STALE_IF_ERROR -> yeniden hesaplanır; hata/5xx olursa eski yanıt döner
+Admin yazmaları (app.core.changes) etkilenen etiketleri siler; None olayı her şeyi boşaltır.
+"""
+import asyncio
+import json
+import logging
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import (
+    SHARED_CACHE_COMPRESS_MIN, SHARED_CACHE_PREFIX, SHARED_CACHE_STALE_IF_ERROR, SHARED_CACHE_SWR,
+    SHARED_CACHE_TTL, SHARED_CACHE_URL,
+)
+from app.core.cdn import change_tags, response_tags
+from app.core.metrics import cache_result, registry
+from app.core.singleflight import CapturedResponse, SingleFlight, capture
+
+log = logging.getLogger(__name__)
+
+REVALIDATE_LOCK_SECONDS = 30
+BACKEND_TIMEOUT = 0.25  # önbellek yavaşsa beklemeden DB'ye git
+
+# Paylaşılan önbelleğe alınan public okumalar (handler'lar ayrıca etiketlemeli)
+_CACHED_PREFIXES = ("/menu", "/categories", "/page/", "/contents/")
+
+SHARED_CACHE_RESPONSES = registry.counter(
+    "shared_cache_responses_total", "Responses by shared cache outcome",
+    ("result",))  # hit | stale | miss | stale_if_error
+
+
+# ---- kayıt biçimi ----
+def encode_entry(res: CapturedResponse, tags: Iterable[str], created: float) -> bytes:
+    meta = {
+        "s": res.status,
+        "h": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in res.headers],
+        "t": created,
+        "g": sorted(tags),
+    }
+    blob = json.dumps(meta, separators=(",", ":")).encode() + b"\n" + res.body
+    if len(blob) >= SHARED_CACHE_COMPRESS_MIN:
+        return b"z" + zlib.compress(blob, 6)
+    return b"r" + blob
+
+
+def decode_entry(raw: bytes) -> Tuple[CapturedResponse, float]:
+    blob = zlib.decompress(raw[1:]) if raw[:1] == b"z" else raw[1:]
+    head, _, body = blob.partition(b"\n")
+    meta = json.loads(head)
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in meta["h"]]
+    return CapturedResponse(meta["s"], headers, body), meta["t"]
+
+
+# ---- arka uçlar ----
+class MemoryBackend:
+    """Redis'in burada kullanılan alt kümesinin süreç içi karşılığı (memory://)."""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+        self._sets: Dict[str, Set[str]] = {}
+
+    def _live(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item[1]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str]) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        for t in tags:
+            self._sets.setdefault(t, set()).add(key)
+
+    async def lock(self, key: str, ttl: int) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._data[key] = (time.monotonic() + ttl, b"1")
+        return True
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for t in tags:
+            for key in self._sets.pop(t, ()):
+                self._data.pop(key, None)
+
+    async def flush(self, prefix: str) -> None:
+        self._data = {k: v for k, v in self._data.items() if not k.startswith(prefix)}
+        self._sets = {k: v for k, v in self._sets.items() if not k.startswith(prefix)}
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # isteğe bağlı bağımlılık: yalnızca redis:// ile yüklenir
+
+        self._r = redis.from_url(url, socket_timeout=BACKEND_TIMEOUT, socket_connect_timeout=BACKEND_TIMEOUT)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._r.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int, tags: Iterable[str]) -> None:
+        async with self._r.pipeline(transaction=False) as p:
+            p.set(key, value, ex=ttl)
+            for t in tags:
+                p.sadd(t, key)
+                p.expire(t, ttl)  # tüm kayıtların TTL'i aynı: son yazma en uzun ömürlüdür
+            await p.execute()
+
+    async def lock(self, key: str, ttl: int) -> bool:
+        return bool(await self._r.set(key, b"1", nx=True, ex=ttl))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        async with self._r.pipeline(transaction=False) as p:
+            for t in tags:
+                p.smembers(t)
+            members = await p.execute()
+        keys = [k for m in members for k in m] + tags
+        if keys:
+            await self._r.unlink(*keys)
+
+    async def flush(self, prefix: str) -> None:
+        batch: List[bytes] = []
+        async for key in self._r.scan_iter(match=prefix + "*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self._r.unlink(*batch)
+                batch = []
+        if batch:
+            await self._r.unlink(*batch)
+
+    async def close(self) -> None:
+        await self._r.aclose()
+
+
+def _backend(url: str):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    return RedisBackend(url)
+
+
+class SharedCache:
+    def __init__(self, url: str, prefix: str = SHARED_CACHE_PREFIX, ttl: int = SHARED_CACHE_TTL,
+                 swr: int = SHARED_CACHE_SWR, stale_if_error: int = SHARED_CACHE_STALE_IF_ERROR):
+        self.url = url
+        self.prefix = prefix
+        self.ttl = ttl
+        self.swr = swr
+        self.stale_if_error = stale_if_error
+        self._backend = None
+        self._flights = SingleFlight("shared_cache")
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = _backend(self.url)
+        return self._backend
+
+    def _key(self, scope) -> str:
+        host = next((v for k, v in scope.get("headers", ()) if k == b"host"), b"").decode("latin-1")
+        qs = scope.get("query_string", b"").decode("latin-1")
+        return f"{self.prefix}r:{scope['scheme']}://{host}{scope['path']}?{qs}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}t:{tag}"
+
+    async def _call(self, coro, default=None):
+        # Önbellek hatası isteği asla düşürmez
+        try:
+            return await asyncio.wait_for(coro, BACKEND_TIMEOUT * 4)
+        except Exception as e:
+            log.warning("shared cache unavailable: %s", e)
+            return default
+
+    async def lookup(self, key: str) -> Optional[Tuple[CapturedResponse, float]]:
+        raw = await self._call(self.backend.get(key))
+        if raw is None:
+            return None
+        try:
+            return decode_entry(raw)
+        except Exception:
+            return None
+
+    async def fill(self, app, scope, key: str) -> CapturedResponse:
+        res = await capture(app, scope)
+        tags = response_tags(res.headers)
+        if res.status == 200 and tags:
+            entry = encode_entry(res, tags, time.time())
+            await self._call(self.backend.set(
+                key, entry, self.ttl + max(self.swr, self.stale_if_error),
+                [self._tag_key(t) for t in tags]))
+        return res
+
+    def revalidate(self, app, scope, key: str) -> None:
+        async def run():
+            try:
+                if await self._call(self.backend.lock(f"{key}#lock", REVALIDATE_LOCK_SECONDS), False):
+                    await self._flights.do(key, lambda: self.fill(app, scope, key))
+            except Exception:
+                log.exception("shared cache revalidation failed for %s", key)
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ---- geçersiz kılma (app.core.changes abonesi) ----
+    def on_change(self, change) -> None:
+        if not self.enabled:
+            return
+        if change is None:
+            coro = self._call(self.backend.flush(self.prefix))
+        else:
+            coro = self._call(self.backend.invalidate([self._tag_key(t) for t in change_tags(change)]))
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self) -> None:
+        for t in list(self._tasks):
+            t.cancel()
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+
+shared_cache = SharedCache(SHARED_CACHE_URL)
+
+
+def _cache_headers(state: str, age: float):
+    return ((b"x-cache", state.encode()), (b"age", str(int(age)).encode()))
+
+
+class SharedCacheMiddleware:
+    def __init__(self, app, cache: SharedCache = shared_cache):
+        self.app = app
+        self.cache = cache
+
+    def _cacheable(self, scope) -> bool:
+        if scope["method"] != "GET" or not scope["path"].startswith(_CACHED_PREFIXES):
+            return False
+        return not any(k in (b"authorization", b"cookie") for k, _ in scope.get("headers", ()))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if not self.cache.enabled or not self._cacheable(scope):
+            return await self.app(scope, receive, send)
+
+        cache = self.cache
+        key = cache._key(scope)
+        found = await cache.lookup(key)
+        age = None
+        if found is not None:
+            res, created = found
+            age = max(0.0, time.time() - created)
+            if age < cache.ttl:
+                cache_result("shared", True)
+                SHARED_CACHE_RESPONSES.inc("hit")
+                return await res.replay(scope, send, _cache_headers("HIT", age))
+            if age < cache.ttl + cache.swr:
+                cache.revalidate(self.app, scope, key)
+                cache_result("shared", True)
+                SHARED_CACHE_RESPONSES.inc("stale")
+                return await res.replay(scope, send, _cache_headers("STALE", age))
+
+        cache_result("shared", False)
+        can_fallback = found is not None and age < cache.ttl + cache.stale_if_error
+        try:
+            fresh = await cache._flights.do(key, lambda: cache.fill(self.app, scope, key))
+        except Exception as e:
+            if not can_fallback:
+                raise
+            log.warning("serving stale response for %s: %s", scope["path"], e)
+            fresh = None
+        if fresh is None or (fresh.status >= 500 and can_fallback):
+            SHARED_CACHE_RESPONSES.inc("stale_if_error")
+            return await found[0].replay(scope, send, _cache_headers("STALE-IF-ERROR", age))
+        SHARED_CACHE_RESPONSES.inc("miss")
+        await fresh.replay(scope, send, _cache_headers("MISS", 0.0))
+
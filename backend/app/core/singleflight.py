@@ -0,0 +1,147 @@
+# app/core/singleflight.py
+"""Aynı anda gelen özdeş public okumaları tek DB çağrısında birleştirme (single-flight).
+
+Aynı anahtarla (route + parametreler) eşzamanlı gelen çağrılardan ilki işi ayrı bir
+task'ta başlatır, diğerleri aynı sonucu bekler; iş bitince anahtar silinir (bu bir önbellek
+değildir, yalnızca uçuştaki çağrıları paylaşır). Bekleyenler `asyncio.shield` ile bekler:
+bir istemcinin bağlantıyı kesmesi ortak işi iptal etmez; son bekleyen de iptal edilirse
+(ör. hepsi bağlantıyı kesti, app.core.cancellation) iş de iptal edilir.
+
+SingleFlightMiddleware bunu public GET'lere uygular ve yanıtı serileştirilmiş hâliyle
+(status, başlıklar, gövde) paylaşır; böylece JSON/pydantic serileştirme de bir kez yapılır.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from app.core.config import SINGLEFLIGHT_ENABLED
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+# Yanıtı route/parametre dışında bir şeye bağlı olmayan public okumalar
+_COALESCED_PREFIXES = ("/menu", "/categories", "/page/", "/public/contents", "/contents/", "/search")
+# İstek başına farklı olabilecek yanıtlar (kimlik, koşullu istek, aralık)
+_PRIVATE_HEADERS = (b"authorization", b"cookie", b"range", b"if-none-match", b"if-modified-since")
+
+SINGLEFLIGHT_CALLS = registry.counter(
+    "singleflight_calls_total", "Coalescable calls by role (leader runs, shared waits)", ("group", "role"))
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiting: Dict[asyncio.Task, int] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # tüm bekleyenler ayrıldıysa "exception was never retrieved" uyarısını bastır
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            SINGLEFLIGHT_CALLS.inc(self.name, "leader")
+        else:
+            SINGLEFLIGHT_CALLS.inc(self.name, "shared")
+        self._waiting[task] = self._waiting.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiting[task] == 1 and not task.done():
+                task.cancel()  # bu sonucu bekleyen kimse kalmadı
+            raise
+        finally:
+            left = self._waiting.pop(task) - 1
+            if left:
+                self._waiting[task] = left
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for k, v in scope.get("headers", ()):
+        if k == name:
+            return v
+    return None
+
+
+def coalesce_key(scope) -> Optional[Tuple]:
+    """Birleştirilebilir istek ise anahtar, değilse None."""
+    if scope["method"] != "GET" or not scope["path"].startswith(_COALESCED_PREFIXES):
+        return None
+    if any(k in _PRIVATE_HEADERS for k, _ in scope.get("headers", ())):
+        return None
+    # Host/şema: görsel URL'leri istek host'una göre mutlak yapılır (_abs_url)
+    return (scope["scheme"], _header(scope, b"host"), scope["path"], scope.get("query_string", b""))
+
+
+http_flights = SingleFlight("http")
+registry.gauge("singleflight_in_flight", "Distinct coalesced HTTP reads currently running",
+               fn=lambda: http_flights.in_flight)
+
+
+class CapturedResponse:
+    __slots__ = ("status", "headers", "body", "labels")
+
+    def __init__(self, status: int = 500, headers: Optional[List[Tuple[bytes, bytes]]] = None,
+                 body: bytes = b""):
+        self.status = status
+        self.headers: List[Tuple[bytes, bytes]] = headers or []
+        self.body = body
+        self.labels: Dict[str, object] = {}
+
+    async def replay(self, scope, send, extra_headers=()) -> None:
+        scope.update(self.labels)  # MetricsMiddleware route etiketi için
+        await send({"type": "http.response.start", "status": self.status,
+                    "headers": [*self.headers, *extra_headers]})
+        await send({"type": "http.response.body", "body": self.body})
+
+
+async def capture(app, scope) -> CapturedResponse:
+    """GET isteğini istemcinin receive/send'inden bağımsız çalıştırıp yanıtı belleğe alır."""
+    inner = dict(scope)
+    out = CapturedResponse()
+    chunks: List[bytes] = []
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # disconnect hiç gelmez; iş bitince iptal edilir
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out.status = message["status"]
+            out.headers = list(message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(inner, receive, send)
+    out.body = b"".join(chunks)
+    out.labels = {k: inner[k] for k in ("route", "metrics_route") if k in inner}
+    return out
+
+
+class SingleFlightMiddleware:
+    def __init__(self, app, enabled: bool = SINGLEFLIGHT_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        key = coalesce_key(scope) if self.enabled and scope["type"] == "http" else None
+        if key is None:
+            return await self.app(scope, receive, send)
+
+        # İlk istemcinin bağlantısına bağlı değil: o ayrılsa da tamamlanır
+        res = await http_flights.do(key, lambda: capture(self.app, scope))
+        await res.replay(scope, send)
+
@@ -0,0 +1,308 @@
+# app/core/snapshot.py
+"""Public ağacın önceden render edilmiş JSON snapshot'ı.
+
+Düzen: <ABS_SNAPSHOT_DIR>/<versiyon>/<istek yolu>.json ve aktif versiyonu gösteren
+CURRENT dosyası (os.replace ile atomik değişir). Örn. /page/a/b/c -> page/a/b/c.json;
+handler'ın surrogate key'leri yanındaki page/a/b/c.keys dosyasında tutulur ki snapshot
+yanıtları da DB yanıtlarıyla aynı etiketlerle (CDN purge) işaretlensin.
+Snapshot'ta olmayan yollar normal şekilde DB'den servis edilir.
+
+Üretim ve artımlı yenileme <ABS_SNAPSHOT_DIR>/.lock üzerinde özel flock altında, her zaman
+yeni bir versiyon klasörüne yapılır (değişmeyen dosyalar canlı versiyondan hardlink'le
+alınır); canlı versiyon hiç değiştirilmez, yalnızca CURRENT çevrilir. Yenilemeyi yazmayı
+yapan süreç tetikler (main.py'de local_only abone): her yazma bir kez işlenir. Birden çok
+node aynı snapshot'ı servis ediyorsa klasör paylaşımlı olmalıdır (uploads gibi).
+
+Kullanım:
+    python -m app.core.snapshot build   # tam snapshot üret ve yayınla
+    python -m app.core.snapshot drop    # snapshot'ı devre dışı bırak
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.core.config import ABS_SNAPSHOT_DIR
+from app.core.jobs import jobs
+from app.core.metrics import cache_result
+from app.schemas import CategoryPublic, HeadingPublic, MenuNode, PageOut
+
+log = logging.getLogger(__name__)
+
+KEEP_VERSIONS = 3
+REFRESH_DELAY = 0.5  # ardışık admin yazmalarını tek yenilemede topla
+
+# Snapshot'tan servis edilebilen public GET yolları
+_SERVABLE = re.compile(
+    r"^/(menu|categories"
+    r"|categories/[a-z0-9-]+/headings"
+    r"|categories/[a-z0-9-]+/[a-z0-9-]+/headings"
+    r"|page/[a-z0-9-]+/[a-z0-9-]+/[a-z0-9-]+)$"
+)
+
+_categories_json = TypeAdapter(List[CategoryPublic])
+_headings_json = TypeAdapter(List[HeadingPublic])
+_menu_json = TypeAdapter(List[MenuNode])
+_page_json = TypeAdapter(PageOut)
+
+# Değişen kaydın (şu anki) kategori slug'ı
+_CATEGORY_SLUG_OF = {
+    "category": "SELECT c.slug FROM category c WHERE c.id = :id",
+    "heading": """
+        SELECT c.slug FROM heading h
+        LEFT JOIN heading p ON p.id = h.parent_heading_id
+        JOIN category c ON c.id = COALESCE(h.category_id, p.category_id)
+        WHERE h.id = :id
+    """,
+    "content": """
+        SELECT c.slug FROM content ct
+        JOIN heading h ON h.id = ct.heading_id
+        LEFT JOIN heading p ON p.id = h.parent_heading_id
+        JOIN category c ON c.id = COALESCE(h.category_id, p.category_id)
+        WHERE ct.id = :id
+    """,
+    "content_image": """
+        SELECT c.slug FROM content_image ci
+        JOIN content ct ON ct.id = ci.content_id
+        JOIN heading h ON h.id = ct.heading_id
+        LEFT JOIN heading p ON p.id = h.parent_heading_id
+        JOIN category c ON c.id = COALESCE(h.category_id, p.category_id)
+        WHERE ci.id = :id
+    """,
+}
+
+
+_FULL = ("*", None)
+
+
+@dataclass
+class SnapshotHit:
+    body: bytes
+    version: str
+    tags: List[str]
+
+
+def _rows(rows) -> list:
+    return [dict(r) for r in rows]
+
+
+def _write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _dump(out: Path, rel: str, adapter: TypeAdapter, data, response: Response) -> None:
+    _write(out / f"{rel}.json", adapter.dump_json(adapter.validate_python(data)))
+    _write(out / f"{rel}.keys", response.headers.get("surrogate-key", "").encode())
+
+
+class SnapshotStore:
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._pointer = self.root / "CURRENT"
+        self._current: Optional[str] = None
+        self._pointer_mtime: Optional[float] = None
+        self._pending: set[tuple[str, object]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- okuma ----
+    def current(self) -> Optional[str]:
+        try:
+            mtime = self._pointer.stat().st_mtime
+        except FileNotFoundError:
+            self._current = self._pointer_mtime = None
+            return None
+        if mtime != self._pointer_mtime:
+            self._current = self._pointer.read_text().strip() or None
+            self._pointer_mtime = mtime
+        return self._current
+
+    def lookup(self, path: str) -> Optional[SnapshotHit]:
+        if not _SERVABLE.match(path):
+            return None
+        version = self.current()
+        if not version:
+            return None
+        base = self.root / version / path.strip("/")
+        try:
+            body = base.with_name(base.name + ".json").read_bytes()
+            tags = base.with_name(base.name + ".keys").read_text().split()
+        except (FileNotFoundError, NotADirectoryError):
+            cache_result("snapshot", False)
+            return None
+        cache_result("snapshot", True)
+        return SnapshotHit(body=body, version=version, tags=tags)
+
+    # ---- üretim ----
+    @asynccontextmanager
+    async def _exclusive(self):
+        # Tüm süreçler arasında tek üretici (aynı süreçteki eşzamanlı çağrılar da sıraya girer)
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # kilidi de bırakır
+
+    async def _publish(self, render) -> str:
+        """Yeni versiyon klasörüne `render(out)` ile yazar, sonra CURRENT'i ona çevirir."""
+        version = f"v{time.time_ns()}"
+        out = self.root / version
+        try:
+            await render(out)
+        except BaseException:
+            shutil.rmtree(out, ignore_errors=True)
+            raise
+        _write(self._pointer, version.encode())
+        self._prune_versions(version)
+        return version
+
+    async def _render_globals(self, out: Path) -> List[str]:
+        from app.routers import public as pub
+
+        # Response: handler'ların tag_response ile koyduğu surrogate key'leri yakalamak için
+        response = Response()
+        cats = _rows(await pub.list_categories(response=response))
+        _dump(out, "categories", _categories_json, cats, response)
+        response = Response()
+        menu = await pub.menu(response=response)
+        _dump(out, "menu", _menu_json, menu, response)
+        return [c["slug"] for c in cats]
+
+    async def _render_category(self, out: Path, cat: str) -> None:
+        from app.routers import public as pub
+
+        response = Response()
+        h1s = _rows(await pub.list_h1_headings(cat, response=response))
+        _dump(out, f"categories/{cat}/headings", _headings_json, h1s, response)
+        for h1 in h1s:
+            response = Response()
+            h2s = _rows(await pub.list_h2_under_h1(cat, h1["slug"], response=response))
+            _dump(out, f"categories/{cat}/{h1['slug']}/headings", _headings_json, h2s, response)
+            for h2 in h2s:
+                response = Response()
+                page = dict(await pub.get_page(cat, h1["slug"], h2["slug"], response=response))
+                _dump(out, f"page/{cat}/{h1['slug']}/{h2['slug']}", _page_json, page, response)
+
+    async def build(self) -> str:
+        """Tam snapshot üretir, CURRENT'i atomik olarak yeni versiyona çevirir."""
+        async def render(out: Path) -> None:
+            out.mkdir(parents=True, exist_ok=False)
+            for cat in await self._render_globals(out):
+                await self._render_category(out, cat)
+
+        async with self._exclusive():
+            return await self._publish(render)
+
+    def drop(self) -> None:
+        self._pointer.unlink(missing_ok=True)
+
+    def _prune_versions(self, keep: str) -> None:
+        versions = sorted(
+            p for p in self.root.iterdir()
+            if p.is_dir() and p.name.startswith("v") and p.name != keep
+        )
+        for old in versions[: max(0, len(versions) - (KEEP_VERSIONS - 1))]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    # ---- artımlı yenileme (app.core.changes abonesi) ----
+    def on_change(self, change) -> None:
+        """Etkilenen kategori alt ağacını arka planda yeniler; None ya da ebeveynsiz silme -> tam build."""
+        if change is None:
+            self._schedule(_FULL)
+        elif change.parent_entity:
+            # Ebeveyn silme sonrası da çözülebilir; tek kategori için toplanır
+            self._schedule((change.parent_entity, change.parent_id))
+        elif change.op == "delete":
+            self._schedule(_FULL)
+        else:
+            self._schedule((change.entity, change.id))
+
+    def _schedule(self, key) -> None:
+        if not self.current():
+            return
+        self._pending.add(key)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_pending())
+
+    async def _refresh_pending(self) -> None:
+        from app.db.session import fetch_one
+
+        await asyncio.sleep(REFRESH_DELAY)
+        while self._pending:
+            pending, self._pending = self._pending, set()
+            try:
+                slugs: set[str] = set()
+                full = _FULL in pending
+                for entity, id in ([] if full else pending):
+                    row = await fetch_one(_CATEGORY_SLUG_OF[entity], {"id": id})
+                    if row is None:
+                        full = True  # kayıt silinmiş: nereyi etkilediği bilinmiyor
+                        break
+                    slugs.add(row["slug"])
+                if full:
+                    await self.build()
+                else:
+                    await self._refresh_categories(slugs)
+            except Exception:
+                # Snapshot eskide kalır; bir sonraki yazma/build tekrar dener
+                log.exception("snapshot refresh failed")
+
+    async def _refresh_categories(self, slugs: set[str]) -> None:
+        async def render(out: Path) -> None:
+            # Değişmeyen kategoriler canlı versiyondan hardlink; _write dosyayı os.replace ile
+            # değiştirdiği için canlı versiyonun inode'larına hiç yazılmaz
+            await asyncio.to_thread(shutil.copytree, self.root / live, out, copy_function=os.link)
+            visible = set(await self._render_globals(out))
+            for cat in slugs & visible:
+                for part in ("categories", "page"):
+                    shutil.rmtree(out / part / cat, ignore_errors=True)
+                await self._render_category(out, cat)
+            # Görünmez olan / slug'ı değişen kategorilerin eski dosyalarını temizle
+            for part in ("categories", "page"):
+                base = out / part
+                if base.is_dir():
+                    for d in base.iterdir():
+                        if d.is_dir() and d.name not in visible:
+                            shutil.rmtree(d, ignore_errors=True)
+
+        async with self._exclusive():
+            # Kilidi bekleyen süreçler de bir öncekinin yayınladığı versiyondan devam eder
+            live = self.current()
+            if not live:
+                return
+            await self._publish(render)
+
+
+snapshots = SnapshotStore(ABS_SNAPSHOT_DIR)
+
+
+@jobs.handler("snapshot.build")
+async def _build_job(payload: dict):
+    return {"version": await snapshots.build()}
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if cmd == "build":
+        print(json.dumps({"version": asyncio.run(snapshots.build())}))
+    elif cmd == "drop":
+        snapshots.drop()
+    else:
+        raise SystemExit("usage: python -m app.core.snapshot [build|drop]")
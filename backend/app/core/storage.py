@@ -1,23 +1,121 @@
+import asyncio
+import base64
+import io
+import os
 import uuid
 from pathlib import Path
-from typing import Tuple
+from typing import NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
 from fastapi import UploadFile
-from PIL import Image
 from app.core.config import settings, ABS_UPLOADS_DIR
 
+_EXT = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+# LQIP: en uzun kenarı bu kadar piksel olan küçük WebP (data URI, tipik olarak < 300 bayt)
+PLACEHOLDER_SIZE = 16
+
+
+class SavedImage(NamedTuple):
+    path: str
+    url: str
+    width: int
+    height: int
+    placeholder: str     # data:image/webp;base64,... (frontend bulanık arka plan olarak çizer)
+    dominant_color: str  # "#rrggbb"
+
+
+class ImageTooLarge(ValueError):
+    pass
+
+
+def image_metadata(abs_path: Path, max_pixels: Optional[int] = None) -> Tuple[int, int, str, str]:
+    """(genişlik, yükseklik, placeholder, baskın renk).
+
+    Ölçüler ve EXIF yönü başlıktan okunur; piksel sayısı IMAGE_MAX_PIXELS'i aşan görsel
+    çözülmeden ImageTooLarge ile reddedilir. Placeholder için görüntü küçültülerek çözülür
+    (JPEG: DCT draft, diğerleri: kendi modunda reduce); RGBA'ya yalnızca küçük hâli çevrilir.
+    """
+    from PIL import Image, ImageOps
+
+    max_pixels = settings.IMAGE_MAX_PIXELS if max_pixels is None else max_pixels
+    with Image.open(abs_path) as im:
+        width, height = im.size
+        if width * height > max_pixels:
+            raise ImageTooLarge(f"Image too large ({width}x{height} px)")
+        # EXIF yönü 90/270 ise görüntülenen boyut yer değiştirir
+        if im.getexif().get(0x0112) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEG'i tam çözmeden ölçekli oku (1/8'e kadar); diğer biçimlerde etkisiz
+        im.draft("RGB", (PLACEHOLDER_SIZE * 8, PLACEHOLDER_SIZE * 8))
+        factor = max(1, min(im.size) // (PLACEHOLDER_SIZE * 4))
+        if factor == 1:
+            small = im.copy()
+        elif im.mode in ("P", "1") or im.mode.startswith("I;"):
+            # reduce() bu modları desteklemiyor; tam boy RGBA kopyası yerine en yakın komşu
+            small = im.resize((im.width // factor, im.height // factor), Image.Resampling.NEAREST)
+        else:
+            small = im.reduce(factor)
+    small = ImageOps.exif_transpose(small.convert("RGBA"))
+    small.thumbnail((PLACEHOLDER_SIZE * 2, PLACEHOLDER_SIZE * 2), Image.Resampling.BOX)
+
+    # Baskın renk: saydam olmayan piksellerin 5 renge indirgenmiş hâlinde en sık görülen
+    opaque = Image.new("RGB", small.size, (255, 255, 255))
+    opaque.paste(small, mask=small.getchannel("A"))
+    q = opaque.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    palette = q.getpalette()
+    _, idx = max(q.getcolors())
+    r, g, b = palette[idx * 3: idx * 3 + 3]
+
+    small.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    buf = io.BytesIO()
+    small.save(buf, "WEBP", quality=40, method=4)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+    return width, height, placeholder, f"#{r:02x}{g:02x}{b:02x}"
+
+
 def _allowed_mimes() -> set[str]:
     return set(x.strip() for x in settings.ALLOWED_MIME.split(",") if x.strip())
 
+def upload_name(url: str) -> Optional[str]:
+    """content_image.url -> uploads/ altındaki dosya adı; yerel upload değilse None.
+
+    Host'a bakılmaz: admin arayüzü `_abs_url`'in döndürdüğü http://<host>/api/static/...
+    biçimini de kaydedebilir. DDL'deki upload_name() ile aynı kural.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("", "http", "https"):
+        return None  # s3:// vb.
+    prefix = settings.STATIC_MOUNT_PATH.rstrip("/") + "/"
+    path = parsed.path
+    if path.startswith("/api" + prefix):
+        path = path[len("/api"):]
+    if not path.startswith(prefix):
+        return None
+    name = path[len(prefix):]
+    if not name or "/" in name or "\\" in name or name.startswith("."):
+        return None
+    return name
+
+
+def local_upload_path(url: str) -> Optional[Path]:
+    """content_image.url -> ABS_UPLOADS_DIR altındaki dosya; yerel upload değilse None."""
+    name = upload_name(url)
+    return None if name is None else Path(ABS_UPLOADS_DIR) / name
+
 class LocalStorage:
     def __init__(self, base_dir: str | None = None, public_base_url: str | None = None):
-        # Mutlak klasörü kullan
+        # Mutlak klasörü kullan (import sırasında yan etki yok: klasör lifespan'de / ilk kayıtta açılır)
         self.base_dir = Path(base_dir or ABS_UPLOADS_DIR)
-        self.base_dir.mkdir(parents=True, exist_ok=True)
         self.public_base_url = (public_base_url or settings.STATIC_BASE_URL).rstrip("/")
         self.allowed = _allowed_mimes()
         self.max_bytes = settings.MAX_UPLOAD_BYTES
 
-    async def save_image(self, file: UploadFile) -> Tuple[str, str]:
+    async def save_image(self, file: UploadFile) -> SavedImage:
         if file.content_type not in self.allowed:
             raise ValueError("Unsupported file type")
 
@@ -33,28 +131,47 @@ class LocalStorage:
                 raise ValueError("File too large")
             chunks.append(chunk)
 
-        ext = {
-            "image/jpeg": ".jpg",
-            "image/png": ".png",
-            "image/webp": ".webp",
-            "image/gif": ".gif",
-        }.get(file.content_type, "")
-
-        fname = f"{uuid.uuid4().hex}{ext}"
+        fname = f"{uuid.uuid4().hex}{_EXT.get(file.content_type, '')}"
         abs_path = self.base_dir / fname
+        # Disk yazması ve Pillow doğrulaması thread'de: toplu upload'da dosyalar paralel işlenir
+        return await asyncio.to_thread(self._write_verified, abs_path, chunks)
+
+    def _write_verified(self, abs_path: Path, chunks: list[bytes]) -> SavedImage:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
         with open(abs_path, "wb") as f:
             for ch in chunks:
                 f.write(ch)
+        return self._verified(abs_path)
+
+    def adopt_file(self, src: Path, content_type: str, max_bytes: int) -> SavedImage:
+        """Diskte hazır bir dosyayı (ör. resumable upload) aynı kontrollerle uploads'a taşır."""
+        if content_type not in self.allowed:
+            raise ValueError("Unsupported file type")
+        if src.stat().st_size > max_bytes:
+            raise ValueError("File too large")
+        fname = f"{uuid.uuid4().hex}{_EXT.get(content_type, '')}"
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        abs_path = self.base_dir / fname
+        os.replace(src, abs_path)
+        return self._verified(abs_path)
+
+    def _verified(self, abs_path: Path) -> SavedImage:
+        # Gerçek görsel mi? (Pillow ağır: ilk yüklemede import edilir)
+        from PIL import Image
 
-        # Gerçek görsel mi?
         try:
             with Image.open(abs_path) as im:
                 im.verify()
+            # verify() sonrası görüntü kullanılamaz: ölçüler/placeholder için yeniden açılır
+            meta = image_metadata(abs_path)
+        except ImageTooLarge:
+            abs_path.unlink(missing_ok=True)
+            raise
         except Exception:
             abs_path.unlink(missing_ok=True)
             raise ValueError("Invalid image file")
 
         # Kayıtlara mutlak domain yerine relatif yol yazalım.
         # Böylece dış ortam (ngrok, prod) altında doğru domain ile servis edilir.
-        public_url = f"{settings.STATIC_MOUNT_PATH}/{fname}"
-        return str(abs_path), public_url
+        public_url = f"{settings.STATIC_MOUNT_PATH}/{abs_path.name}"
+        return SavedImage(str(abs_path), public_url, *meta)
@@ -0,0 +1,210 @@
+# app/core/uploads_gc.py
+"""Yetim upload çöp toplayıcı.
+
+İki kaynak:
+  * upload_tombstone: content_image satırı silinince / URL'si değişince (kaskad silmeler
+    dahil) trigger ile aynı transaction'da yazılır; grace süresi dolunca dosya silinir.
+  * Tam tarama (full=True): uploads/ dizini, content_image.url'lerinden akış halinde
+    (id ile sayfalı) toplanan referans kümesiyle karşılaştırılır; hiçbir kayıtta geçmeyen
+    ve grace süresinden eski dosyalar silinir (ör. kaydı yazılamamış yüklemeler).
+
+Dosya hâlâ başka bir content_image tarafından kullanılıyorsa dokunulmaz; karşılaştırma URL'ye
+değil çözümlenmiş dosya adına göredir (DDL upload_name(): /static/x, /api/static/x ve
+http(s)://<herhangi bir host>/(api/)static/x aynı dosyadır). Süresi dolmuş
+resumable upload oturumları (uploads/.partial, app.core.resumable) da her çalışmada silinir.
+
+    python -m app.core.uploads_gc [--dry-run] [--tombstones-only] [--grace SECONDS]
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Set
+
+from sqlalchemy import delete, select
+
+from app.core.config import ABS_UPLOADS_DIR, UPLOADS_GC_GRACE_SECONDS, UPLOADS_GC_INTERVAL_SECONDS
+from app.core.jobs import jobs
+from app.core.metrics import registry
+from app.core.resumable import upload_sessions
+from app.core.storage import local_upload_path, upload_name
+from app.db.models import content_image as t_content_image, upload_tombstone as t_tombstone
+from app.db.session import execute, fetch_all
+
+log = logging.getLogger(__name__)
+
+BATCH = 1000
+
+UPLOADS_RECLAIMED = registry.counter("uploads_gc_reclaimed_bytes_total", "Bytes freed by the uploads GC")
+UPLOADS_DELETED = registry.counter("uploads_gc_deleted_files_total", "Files removed by the uploads GC")
+
+_DUE_TOMBSTONES = """
+    SELECT t.url, EXISTS (
+      SELECT 1 FROM content_image ci WHERE upload_name(ci.url) = upload_name(t.url)
+    ) AS referenced
+    FROM upload_tombstone t
+    WHERE t.deleted_at < now() - make_interval(secs => :grace)
+    ORDER BY t.deleted_at
+    LIMIT :limit
+"""
+
+_RECENT_TOMBSTONES = """
+    SELECT url FROM upload_tombstone WHERE deleted_at >= now() - make_interval(secs => :grace)
+"""
+
+
+@dataclass
+class GCReport:
+    dry_run: bool
+    tombstones: int = 0
+    scanned: int = 0
+    referenced: int = 0
+    orphans: int = 0
+    skipped_recent: int = 0
+    deleted: int = 0
+    reclaimed_bytes: int = 0
+    expired_sessions: int = 0
+    seconds: float = 0.0
+
+
+def _unlink(paths: List[Path], dry_run: bool) -> tuple[int, int]:
+    deleted = reclaimed = 0
+    for p in paths:
+        try:
+            size = p.stat().st_size
+            if not dry_run:
+                p.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            log.warning("uploads GC could not remove %s: %s", p, e)
+            continue
+        deleted += 1
+        reclaimed += size
+    return deleted, reclaimed
+
+
+async def _collect_tombstones(report: GCReport, grace: float) -> None:
+    while True:
+        rows = await fetch_all(_DUE_TOMBSTONES, {"grace": grace, "limit": BATCH})
+        if not rows:
+            return
+        paths = [p for r in rows if not r["referenced"] and (p := local_upload_path(r["url"]))]
+        deleted, reclaimed = await asyncio.to_thread(_unlink, paths, report.dry_run)
+        report.tombstones += len(rows)
+        report.deleted += deleted
+        report.reclaimed_bytes += reclaimed
+        if report.dry_run:
+            return  # tombstone'lar silinmediği için aynı sayfa tekrar gelir
+        await execute(delete(t_tombstone).where(t_tombstone.c.url.in_([r["url"] for r in rows])))
+
+
+async def _referenced_names() -> Set[str]:
+    names: Set[str] = set()
+    last = None
+    while True:
+        stmt = select(t_content_image.c.id, t_content_image.c.url).order_by(t_content_image.c.id).limit(BATCH)
+        if last is not None:
+            stmt = stmt.where(t_content_image.c.id > last)
+        rows = await fetch_all(stmt)
+        if not rows:
+            return names
+        for r in rows:
+            name = upload_name(r["url"])
+            if name is not None:
+                names.add(name)
+        last = rows[-1]["id"]
+
+
+def _scan_batches(root: str):
+    batch: List[os.DirEntry] = []
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False) and not entry.name.startswith("."):
+                batch.append(entry)
+                if len(batch) >= BATCH:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+async def _sweep(report: GCReport, grace: float) -> None:
+    referenced = await _referenced_names()
+    recent = {name for r in await fetch_all(_RECENT_TOMBSTONES, {"grace": grace})
+              if (name := upload_name(r["url"]))}
+    cutoff = time.time() - grace
+
+    def sweep_sync():
+        for batch in _scan_batches(ABS_UPLOADS_DIR):
+            orphans = []
+            for entry in batch:
+                report.scanned += 1
+                if entry.name in referenced:
+                    report.referenced += 1
+                elif entry.stat(follow_symlinks=False).st_mtime > cutoff or entry.name in recent:
+                    report.skipped_recent += 1
+                else:
+                    orphans.append(Path(entry.path))
+            report.orphans += len(orphans)
+            deleted, reclaimed = _unlink(orphans, report.dry_run)
+            report.deleted += deleted
+            report.reclaimed_bytes += reclaimed
+
+    await asyncio.to_thread(sweep_sync)
+
+
+async def collect(full: bool = True, dry_run: bool = False,
+                  grace: float = UPLOADS_GC_GRACE_SECONDS) -> GCReport:
+    t0 = time.perf_counter()
+    report = GCReport(dry_run=dry_run)
+    await _collect_tombstones(report, float(grace))
+    if not dry_run:
+        report.expired_sessions = await asyncio.to_thread(upload_sessions.expire)
+    if full and Path(ABS_UPLOADS_DIR).is_dir():
+        await _sweep(report, float(grace))
+    report.seconds = round(time.perf_counter() - t0, 3)
+    if not dry_run:
+        UPLOADS_DELETED.inc(amount=report.deleted)
+        UPLOADS_RECLAIMED.inc(amount=report.reclaimed_bytes)
+    log.info("uploads GC: %s", asdict(report))
+    return report
+
+
+@jobs.handler("uploads.gc")
+async def _gc_job(payload: dict):
+    report = await collect(
+        full=payload.get("full", True),
+        dry_run=payload.get("dry_run", False),
+        grace=payload.get("grace", UPLOADS_GC_GRACE_SECONDS),
+    )
+    return asdict(report)
+
+
+async def schedule_periodic() -> None:
+    """Lifespan görevi: her aralıkta bir uploads.gc işi (kuyrukta zaten yoksa) ekler."""
+    if UPLOADS_GC_INTERVAL_SECONDS <= 0:
+        return
+    while True:
+        await asyncio.sleep(UPLOADS_GC_INTERVAL_SECONDS)
+        try:
+            await jobs.enqueue("uploads.gc", {"full": True}, unique=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("uploads GC scheduling failed: %s", e)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m app.core.uploads_gc")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--tombstones-only", action="store_true")
+    ap.add_argument("--grace", type=float, default=UPLOADS_GC_GRACE_SECONDS)
+    args = ap.parse_args()
+    result = asyncio.run(collect(full=not args.tombstones_only, dry_run=args.dry_run, grace=args.grace))
+    print(json.dumps(asdict(result), indent=2))
@@ -0,0 +1,79 @@
+# app/core/warmup.py
+"""Worker ısınması ve hazır olma durumu.
+
+Lifespan içinde, worker trafik kabul etmeden önce çalışır: havuzdaki bağlantıları
+önceden açar, sıcak public sorguları her bağlantıda bir kez çalıştırarak asyncpg'nin
+bağlantı başına prepared statement önbelleğini ve PG buffer cache'i doldurur, snapshot
+işaretçisini okur. /healthz bu worker'ın durumunu (pid, ready, süre) döner; böylece
+deploy sonrası soğuk worker'lar yük dengeleyiciden trafik almaz.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import DB_POOL_SIZE
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Readiness:
+    pid: int = 0
+    ready: bool = False
+    warmup_seconds: Optional[float] = None
+    connections: int = 0
+    warmed_queries: int = 0
+    error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+readiness = Readiness()
+
+
+async def _preconnect(n: int) -> int:
+    from app.db.session import engine
+
+    async with AsyncExitStack() as stack:
+        conns = [await stack.enter_async_context(engine.connect()) for _ in range(n)]
+        await asyncio.gather(*(c.execute(text("SELECT 1")) for c in conns))
+        return len(conns)
+
+
+async def _warm_queries(n: int) -> int:
+    from app.core.snapshot import snapshots
+    from app.routers import public as pub
+
+    snapshots.current()
+    hot = (pub.menu, pub.list_categories)
+    for fn in hot:
+        # n eşzamanlı çağrı havuzdaki n bağlantıya dağılır: her biri ifadeyi bir kez prepare eder
+        await asyncio.gather(*(fn() for _ in range(n)))
+    return len(hot)
+
+
+async def warm_up(enabled: bool = True) -> Readiness:
+    # preload_app ile modül master'da import edilir; pid fork sonrası burada alınır
+    readiness.pid = os.getpid()
+    if not enabled:
+        readiness.ready = True
+        return readiness
+
+    t0 = time.perf_counter()
+    try:
+        readiness.connections = await _preconnect(DB_POOL_SIZE)
+        readiness.warmed_queries = await _warm_queries(DB_POOL_SIZE)
+    except Exception as e:
+        # DB'ye ulaşılamıyor: worker yine de açılır, /healthz DB hatasını ayrıca raporlar
+        readiness.error = str(e)
+        log.warning("warm-up failed: %s", e)
+    readiness.warmup_seconds = round(time.perf_counter() - t0, 3)
+    readiness.ready = True
+    return readiness
@@ -0,0 +1,248 @@
+# app/db/explain.py
+"""Yavaş sorgu örnekleyici ve plan raporu.
+
+SLOW_QUERY_EXPLAIN_MS > 0 iken bu eşiği aşan SELECT'ler ayrı bir bağlantıda aynı
+parametrelerle `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` ile yeniden çalıştırılır
+(rollback edilen transaction içinde, statement_timeout ile) ve route/parametrelerle
+birlikte dönen JSONL günlüğüne (SLOW_QUERY_LOG) yazılır. Her fingerprint en fazla
+SLOW_QUERY_EXPLAIN_INTERVAL saniyede bir, aynı anda tek EXPLAIN çalışır.
+
+Rapor (fingerprint başına plan şekilleri; şekil değiştiyse işaretlenir):
+    python -m app.db.explain report [--log PATH] [--top 20] [--json]
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import statistics
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import ABS_SLOW_QUERY_LOG, SLOW_QUERY_EXPLAIN_INTERVAL, SLOW_QUERY_EXPLAIN_MS
+from app.core.metrics import registry, request_scope, route_label
+
+log = logging.getLogger(__name__)
+
+EXPLAIN_TIMEOUT_MS = 10_000
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUPS = 5
+MAX_PARAM_CHARS = 200
+
+# EXPLAIN ANALYZE sorguyu gerçekten çalıştırır: yazma içeren ya da gizli veri okuyan ifadeler hariç
+_UNSAFE = re.compile(r"\b(insert|update|delete|merge|admin_user|pg_notify|nextval)\b", re.I)
+
+EXPLAIN_CAPTURES = registry.counter(
+    "db_explain_captures_total", "Slow statements captured with EXPLAIN ANALYZE", ("fingerprint", "result"))
+
+
+def _param(v):
+    s = v if isinstance(v, (int, float, bool)) or v is None else str(v)
+    if isinstance(s, str) and len(s) > MAX_PARAM_CHARS:
+        return s[:MAX_PARAM_CHARS] + "…"
+    return s
+
+
+def plan_shape(node: dict) -> str:
+    """Düğüm tipi + ilişki/index adlarından oluşan ağaç imzası (maliyetlerden bağımsız)."""
+    label = node.get("Node Type", "?")
+    for key in ("Relation Name", "Index Name", "Join Type"):
+        if key in node:
+            label += f"[{node[key]}]"
+    children = node.get("Plans") or []
+    if children:
+        label += "(" + ",".join(plan_shape(c) for c in children) + ")"
+    return label
+
+
+def _summary(explain: dict) -> dict:
+    plan = explain["Plan"]
+    shape = plan_shape(plan)
+    return {
+        "shape": shape,
+        "shape_hash": hashlib.sha1(shape.encode()).hexdigest()[:10],
+        "root": plan.get("Node Type"),
+        "total_cost": plan.get("Total Cost"),
+        "actual_ms": plan.get("Actual Total Time"),
+        "rows": plan.get("Actual Rows"),
+        "shared_hit": plan.get("Shared Hit Blocks"),
+        "shared_read": plan.get("Shared Read Blocks"),
+        "planning_ms": explain.get("Planning Time"),
+        "execution_ms": explain.get("Execution Time"),
+    }
+
+
+class ExplainSampler:
+    def __init__(self, threshold_ms: int, interval: int, path: str):
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.path = Path(path)
+        self._last: dict[str, float] = {}
+        self._busy = False
+        self._out: Optional[logging.Logger] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def _writer(self) -> logging.Logger:
+        if self._out is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            out = logging.getLogger("app.slow_queries")
+            out.propagate = False
+            out.setLevel(logging.INFO)
+            handler = RotatingFileHandler(self.path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                          encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            out.addHandler(handler)
+            self._out = out
+        return self._out
+
+    def observe(self, statement: str, parameters, elapsed: float, fp: str, op: str) -> None:
+        """after_cursor_execute'tan çağrılır; senkron ve ucuz kalmalı (asıl iş arka planda)."""
+        if elapsed * 1000 < self.threshold_ms or op not in ("SELECT", "CTE") or _UNSAFE.search(statement):
+            return
+        now = time.monotonic()
+        if self._busy or now - self._last.get(fp, float("-inf")) < self.interval:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._last[fp] = now
+        self._busy = True
+        scope = request_scope.get()
+        route = f"{scope['method']} {route_label(scope)}" if scope else None
+        loop.create_task(self._capture(statement, tuple(parameters or ()), elapsed, fp, route))
+
+    async def _capture(self, statement: str, params: tuple, elapsed: float, fp: str,
+                       route: Optional[str]) -> None:
+        from app.db.session import engine
+
+        try:
+            async with engine.connect() as conn:
+                # Sürücü bağlantısı: SQLAlchemy event'leri (ve bu örnekleyici) tekrar tetiklenmez
+                driver = (await conn.get_raw_connection()).driver_connection
+                tr = driver.transaction()
+                await tr.start()
+                try:
+                    await driver.execute(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}")
+                    raw = await driver.fetchval(
+                        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, *params)
+                finally:
+                    await tr.rollback()
+            explain = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            record = {
+                "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "fingerprint": fp,
+                "route": route,
+                "duration_ms": round(elapsed * 1000, 2),
+                "params": [_param(p) for p in params],
+                "sql": re.sub(r"\s+", " ", statement).strip(),
+                **_summary(explain),
+                "plan": explain,
+            }
+            self._writer().info(json.dumps(record, default=str, ensure_ascii=False))
+            EXPLAIN_CAPTURES.inc(fp, "ok")
+        except Exception as e:
+            EXPLAIN_CAPTURES.inc(fp, "error")
+            log.warning("EXPLAIN capture failed for %s: %s", fp, e)
+        finally:
+            self._busy = False
+
+
+sampler = ExplainSampler(SLOW_QUERY_EXPLAIN_MS, SLOW_QUERY_EXPLAIN_INTERVAL, ABS_SLOW_QUERY_LOG)
+
+
+# ---- rapor ----
+def _read(path: Path):
+    files = [path.with_name(f"{path.name}.{i}") for i in range(LOG_BACKUPS, 0, -1)] + [path]
+    for f in files:
+        if not f.exists():
+            continue
+        with f.open(encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def build_report(records) -> list:
+    groups: dict[str, dict] = {}
+    for r in sorted(records, key=lambda r: r["ts"]):
+        g = groups.setdefault(r["fingerprint"], {
+            "fingerprint": r["fingerprint"], "sql": r["sql"][:200], "routes": set(),
+            "durations": [], "shapes": {},
+        })
+        if r.get("route"):
+            g["routes"].add(r["route"])
+        g["durations"].append(r["duration_ms"])
+        s = g["shapes"].setdefault(r["shape_hash"], {
+            "shape_hash": r["shape_hash"], "root": r["root"], "first_seen": r["ts"],
+            "captures": 0, "execution_ms": [], "shared_read": [],
+        })
+        s["captures"] += 1
+        s["last_seen"] = r["ts"]
+        s["execution_ms"].append(r.get("execution_ms") or 0.0)
+        s["shared_read"].append(r.get("shared_read") or 0)
+
+    out = []
+    for g in groups.values():
+        shapes = sorted(g["shapes"].values(), key=lambda s: s["first_seen"])
+        for s in shapes:
+            s["median_execution_ms"] = round(statistics.median(s.pop("execution_ms")), 2)
+            s["median_shared_read"] = statistics.median(s.pop("shared_read"))
+        latest = max(shapes, key=lambda s: s["last_seen"])
+        out.append({
+            "fingerprint": g["fingerprint"],
+            "sql": g["sql"],
+            "routes": sorted(g["routes"]),
+            "captures": len(g["durations"]),
+            "median_ms": round(statistics.median(g["durations"]), 2),
+            "max_ms": max(g["durations"]),
+            "plan_changed": len(shapes) > 1,
+            # Son görülen plan ilk plandan belirgin yavaşsa gerileme say
+            "regressed": len(shapes) > 1
+                         and latest["median_execution_ms"] > 2 * shapes[0]["median_execution_ms"],
+            "shapes": shapes,
+        })
+    out.sort(key=lambda g: (not g["regressed"], not g["plan_changed"], -g["max_ms"]))
+    return out
+
+
+def _print_report(report: list, top: int) -> None:
+    if not report:
+        print("kayıt yok")
+        return
+    for g in report[:top]:
+        flag = "REGRESSED" if g["regressed"] else ("PLAN CHANGED" if g["plan_changed"] else "")
+        print(f"{g['fingerprint']}  n={g['captures']}  median={g['median_ms']}ms  max={g['max_ms']}ms  {flag}")
+        print(f"    {g['sql']}")
+        if g["routes"]:
+            print(f"    routes: {', '.join(g['routes'])}")
+        for s in g["shapes"]:
+            print(f"    plan {s['shape_hash']} {s['root']:<18} n={s['captures']:<4} "
+                  f"exec~{s['median_execution_ms']}ms read~{s['median_shared_read']} "
+                  f"[{s['first_seen']} .. {s['last_seen']}]")
+        print()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m app.db.explain")
+    ap.add_argument("command", choices=["report"])
+    ap.add_argument("--log", type=Path, default=Path(ABS_SLOW_QUERY_LOG))
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = build_report(_read(args.log))
+    if args.json:
+        print(json.dumps(report[: args.top], indent=2, default=list))
+    else:
+        _print_report(report, args.top)
@@ -1,9 +1,9 @@
 # app/db/models.py
 from sqlalchemy import (
     MetaData, Table, Column, CheckConstraint, ForeignKey,
-    Text, Integer, SmallInteger
+    Text, Integer, SmallInteger, UniqueConstraint
 )
-from sqlalchemy.dialects.postgresql import UUID, CITEXT, TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID, CITEXT, TIMESTAMP, JSONB
 from sqlalchemy.sql import func, text
 from sqlalchemy.schema import Index
 
@@ -82,9 +82,50 @@ content_image = Table(
     Column("sort_order", Integer, nullable=False, server_default=text("0")),
     Column("width", Integer, nullable=False, server_default=text("0")),   # yeni eklendi
     Column("height", Integer, nullable=False, server_default=text("0")),  # yeni eklendi
+    Column("placeholder", Text, nullable=False, server_default=text("''")),     # LQIP data URI
+    Column("dominant_color", Text, nullable=False, server_default=text("''")),  # "#rrggbb"
     Column("created_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
     Column("updated_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
     CheckConstraint("btrim(url) <> '' AND url ~ '^(https?://|/|s3://)'", name="content_image_url_ck"),
+    # Yeniden sıralama tek UPDATE ile yapılabilsin diye ertelenebilir
+    UniqueConstraint("content_id", "sort_order", name="uq_content_image_sort",
+                     deferrable=True, initially="IMMEDIATE"),
+)
+
+# Sunucu tarafı markdown render önbelleği
+content_render = Table(
+    "content_render", metadata,
+    Column("content_id", UUID(as_uuid=True), ForeignKey("content.id", ondelete="CASCADE"),
+           primary_key=True),
+    Column("revision", Text, nullable=False),
+    Column("html", Text, nullable=False),
+    Column("rendered_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+)
+
+upload_tombstone = Table(
+    "upload_tombstone", metadata,
+    Column("url", Text, primary_key=True),
+    Column("deleted_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+)
+
+job = Table(
+    "job", metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True,
+           server_default=text("gen_random_uuid()")),
+    Column("kind", Text, nullable=False),
+    Column("payload", JSONB, nullable=False, server_default=text("'{}'::jsonb")),
+    Column("status", Text, nullable=False, server_default=text("'queued'")),
+    Column("attempts", Integer, nullable=False, server_default=text("0")),
+    Column("max_attempts", Integer, nullable=False, server_default=text("3")),
+    Column("run_after", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    Column("locked_by", Text),
+    Column("locked_at", TIMESTAMP(timezone=True)),
+    Column("result", JSONB),
+    Column("error", Text),
+    Column("finished_at", TIMESTAMP(timezone=True)),
+    Column("created_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    Column("updated_at", TIMESTAMP(timezone=True), nullable=False, server_default=func.now()),
+    CheckConstraint("status IN ('queued','running','done','failed')", name="job_status_check"),
 )
 
 # ==============
@@ -108,6 +149,19 @@ Index(
     postgresql_where=(heading.c.level == 2),
 )
 
+# Slug tahsisi (DDL set_*_slug): kapsamdaki en büyük "taban-N" soneki
+Index("idx_category_slug_suffix", func.slug_base(category.c.slug), func.slug_suffix(category.c.slug).desc())
+Index(
+    "idx_heading_l1_slug_suffix",
+    heading.c.category_id, func.slug_base(heading.c.slug), func.slug_suffix(heading.c.slug).desc(),
+    postgresql_where=(heading.c.level == 1),
+)
+Index(
+    "idx_heading_l2_slug_suffix",
+    heading.c.parent_heading_id, func.slug_base(heading.c.slug), func.slug_suffix(heading.c.slug).desc(),
+    postgresql_where=(heading.c.level == 2),
+)
+
 # FK ve listeleme hızlandırma
 Index("idx_heading_category_l1", heading.c.category_id, postgresql_where=(heading.c.level == 1))
 Index("idx_heading_parent_l2", heading.c.parent_heading_id, postgresql_where=(heading.c.level == 2))
@@ -127,11 +181,6 @@ Index(
     "idx_content_image_order",
     content_image.c.content_id, content_image.c.sort_order, content_image.c.id
 )
-Index(
-    "uq_content_image_sort",
-    content_image.c.content_id, content_image.c.sort_order,
-    unique=True
-)
 
 # TRGM arama index'leri (pg_trgm yüklü olmalı)
 Index(
@@ -169,4 +218,12 @@ Index(
     content.c.description,
     postgresql_using="gin",
     postgresql_ops={content.c.description.key: "gin_trgm_ops"},
-)
\ No newline at end of file
+)
+Index("idx_upload_tombstone_deleted", upload_tombstone.c.deleted_at)
+Index("idx_content_image_upload_name", func.upload_name(content_image.c.url))
+Index(
+    "idx_job_queued",
+    job.c.run_after, job.c.created_at,
+    postgresql_where=(job.c.status == "queued"),
+)
+Index("idx_job_created", job.c.created_at.desc())
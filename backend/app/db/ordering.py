@@ -0,0 +1,92 @@
+# app/db/ordering.py
+"""sort_order yardımcıları.
+
+Sıralama değerleri SORT_GAP katları olarak yazılır: yeni öğe kapsamdaki en büyük
+değerin ardına (max + SORT_GAP) eklenir, yeniden sıralama ise kardeşlerin tamamını
+id listesindeki sırayla tek bir UPDATE'te baştan numaralandırır. Araya ekleme
+(komşuların ortalaması) yoktur; konum değişikliği her zaman tam yeniden sıralamadır.
+"""
+from sqlalchemy import select, func
+
+SORT_GAP = 1024
+
+
+def next_sort_order(column, *where):
+    """Kapsamdaki en büyük sort_order + SORT_GAP (INSERT içinde skaler alt sorgu)."""
+    return (
+        select(func.coalesce(func.max(column), 0) + SORT_GAP)
+        .where(*where)
+        .scalar_subquery()
+    )
+
+
+# Görseller: liste, content'in TÜM görsellerini tam olarak bir kez içermeli.
+# uq_content_image_sort DEFERRABLE olduğu için permütasyon tek sorguda çakışmadan uygulanır.
+REORDER_CONTENT_IMAGES_SQL = """
+WITH o AS (
+  SELECT id, ord FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS o(id, ord)
+),
+guard AS (
+  SELECT
+    (SELECT count(*) FROM content_image x
+      WHERE x.content_id = :content_id AND x.id = ANY(CAST(:ids AS uuid[]))) = cardinality(CAST(:ids AS uuid[]))
+    AND NOT EXISTS (SELECT 1 FROM content_image x
+      WHERE x.content_id = :content_id AND x.id <> ALL(CAST(:ids AS uuid[]))) AS ok
+)
+UPDATE content_image ci
+SET sort_order = o.ord * :gap
+FROM o, guard
+WHERE ci.id = o.id AND ci.content_id = :content_id AND guard.ok
+RETURNING ci.id, ci.content_id, ci.url, ci.alt, ci.sort_order, ci.width, ci.height,
+          ci.placeholder, ci.dominant_color,
+          ci.created_at, ci.updated_at
+"""
+
+# Başlıklar: ids aynı ebeveyne (L1: category, L2: parent heading) ait kardeşlerin tamamı olmalı.
+REORDER_HEADINGS_SQL = """
+WITH o AS (
+  SELECT id, ord FROM unnest(CAST(:ids AS uuid[])) WITH ORDINALITY AS o(id, ord)
+),
+scope AS (
+  SELECT h.level, h.category_id, h.parent_heading_id
+  FROM heading h WHERE h.id = (CAST(:ids AS uuid[]))[1]
+),
+siblings AS (
+  SELECT x.id FROM heading x, scope s
+  WHERE x.level = s.level
+    AND x.category_id IS NOT DISTINCT FROM s.category_id
+    AND x.parent_heading_id IS NOT DISTINCT FROM s.parent_heading_id
+),
+guard AS (
+  SELECT
+    (SELECT count(*) FROM siblings WHERE id = ANY(CAST(:ids AS uuid[]))) = cardinality(CAST(:ids AS uuid[]))
+    AND NOT EXISTS (SELECT 1 FROM siblings WHERE id <> ALL(CAST(:ids AS uuid[]))) AS ok
+)
+UPDATE heading h
+SET sort_order = o.ord * :gap
+FROM o, guard
+WHERE h.id = o.id AND guard.ok
+RETURNING h.id, h.level, h.category_id, h.parent_heading_id, h.title, h.slug, h.description,
+          h.sort_order, h.created_at, h.updated_at
+"""
+
+# Toplu görsel ekleme: yeni satırlar mevcut en büyük sort_order'ın ardına, giriş sırasıyla
+# SORT_GAP aralıklarla tek INSERT'te yazılır. Aynı content'e eşzamanlı toplu eklemeler
+# execute_many içinde önce LOCK_CONTENT_SQL ile sıraya girer; max okuması çakışmaz.
+LOCK_CONTENT_SQL = "SELECT id FROM content WHERE id = CAST(:content_id AS uuid) FOR UPDATE"
+
+INSERT_CONTENT_IMAGES_SQL = """
+WITH base AS (
+  SELECT COALESCE(MAX(sort_order), 0) AS top
+  FROM content_image WHERE content_id = CAST(:content_id AS uuid)
+)
+INSERT INTO content_image (content_id, url, alt, sort_order, width, height, placeholder, dominant_color)
+SELECT CAST(:content_id AS uuid), u.url, u.alt, base.top + u.ord * :gap, u.width, u.height,
+       u.placeholder, u.dominant_color
+FROM base,
+     unnest(CAST(:urls AS text[]), CAST(:alts AS text[]), CAST(:widths AS int[]), CAST(:heights AS int[]),
+            CAST(:placeholders AS text[]), CAST(:colors AS text[]))
+       WITH ORDINALITY AS u(url, alt, width, height, placeholder, dominant_color, ord)
+RETURNING id, content_id, url, alt, sort_order, width, height, placeholder, dominant_color,
+          created_at, updated_at
+"""
@@ -1,38 +1,394 @@
 #  backend/app/db/session.py
+import asyncio
+import hashlib
+import re
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+from sqlalchemy import Table, event, text
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy import text
-from app.core.config import DATABASE_URL
+from sqlalchemy.sql import visitors
+from app.core.config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, QUERY_CACHE_SIZE, QUERY_CACHE_TTL,
+    STATEMENT_TIMEOUT_MS, STATEMENT_TIMEOUTS,
+)
+from app.core.metrics import cache_result, registry, request_scope
+from app.db.explain import sampler as explain_sampler
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     future=True
 )
 
-async def fetch_one(query, params: dict | None = None):
-    async with engine.connect() as conn:
-        if isinstance(query, str):
-            res = await conn.execute(text(query), params or {})
-        else:
-            res = await conn.execute(query)
-        return res.mappings().first()
+# ---- Metrikler (engine event'leri; her sorguda birkaç sözlük işlemi kadar maliyet) ----
+_pool = engine.sync_engine.pool
+registry.gauge("db_pool_size", "Configured pool size", fn=_pool.size)
+registry.gauge("db_pool_checked_out", "Connections currently checked out", fn=_pool.checkedout)
+registry.gauge("db_pool_overflow", "Connections open beyond pool_size",
+               fn=lambda: max(0, _pool.overflow()))  # dolana kadar negatif döner
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+DB_QUERY_LATENCY = registry.histogram("db_query_duration_seconds", "Statement execution time")
+DB_STATEMENTS = registry.counter(
+    "db_statements_total", "Executed statements by fingerprint", ("fingerprint", "op"))
+DB_STATEMENT_SECONDS = registry.counter(
+    "db_statement_seconds_total", "Total execution time by statement fingerprint", ("fingerprint", "op"))
+DB_STATEMENT_INFO = registry.gauge(
+    "db_statement_info", "Statement text (truncated) per fingerprint", ("fingerprint", "sql"))
+DB_STATEMENT_TIMEOUTS = registry.counter(
+    "db_statement_timeouts_total", "Statements cancelled by statement_timeout", ("route",))
+DB_QUERY_CANCELLATIONS = registry.counter(
+    "db_query_cancellations_total", "DB work abandoned because the request task was cancelled", ("route",))
+
+
+@dataclass
+class QueryStats:
+    """Tek bir isteğin DB kullanımı (app.core.querybudget tarafından doldurulur)."""
+    count: int = 0
+    seconds: float = 0.0
+    by_fingerprint: Counter = field(default_factory=Counter)
+
+
+request_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple[str, str]:
+    norm = re.sub(r"\s+", " ", statement).strip()
+    fp = hashlib.sha1(norm.encode()).hexdigest()[:12]
+    op = norm.split(" ", 1)[0].upper() if norm else ""
+    if op == "WITH":
+        op = "CTE"
+    DB_STATEMENT_INFO.set(1, fp, norm[:200])
+    return fp, op
+
+
+# Bu sürecin havuz bağlantılarının backend pid'leri: app.core.changes kendi yazmalarının
+# NOTIFY yankısını (bildirimi gönderen pid) diğer süreç/node'ların yazmalarından ayırır
+backend_pids: Set[int] = set()
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_conn, record):
+    pid = dbapi_conn.driver_connection.get_server_pid()
+    record.info["backend_pid"] = pid
+    backend_pids.add(pid)
+
+
+@event.listens_for(engine.sync_engine, "close")
+def _on_close(dbapi_conn, record):
+    backend_pids.discard(record.info.get("backend_pid"))
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    fp, op = fingerprint(statement)
+    DB_QUERY_LATENCY.observe(elapsed)
+    DB_STATEMENTS.inc(fp, op)
+    DB_STATEMENT_SECONDS.inc(fp, op, amount=elapsed)
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.by_fingerprint[fp] += 1
+    if explain_sampler.enabled and not executemany:
+        explain_sampler.observe(statement, parameters, elapsed, fp, op)
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(ctx):
+    starts = ctx.connection.info.get("query_start") if ctx.connection is not None else None
+    if starts:
+        starts.pop()
+    if getattr(ctx.original_exception, "sqlstate", None) == QUERY_CANCELED:
+        DB_STATEMENT_TIMEOUTS.inc(statement_timeout()[0])
+
+
+# ---- İstek başına statement_timeout ----
+QUERY_CANCELED = "57014"  # statement_timeout aşıldı
+
+
+def _parse_timeouts(raw: str) -> Tuple[Tuple[str, int], ...]:
+    """"/search=2000,/admin=15000" -> en uzun önek önce sıralı (önek, ms) çiftleri."""
+    out = []
+    for part in raw.split(","):
+        if "=" in part:
+            prefix, ms = part.rsplit("=", 1)
+            out.append((prefix.strip(), int(ms)))
+    return tuple(sorted(out, key=lambda p: -len(p[0])))
+
+
+_TIMEOUTS = _parse_timeouts(STATEMENT_TIMEOUTS)
+
+
+def statement_timeout() -> Tuple[str, Optional[int]]:
+    """(metrik etiketi, ms) — o an işlenen isteğin yoluna göre; istek dışında (<none>, None).
+
+    None: sunucu/rol varsayılanı (işler ve bakım sorguları kendi sınırını DB tarafında alır).
+    """
+    scope = request_scope.get()
+    if scope is None:
+        return "<none>", None
+    path = scope.get("path", "")
+    for prefix, ms in _TIMEOUTS:
+        if path.startswith(prefix):
+            return prefix, ms
+    return "<default>", STATEMENT_TIMEOUT_MS
+
+
+def is_statement_timeout(e: BaseException) -> bool:
+    return getattr(getattr(e, "orig", None), "sqlstate", None) == QUERY_CANCELED
+
+
+async def _apply_statement_timeout(conn, ms: Optional[int]) -> None:
+    # Havuzdaki bağlantı son değeri hatırlar (conn.info bağlantı kapanınca temizlenir; yeni
+    # bağlantı varsayılanda = None): yalnızca değiştiğinde bir SET/RESET gönderilir. Sürücü
+    # üzerinden, transaction dışında çalışır ki sorgu sonundaki ROLLBACK ayarı geri almasın.
+    if conn.info.get("statement_timeout") == ms:
+        return
+    raw = await conn.get_raw_connection()
+    if ms is None:
+        # SET 0 sınırı kapatırdı; RESET rol/veritabanı varsayılanına döner
+        await raw.driver_connection.execute("RESET statement_timeout")
+    else:
+        await raw.driver_connection.execute(f"SET statement_timeout = {int(ms)}")
+    conn.info["statement_timeout"] = ms
 
-async def fetch_all(query, params: dict | None = None):
-    async with engine.connect() as conn:
+
+# ---- Sorgu sonucu önbelleği (tablo bağımlılıklı) ----
+@dataclass(frozen=True)
+class CachePolicy:
+    """fetch_one/fetch_all(cache=...) için: sonuç ttl saniye tutulur, okunan tablolara yazılınca silinir.
+
+    tables: bağımlılıkları elle ver (ham SQL'de FROM/JOIN taraması yetmiyorsa).
+    """
+    ttl: float = QUERY_CACHE_TTL
+    tables: Optional[FrozenSet[str]] = None
+
+
+_TEXT_READS = re.compile(r"\b(?:from|join)\s+([a-z_][a-z0-9_]*)", re.I)
+_TEXT_WRITES = re.compile(r"\b(?:insert\s+into|update|delete\s+from)\s+([a-z_][a-z0-9_]*)", re.I)
+# FK kaskadları dışında trigger'ların yazdığı tablolar (DDL.sql)
+_TRIGGER_WRITES = {"content_image": {"upload_tombstone"}}
+
+QUERY_CACHE_EVICTIONS = registry.counter("query_cache_evictions_total", "Query cache entries evicted (LRU)")
+QUERY_CACHE_INVALIDATIONS = registry.counter(
+    "query_cache_invalidations_total", "Query cache entries dropped by writes, by written table", ("table",))
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+@lru_cache(maxsize=None)
+def _cascades(table: str) -> FrozenSet[str]:
+    """Bir tabloya yazmanın dolaylı olarak değiştirebileceği tablolar (ON DELETE CASCADE + trigger)."""
+    from app.db.models import metadata
+
+    out, todo = {table}, [table]
+    while todo:
+        parent = todo.pop()
+        children = set(_TRIGGER_WRITES.get(parent, ()))
+        for t in metadata.tables.values():
+            if any(fk.column.table.name == parent and fk.ondelete == "CASCADE" for fk in t.foreign_keys):
+                children.add(t.name)
+        for child in children - out:
+            out.add(child)
+            todo.append(child)
+    return frozenset(out)
+
+
+def _written_tables(query) -> FrozenSet[str]:
+    if isinstance(query, str):
+        names = _TEXT_WRITES.findall(query)
+    else:
+        table = getattr(query, "table", None)
+        names = [table.name] if isinstance(table, Table) else []
+    return frozenset(n.lower() for n in names)
+
+
+class QueryCache:
+    """fingerprint + parametre anahtarlı, boyutu sınırlı LRU; girdiler okudukları tablolarla etiketlenir."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (expires, tables, value)
+        self._deps: Dict[object, FrozenSet[str]] = {}
+        self._generation: Counter = Counter()  # tablo başına yazma sayacı
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key_and_tables(self, query, params, policy: CachePolicy):
         if isinstance(query, str):
-            res = await conn.execute(text(query), params or {})
+            key = (query, _freeze(params or {}))
+            tables = policy.tables or frozenset(t.lower() for t in _TEXT_READS.findall(query))
+            return key, tables
+        ck = query._generate_cache_key()
+        if ck is None:
+            return None, None  # önbelleklenemeyen ifade
+        key = (ck.key, tuple(_freeze(b.effective_value) for b in ck.bindparams))
+        tables = policy.tables or self._deps.get(ck.key)
+        if tables is None:
+            tables = frozenset(e.name for e in visitors.iterate(query) if isinstance(e, Table))
+            self._deps[ck.key] = tables
+        return key, tables
+
+    def snapshot(self, tables: FrozenSet[str]) -> tuple:
+        return tuple(self._generation[t] for t in sorted(tables))
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            cache_result("query", True)
+            return entry
+        if entry is not None:
+            del self._entries[key]
+        cache_result("query", False)
+        return None
+
+    def put(self, key, tables: FrozenSet[str], generation: tuple, value, ttl: float) -> None:
+        # Okuma sürerken bu tablolara yazıldıysa sonuç eski olabilir: saklama
+        if generation != self.snapshot(tables):
+            return
+        self._entries[key] = (time.monotonic() + ttl, tables, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            QUERY_CACHE_EVICTIONS.inc()
+
+    def invalidate(self, tables) -> None:
+        affected = frozenset().union(*(_cascades(t) for t in tables)) if tables else frozenset()
+        if not affected:
+            return
+        for t in affected:
+            self._generation[t] += 1
+        stale = [k for k, (_, deps, _) in self._entries.items() if deps & affected]
+        dropped: Counter = Counter()
+        for k in stale:
+            deps = self._entries.pop(k)[1]
+            # Her giriş bir kez sayılır: onu düşüren (sıradaki ilk) yazılan tabloya
+            dropped[next(t for t in sorted(tables) if _cascades(t) & deps)] += 1
+        for t, n in dropped.items():
+            QUERY_CACHE_INVALIDATIONS.inc(t, amount=n)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for t in list(self._generation):
+            self._generation[t] += 1
+
+    def on_change(self, change) -> None:
+        """app.core.changes abonesi: diğer node'ların yazmaları (entity adı = tablo adı)."""
+        if change is None:
+            self.clear()
         else:
-            res = await conn.execute(query)
-        return res.mappings().all()
+            self.invalidate({change.entity})
+
+
+query_cache = QueryCache(QUERY_CACHE_SIZE)
+# İsabet/ıska cache_result("query"), tahliye/geçersiz kılma yukarıdaki sayaçlarla /metrics'te
+registry.gauge("query_cache_entries", "Query result cache entries", fn=lambda: len(query_cache._entries))
+
+
+async def _cached(query, params, policy: Optional[CachePolicy], load):
+    if policy is None or not query_cache.enabled:
+        return await load()
+    key, tables = query_cache.key_and_tables(query, params, policy)
+    if key is None:
+        return await load()
+    entry = query_cache.get(key)
+    if entry is not None:
+        return entry[2]
+    generation = query_cache.snapshot(tables)
+    value = await load()
+    query_cache.put(key, tables, generation, value, policy.ttl)
+    return value
+
+
+@asynccontextmanager
+async def _connect(begin: bool = False):
+    t0 = time.perf_counter()
+    label, timeout_ms = statement_timeout()
+    try:
+        async with engine.connect() as conn:
+            DB_POOL_WAIT.observe(time.perf_counter() - t0)
+            await _apply_statement_timeout(conn, timeout_ms)
+            if begin:
+                async with conn.begin():
+                    yield conn
+            else:
+                yield conn
+    except asyncio.CancelledError:
+        # İstemci gitti (app.core.cancellation): asyncpg uçuştaki sorgu için sunucuya iptal gönderir
+        DB_QUERY_CANCELLATIONS.inc(label)
+        raise
+
+async def _run(conn, query, params: dict | None = None):
+    if isinstance(query, str):
+        return await conn.execute(text(query), params or {})
+    return await conn.execute(query)
+
+async def fetch_one(query, params: dict | None = None, cache: Optional[CachePolicy] = None):
+    async def load():
+        async with _connect() as conn:
+            res = await _run(conn, query, params)
+            return res.mappings().first()
+    return await _cached(query, params, cache, load)
+
+async def fetch_all(query, params: dict | None = None, cache: Optional[CachePolicy] = None):
+    async def load():
+        async with _connect() as conn:
+            res = await _run(conn, query, params)
+            return res.mappings().all()
+    rows = await _cached(query, params, cache, load)
+    return list(rows) if cache is not None else rows  # önbellekteki listeyi çağıran değiştiremesin
 
 async def execute(query, params: dict | None = None):
-    async with engine.begin() as conn:
-        if isinstance(query, str):
-            res = await conn.execute(text(query), params or {})
-        else:
-            res = await conn.execute(query)
-        try:
-            return res.mappings().all()  # RETURNING kullanan sorgular için
-        except Exception:
-            return None
+    try:
+        async with _connect(begin=True) as conn:
+            res = await _run(conn, query, params)
+            try:
+                return res.mappings().all()  # RETURNING kullanan sorgular için
+            except Exception:
+                return None
+    finally:
+        # commit'ten (ya da hatadan) sonra: yazılan tabloları okuyan önbellek girdileri silinir
+        query_cache.invalidate(_written_tables(query))
+
+async def execute_many(steps):
+    """(query, params) adımlarını tek transaction içinde çalıştırır; son adımın satırlarını döner."""
+    written = set()
+    try:
+        async with _connect(begin=True) as conn:
+            res = None
+            for query, params in steps:
+                written |= _written_tables(query)
+                res = await _run(conn, query, params)
+            try:
+                return res.mappings().all() if res is not None else None
+            except Exception:
+                return None
+    finally:
+        query_cache.invalidate(written)
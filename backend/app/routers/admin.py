@@ -1,29 +1,45 @@
 # app/routers/admin.py
+import asyncio
 import uuid
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select, insert, update, delete, func
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import pwd_context, create_access_token, get_current_admin
-from app.db.session import fetch_one, fetch_all, execute
-from app.db.models import admin_user as t_admin, category as t_category, heading as t_heading, content as t_content, content_image as t_content_image
+from app.core.security import hash_password, verify_password, create_access_token, get_current_admin
+from app.db.session import CachePolicy, fetch_one, fetch_all, execute, execute_many
+from app.db.ordering import (
+    SORT_GAP, next_sort_order, REORDER_CONTENT_IMAGES_SQL, REORDER_HEADINGS_SQL,
+    LOCK_CONTENT_SQL, INSERT_CONTENT_IMAGES_SQL,
+)
+from app.db.models import admin_user as t_admin, category as t_category, heading as t_heading, content as t_content, content_image as t_content_image, job as t_job
 from app.schemas import (
     TokenOut, AdminInitIn, AdminCreateIn, AdminOut, AdminPasswordIn,
     CategoryCreate, CategoryUpdate, CategoryOut,
     HeadingCreate, HeadingUpdate, HeadingOut,
     ContentCreate, ContentUpdate, ContentOut,
     ContentImageCreate, ContentImageUpdate, ContentImageOut,
+    UploadSessionCreate, UploadSessionOut,
+    ReorderIn, ContentImageReorderIn,
+    JobCreate, JobOut,
     SearchResult,
 )
 from fastapi import File, UploadFile, Form
-from app.core.storage import LocalStorage
-from app.core.config import settings
-from urllib.parse import urlparse
-from pathlib import Path
+from app.core.config import CHANGE_FEED_ENABLED, UPLOAD_BATCH_CONCURRENCY, UPLOAD_BATCH_MAX_FILES
+from app.core.storage import LocalStorage, image_metadata, local_upload_path
+from app.core.resumable import OffsetMismatch, SessionBusy, SessionNotFound, upload_sessions
+from app.core.changes import changes
+from app.core.jobs import jobs, JOB_COLUMNS
 
 
 admin_router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Sık tekrarlanan admin okumaları: ilgili tablolara her yazmada (execute) kendiliğinden silinir.
+# Diğer worker'ların yazmaları yalnızca change feed (NOTIFY) ile gelir; feed kapalıysa başka
+# worker'daki yazma TTL dolana kadar görünmezdi -> önbellek kapalı
+ADMIN_READ_CACHE = CachePolicy() if CHANGE_FEED_ENABLED else None
 storage = LocalStorage()  # env'den UPLOADS_DIR + STATIC_BASE_URL alır
 # ---- URL helper (absolute for current host) ----
 def _abs_url(request: Request, url: str) -> str:
@@ -48,6 +64,13 @@ def _abs_url(request: Request, url: str) -> str:
         url = "/" + url
     return f"{base}{url}"
 
+# ---- Değişiklik yayını (önbellek/snapshot abonelerine) ----
+def _publish_heading(row, op: str):
+    if row["level"] == 1:
+        changes.publish("heading", row["id"], op, "category", row["category_id"])
+    else:
+        changes.publish("heading", row["id"], op, "heading", row["parent_heading_id"])
+
 # ---- Auth & Admin Users ----
 @admin_router.post("/init", response_model=AdminOut)
 async def bootstrap_admin(payload: AdminInitIn):
@@ -57,7 +80,7 @@ async def bootstrap_admin(payload: AdminInitIn):
     if count_row["c"] > 0:
         raise HTTPException(status_code=403, detail="Init only allowed when there is no admin.")
 
-    phash = pwd_context.hash(payload.password)
+    phash = hash_password(payload.password)
     stmt_ins = (
         insert(t_admin)
         .values(email=payload.email, password_hash=phash)
@@ -73,7 +96,7 @@ async def admin_login(form_data: OAuth2PasswordRequestForm = Depends()):
     ).where(t_admin.c.email == form_data.username)
 
     row = await fetch_one(stmt)
-    if not row or not pwd_context.verify(form_data.password, row["password_hash"]):
+    if not row or not verify_password(form_data.password, row["password_hash"]):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
     token = create_access_token({"uid": str(row["id"]), "sub": row["email"]})
@@ -87,7 +110,7 @@ async def me(current=Depends(get_current_admin)):
 
 @admin_router.post("/users", response_model=AdminOut, status_code=201)
 async def create_admin_user(payload: AdminCreateIn, _=Depends(get_current_admin)):
-    phash = pwd_context.hash(payload.password)
+    phash = hash_password(payload.password)
     try:
         stmt = (
             insert(t_admin)
@@ -120,7 +143,7 @@ async def delete_admin_user(admin_id: uuid.UUID, _=Depends(get_current_admin)):
 
 @admin_router.patch("/users/{admin_id}/password", status_code=204)
 async def change_admin_password(admin_id: uuid.UUID, p: AdminPasswordIn, _=Depends(get_current_admin)):
-    phash = pwd_context.hash(p.password)
+    phash = hash_password(p.password)
     stmt = (
         update(t_admin)
         .where(t_admin.c.id == admin_id)
@@ -143,6 +166,7 @@ async def create_category(payload: CategoryCreate, _=Depends(get_current_admin))
             )
         )
         rows = await execute(stmt)
+        changes.publish("category", rows[0]["id"], "insert")
         return rows[0]
     except IntegrityError:
         # Aynı isim/slug için benzersiz kısıt hatasını kullanıcıya anlaşılır şekilde ilet
@@ -157,7 +181,7 @@ async def list_categories(_=Depends(get_current_admin)):
         )
         .order_by(t_category.c.sort_order, t_category.c.name)
     )
-    return await fetch_all(stmt)
+    return await fetch_all(stmt, cache=ADMIN_READ_CACHE)
 
 @admin_router.get("/categories/{id}", response_model=CategoryOut)
 async def get_category(id: uuid.UUID, _=Depends(get_current_admin)):
@@ -168,7 +192,7 @@ async def get_category(id: uuid.UUID, _=Depends(get_current_admin)):
         )
         .where(t_category.c.id == id)
     )
-    row = await fetch_one(stmt)
+    row = await fetch_one(stmt, cache=ADMIN_READ_CACHE)
     if not row:
         raise HTTPException(404, "Category not found")
     return row
@@ -188,14 +212,17 @@ async def update_category(id: uuid.UUID, payload: CategoryUpdate, _=Depends(get_
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Category not found")
+    changes.publish("category", id, "update")
     return rows[0]
 
 @admin_router.delete("/categories/{id}", status_code=204)
 async def delete_category(id: uuid.UUID, _=Depends(get_current_admin)):
+    # Kaskad (heading/content/content_image) FK üzerinden tek ifadede: iş kuyruğuna gerek yok
     stmt = delete(t_category).where(t_category.c.id == id).returning(t_category.c.id)
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Category not found")
+    changes.publish("category", id, "delete")
     return
 
 # ---- Heading CRUD ----
@@ -218,6 +245,7 @@ async def create_heading(payload: HeadingCreate, _=Depends(get_current_admin)):
         )
     )
     rows = await execute(stmt)
+    _publish_heading(rows[0], "insert")
     return rows[0]
 
 @admin_router.get("/headings", response_model=List[HeadingOut])
@@ -245,7 +273,7 @@ async def list_headings(
         stmt = stmt.where(*conditions)
 
     stmt = stmt.order_by(t_heading.c.sort_order, t_heading.c.title)
-    return await fetch_all(stmt)
+    return await fetch_all(stmt, cache=ADMIN_READ_CACHE)
 
 @admin_router.get("/headings/{id}", response_model=HeadingOut)
 async def get_heading(id: uuid.UUID, _=Depends(get_current_admin)):
@@ -259,6 +287,16 @@ async def get_heading(id: uuid.UUID, _=Depends(get_current_admin)):
         raise HTTPException(404, "Heading not found")
     return row
 
+@admin_router.put("/headings/reorder", response_model=List[HeadingOut])
+async def reorder_headings(payload: ReorderIn, _=Depends(get_current_admin)):
+    # Aynı ebeveynin tüm kardeşleri, tek UPDATE ile SORT_GAP aralıklı sıralanır
+    rows = await execute(REORDER_HEADINGS_SQL, {"ids": payload.ids, "gap": SORT_GAP})
+    if len(rows) != len(payload.ids):
+        raise HTTPException(400, "ids must list every sibling heading exactly once")
+    for r in rows:
+        _publish_heading(r, "update")
+    return sorted(rows, key=lambda r: r["sort_order"])
+
 @admin_router.put("/headings/{id}", response_model=HeadingOut)
 async def update_heading(id: uuid.UUID, payload: HeadingUpdate, _=Depends(get_current_admin)):
     data = payload.model_dump(exclude_unset=True)
@@ -275,25 +313,24 @@ async def update_heading(id: uuid.UUID, payload: HeadingUpdate, _=Depends(get_cu
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Heading not found")
+    _publish_heading(rows[0], "update")
     return rows[0]
 
 @admin_router.delete("/headings/{id}", status_code=204)
 async def delete_heading(id: uuid.UUID, _=Depends(get_current_admin)):
-    stmt = delete(t_heading).where(t_heading.c.id == id).returning(t_heading.c.id)
+    stmt = delete(t_heading).where(t_heading.c.id == id).returning(
+        t_heading.c.id, t_heading.c.level, t_heading.c.category_id, t_heading.c.parent_heading_id
+    )
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Heading not found")
+    _publish_heading(rows[0], "delete")
     return
 
 # ---- Content CRUD ----
 @admin_router.post("/contents", response_model=ContentOut)
 async def create_content(payload: ContentCreate, _=Depends(get_current_admin)):
-    # heading başına tek içerik kuralı - var mı?
-    stmt_exists = select(t_content.c.id).where(t_content.c.heading_id == payload.heading_id)
-    exists = await fetch_one(stmt_exists)
-    if exists:
-        raise HTTPException(status_code=409, detail="This heading already has content.")
-
+    # heading başına tek içerik kuralı: ön-kontrol yerine UNIQUE(heading_id) ihlali yakalanır
     stmt = (
         insert(t_content)
         .values(heading_id=payload.heading_id, body=payload.body, description=payload.description)
@@ -302,7 +339,13 @@ async def create_content(payload: ContentCreate, _=Depends(get_current_admin)):
             t_content.c.created_at, t_content.c.updated_at
         )
     )
-    rows = await execute(stmt)
+    try:
+        rows = await execute(stmt)
+    except IntegrityError as e:
+        if getattr(e.orig, "sqlstate", None) == "23505":
+            raise HTTPException(status_code=409, detail="This heading already has content.") from e
+        raise HTTPException(status_code=404, detail="Heading not found") from e
+    changes.publish("content", rows[0]["id"], "insert", "heading", rows[0]["heading_id"])
     return rows[0]
 
 @admin_router.get("/contents", response_model=List[ContentOut])
@@ -342,14 +385,16 @@ async def update_content(id: uuid.UUID, payload: ContentUpdate, _=Depends(get_cu
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Content not found")
+    changes.publish("content", id, "update", "heading", rows[0]["heading_id"])
     return rows[0]
 
 @admin_router.delete("/contents/{id}", status_code=204)
 async def delete_content(id: uuid.UUID, _=Depends(get_current_admin)):
-    stmt = delete(t_content).where(t_content.c.id == id).returning(t_content.c.id)
+    stmt = delete(t_content).where(t_content.c.id == id).returning(t_content.c.id, t_content.c.heading_id)
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Content not found")
+    changes.publish("content", id, "delete", "heading", rows[0]["heading_id"])
     return
 
 # ---- Content Image CRUD ----
@@ -378,6 +423,7 @@ async def create_content_image(payload: ContentImageCreate, _=Depends(get_curren
         )
     )
     rows = await execute(stmt)
+    changes.publish("content_image", rows[0]["id"], "insert", "content", rows[0]["content_id"])
     return rows[0]
 
 @admin_router.get("/content-images", response_model=List[ContentImageOut])
@@ -390,6 +436,7 @@ async def list_content_images(
         t_content_image.c.id, t_content_image.c.content_id, t_content_image.c.url,
         t_content_image.c.alt, t_content_image.c.sort_order,
         t_content_image.c.width, t_content_image.c.height,
+        t_content_image.c.placeholder, t_content_image.c.dominant_color,
         t_content_image.c.created_at, t_content_image.c.updated_at
     )
     if content_id:
@@ -411,6 +458,7 @@ async def get_content_image(id: uuid.UUID, request: Request, _=Depends(get_curre
         t_content_image.c.id, t_content_image.c.content_id, t_content_image.c.url,
         t_content_image.c.alt, t_content_image.c.sort_order,
         t_content_image.c.width, t_content_image.c.height,
+        t_content_image.c.placeholder, t_content_image.c.dominant_color,
         t_content_image.c.created_at, t_content_image.c.updated_at
     ).where(t_content_image.c.id == id)
     row = await fetch_one(stmt)
@@ -421,6 +469,31 @@ async def get_content_image(id: uuid.UUID, request: Request, _=Depends(get_curre
         d["url"] = _abs_url(request, d["url"]) 
     return d
 
+@admin_router.put("/content-images/reorder", response_model=List[ContentImageOut])
+async def reorder_content_images(
+    payload: ContentImageReorderIn, request: Request, _=Depends(get_current_admin)
+):
+    # uq_content_image_sort ertelenir; permütasyon tek UPDATE ile çakışmadan uygulanır
+    try:
+        rows = await execute_many([
+            ("SET CONSTRAINTS uq_content_image_sort DEFERRED", None),
+            (REORDER_CONTENT_IMAGES_SQL,
+             {"ids": payload.ids, "content_id": payload.content_id, "gap": SORT_GAP}),
+        ])
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail="sort_order conflict") from e
+    if len(rows) != len(payload.ids):
+        raise HTTPException(400, "ids must list every image of the content exactly once")
+    result = []
+    for r in sorted(rows, key=lambda r: r["sort_order"]):
+        d = dict(r)
+        if d.get("url"):
+            d["url"] = _abs_url(request, d["url"])
+        result.append(d)
+    for r in rows:
+        changes.publish("content_image", r["id"], "update", "content", payload.content_id)
+    return result
+
 @admin_router.put("/content-images/{id}", response_model=ContentImageOut)
 async def update_content_image(id: uuid.UUID, payload: ContentImageUpdate, _=Depends(get_current_admin)):
     data = payload.model_dump(exclude_unset=True)
@@ -432,12 +505,14 @@ async def update_content_image(id: uuid.UUID, payload: ContentImageUpdate, _=Dep
             t_content_image.c.id, t_content_image.c.content_id, t_content_image.c.url,
             t_content_image.c.alt, t_content_image.c.sort_order,
             t_content_image.c.width, t_content_image.c.height,
+            t_content_image.c.placeholder, t_content_image.c.dominant_color,
             t_content_image.c.created_at, t_content_image.c.updated_at
         )
     )
     rows = await execute(stmt)
     if not rows:
         raise HTTPException(404, "Content image not found")
+    changes.publish("content_image", id, "update", "content", rows[0]["content_id"])
     return rows[0]
 
 @admin_router.post("/content-images/upload", response_model=ContentImageOut, status_code=201)
@@ -445,7 +520,7 @@ async def upload_content_image(
     content_id: uuid.UUID = Form(...),
     file: UploadFile = File(...),
     alt: Optional[str] = Form(None),
-    sort_order: Optional[int] = Form(0),
+    sort_order: Optional[int] = Form(None),  # boş/0 -> listenin sonuna (max + SORT_GAP)
     width: Optional[int] = Form(0),    # <-- yeni
     height: Optional[int] = Form(0),   # <-- yeni
     _=Depends(get_current_admin),
@@ -456,19 +531,30 @@ async def upload_content_image(
         raise HTTPException(status_code=404, detail="Content not found")
 
     try:
-        _, public_url = await storage.save_image(file)
+        saved = await storage.save_image(file)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    return await _insert_uploaded_image(content_id, saved, alt, sort_order, width, height)
+
+async def _insert_uploaded_image(content_id, saved, alt, sort_order, width, height):
+    # width/height admin'in seçtiği görüntüleme boyutudur (boyutlandırma tutamacı); istemci
+    # göndermediyse dosyadan okunan gerçek ölçüler kullanılır
+    if not (width and height):
+        width, height = saved.width, saved.height
     stmt = (
         insert(t_content_image)
         .values(
             content_id=content_id,
-            url=public_url,                 # TAM URL
+            url=saved.url,                  # TAM URL
             alt=alt or "",
-            sort_order=sort_order or 0,
-            width=width or 0,               # <-- eklendi
-            height=height or 0,             # <-- eklendi
+            sort_order=sort_order or next_sort_order(
+                t_content_image.c.sort_order, t_content_image.c.content_id == content_id
+            ),
+            width=width or 0,
+            height=height or 0,
+            placeholder=saved.placeholder,
+            dominant_color=saved.dominant_color,
         )
         .returning(
             t_content_image.c.id,
@@ -478,38 +564,309 @@ async def upload_content_image(
             t_content_image.c.sort_order,
             t_content_image.c.width,        # <-- eklendi
             t_content_image.c.height,       # <-- eklendi
+            t_content_image.c.placeholder,
+            t_content_image.c.dominant_color,
             t_content_image.c.created_at,
             t_content_image.c.updated_at,
         )
     )
-    rows = await execute(stmt)
+    try:
+        # Batch yolu gibi content satırını kilitle: eşzamanlı upload'lar aynı max + SORT_GAP'i almasın
+        rows = await execute_many([(LOCK_CONTENT_SQL, {"content_id": content_id}), (stmt, None)])
+    except IntegrityError:
+        # Elle verilen sort_order dolu ya da content bu arada silindi
+        _remove_uploaded([saved.path])
+        raise HTTPException(409, "Content images changed concurrently, retry the upload")
+    except BaseException:
+        _remove_uploaded([saved.path])
+        raise
+    changes.publish("content_image", rows[0]["id"], "insert", "content", rows[0]["content_id"])
     return rows[0]
 
+def _remove_uploaded(paths) -> None:
+    for p in paths:
+        try:
+            Path(p).unlink(missing_ok=True)
+        except OSError:
+            pass  # uploads GC grace süresinden sonra siler
+
+@admin_router.post("/content-images/upload-batch", response_model=List[ContentImageOut], status_code=201)
+async def upload_content_images_batch(
+    content_id: uuid.UUID = Form(...),
+    files: List[UploadFile] = File(...),
+    alts: Optional[List[str]] = Form(None),  # dosyalarla aynı sırada (isteğe bağlı)
+    _=Depends(get_current_admin),
+):
+    if len(files) > UPLOAD_BATCH_MAX_FILES:
+        raise HTTPException(400, f"At most {UPLOAD_BATCH_MAX_FILES} files per batch")
+    exists = await fetch_one(select(t_content.c.id).where(t_content.c.id == content_id))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Content not found")
+
+    # Doğrulama + yazma dosya başına bağımsız: sınırlı eşzamanlılıkla paralel
+    gate = asyncio.Semaphore(UPLOAD_BATCH_CONCURRENCY)
+
+    async def save(file: UploadFile):
+        async with gate:
+            return await storage.save_image(file)
+
+    results = await asyncio.gather(*(save(f) for f in files), return_exceptions=True)
+    saved = [r.path for r in results if not isinstance(r, BaseException)]
+    failed = [(f, r) for f, r in zip(files, results) if isinstance(r, BaseException)]
+    if failed:
+        # Hepsi ya da hiçbiri: kayıt yazılmayacak dosyaları hemen kaldır
+        _remove_uploaded(saved)
+        for _, r in failed:
+            if not isinstance(r, ValueError):
+                raise r
+        raise HTTPException(400, [{"file": f.filename, "error": str(r)} for f, r in failed])
+
+    alts = (alts or []) + [""] * (len(files) - len(alts or []))
+    try:
+        rows = await execute_many([
+            (LOCK_CONTENT_SQL, {"content_id": content_id}),
+            (INSERT_CONTENT_IMAGES_SQL, {
+                "content_id": content_id,
+                "urls": [r.url for r in results],
+                "alts": alts[:len(files)],
+                "widths": [r.width for r in results],
+                "heights": [r.height for r in results],
+                "placeholders": [r.placeholder for r in results],
+                "colors": [r.dominant_color for r in results],
+                "gap": SORT_GAP,
+            }),
+        ])
+    except IntegrityError:
+        # Tek istekli bir upload aynı anda aynı sort_order'ı aldı ya da content silindi
+        _remove_uploaded(saved)
+        raise HTTPException(409, "Content images changed concurrently, retry the batch")
+    except BaseException:
+        _remove_uploaded(saved)
+        raise
+    rows = sorted(rows, key=lambda r: r["sort_order"])
+    for r in rows:
+        changes.publish("content_image", r["id"], "insert", "content", content_id)
+    return rows
+
+@jobs.handler("images.backfill")
+async def _backfill_image_metadata(payload: dict):
+    # Placeholder'ı olmayan (bu alanlardan önce yüklenmiş) yerel görsellerin ölçü/LQIP/renk bilgisi
+    updated = skipped = 0
+    last = None
+    while True:
+        stmt = (
+            select(t_content_image.c.id, t_content_image.c.content_id, t_content_image.c.url,
+                   t_content_image.c.width, t_content_image.c.height)
+            .where(t_content_image.c.placeholder == "")
+            .order_by(t_content_image.c.id)
+            .limit(200)
+        )
+        if last is not None:
+            stmt = stmt.where(t_content_image.c.id > last)
+        rows = await fetch_all(stmt)
+        if not rows:
+            return {"updated": updated, "skipped": skipped}
+        for r in rows:
+            path = local_upload_path(r["url"])
+            try:
+                if path is None:
+                    raise FileNotFoundError(r["url"])  # harici URL: dosyaya erişim yok
+                width, height, placeholder, color = await asyncio.to_thread(image_metadata, path)
+            except Exception:
+                skipped += 1
+                continue
+            if r["width"] and r["height"]:
+                width, height = r["width"], r["height"]  # admin'in seçtiği boyuta dokunma
+            await execute(
+                update(t_content_image)
+                .where(t_content_image.c.id == r["id"])
+                .values(width=width, height=height, placeholder=placeholder, dominant_color=color)
+            )
+            changes.publish("content_image", r["id"], "update", "content", r["content_id"])
+            updated += 1
+        last = rows[-1]["id"]
+
+# ---- Resumable upload (app/core/resumable.py) ----
+def _session_out(s) -> dict:
+    return {
+        "id": s.id, "content_id": s.content_id, "content_type": s.content_type, "length": s.length,
+        "offset": s.offset, "expires_at": datetime.fromtimestamp(s.expires_at, timezone.utc),
+    }
+
+def _upload_session(id: uuid.UUID):
+    try:
+        return upload_sessions.get(id)
+    except SessionNotFound:
+        raise HTTPException(404, "Upload session not found or expired")
+
+def _offset_conflict(e: OffsetMismatch) -> HTTPException:
+    # İstemci HEAD ile sunucudaki ofseti alıp oradan devam eder
+    return HTTPException(409, str(e), headers={"Upload-Offset": str(e.offset)})
+
+def _session_busy() -> HTTPException:
+    # Aynı oturumda başka bir PATCH/finalize sürüyor; istemci HEAD ile ofseti alıp yeniden dener
+    return HTTPException(409, "Upload session is busy")
+
+@admin_router.post("/content-images/uploads", response_model=UploadSessionOut, status_code=201)
+async def create_upload_session(payload: UploadSessionCreate, _=Depends(get_current_admin)):
+    exists = await fetch_one(select(t_content.c.id).where(t_content.c.id == payload.content_id))
+    if not exists:
+        raise HTTPException(status_code=404, detail="Content not found")
+    try:
+        s = upload_sessions.create(
+            payload.content_id, payload.content_type, payload.length,
+            alt=payload.alt, sort_order=payload.sort_order, width=payload.width, height=payload.height,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _session_out(s)
+
+@admin_router.api_route("/content-images/uploads/{id}", methods=["GET", "HEAD"], response_model=UploadSessionOut)
+async def get_upload_session(id: uuid.UUID, response: Response, _=Depends(get_current_admin)):
+    s = _upload_session(id)
+    response.headers["Upload-Offset"] = str(s.offset)
+    response.headers["Upload-Length"] = str(s.length)
+    response.headers["Cache-Control"] = "no-store"
+    return _session_out(s)
+
+@admin_router.patch("/content-images/uploads/{id}", response_model=UploadSessionOut)
+async def append_upload_chunk(
+    id: uuid.UUID,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    _=Depends(get_current_admin),
+):
+    # Parça ham gövde olarak gelir (Content-Type: application/offset+octet-stream);
+    # admission parça başına MAX_UPLOAD_BYTES sınırını uygular
+    try:
+        s = await upload_sessions.append(id, upload_offset, request.stream())
+    except SessionNotFound:
+        raise HTTPException(404, "Upload session not found or expired")
+    except SessionBusy:
+        raise _session_busy()
+    except OffsetMismatch as e:
+        raise _offset_conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["Upload-Offset"] = str(s.offset)
+    return _session_out(s)
+
+@admin_router.post("/content-images/uploads/{id}/finalize", response_model=ContentImageOut, status_code=201)
+async def finalize_upload_session(id: uuid.UUID, _=Depends(get_current_admin)):
+    try:
+        # Kilit taşıma bitene kadar tutulur: çift finalize ikinci kez taşımaya çalışmaz
+        with upload_sessions.locked(id):
+            try:
+                s, part = upload_sessions.complete(id)
+            except OffsetMismatch as e:
+                raise _offset_conflict(e)
+
+            exists = await fetch_one(select(t_content.c.id).where(t_content.c.id == uuid.UUID(s.content_id)))
+            if not exists:
+                upload_sessions.discard(id)
+                raise HTTPException(status_code=404, detail="Content not found")
+            try:
+                # Tek istekli upload ile aynı doğrulama; Pillow büyük dosyada event loop'u tutmasın
+                saved = await asyncio.to_thread(
+                    storage.adopt_file, part, s.content_type, upload_sessions.max_bytes)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                upload_sessions.discard(id)
+    except SessionNotFound:
+        raise HTTPException(404, "Upload session not found or expired")
+    except SessionBusy:
+        raise _session_busy()
+    return await _insert_uploaded_image(
+        uuid.UUID(s.content_id), saved, s.alt, s.sort_order, s.width, s.height)
+
+@admin_router.delete("/content-images/uploads/{id}", status_code=204)
+async def abort_upload_session(id: uuid.UUID, _=Depends(get_current_admin)):
+    try:
+        with upload_sessions.locked(id):
+            _upload_session(id)
+            upload_sessions.discard(id)
+    except SessionNotFound:
+        raise HTTPException(404, "Upload session not found or expired")
+    except SessionBusy:
+        raise _session_busy()
+    return
+
 @admin_router.delete("/content-images/{id}", status_code=204)
 async def delete_content_image(id: uuid.UUID, _=Depends(get_current_admin)):
-    row = await fetch_one(
-        select(t_content_image.c.id, t_content_image.c.url).where(t_content_image.c.id == id)
+    # Tek sorgu: sil, url'i ve dosyanın başka kayıtta kullanılıp kullanılmadığını geri al.
+    # Aynı dosya farklı URL biçimleriyle kayıtlı olabilir: dosya adına göre karşılaştır.
+    # trg_content_image_tombstone aynı transaction'da upload_tombstone'a yazar (GC yedeği).
+    other = t_content_image.alias("ci_other")
+    shared = (
+        select(other.c.id)
+        .where(func.upload_name(other.c.url) == func.upload_name(t_content_image.c.url),
+               other.c.id != t_content_image.c.id)
+        .exists()
     )
-    if not row:
-        raise HTTPException(404, "Content image not found")
-
-    del_rows = await execute(
-        delete(t_content_image).where(t_content_image.c.id == id).returning(t_content_image.c.id)
+    rows = await execute(
+        delete(t_content_image)
+        .where(t_content_image.c.id == id)
+        .returning(t_content_image.c.id, t_content_image.c.content_id, t_content_image.c.url,
+                   shared.label("shared"))
     )
-    if not del_rows:
+    if not rows:
         raise HTTPException(404, "Content image not found")
-
-    # URL'den dosya adını al ve uploads'tan sil
-    parsed = urlparse(row["url"])
-    fname = Path(parsed.path).name
-    fpath = Path(settings.UPLOADS_DIR) / fname
-    try:
-        fpath.unlink(missing_ok=True)
-    except Exception:
-        pass
+    row = rows[0]
+
+    # Dosyayı hemen kaldır; başarısız olursa uploads GC grace süresinden sonra siler
+    fpath = None if row["shared"] else local_upload_path(row["url"])
+    if fpath is not None:
+        try:
+            fpath.unlink(missing_ok=True)
+        except OSError:
+            pass
+    changes.publish("content_image", id, "delete", "content", row["content_id"])
     return
 
 
+# ---- Background jobs ----
+@admin_router.post("/jobs", response_model=JobOut, status_code=202)
+async def create_job(payload: JobCreate, _=Depends(get_current_admin)):
+    return await jobs.enqueue(payload.kind, payload.payload)
+
+@admin_router.get("/jobs", response_model=List[JobOut])
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|done|failed)$"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    _=Depends(get_current_admin),
+):
+    stmt = select(*JOB_COLUMNS).order_by(t_job.c.created_at.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(t_job.c.status == status)
+    if kind:
+        stmt = stmt.where(t_job.c.kind == kind)
+    return await fetch_all(stmt)
+
+@admin_router.get("/jobs/{id}", response_model=JobOut)
+async def get_job(id: uuid.UUID, _=Depends(get_current_admin)):
+    row = await fetch_one(select(*JOB_COLUMNS).where(t_job.c.id == id))
+    if not row:
+        raise HTTPException(404, "Job not found")
+    return row
+
+@admin_router.post("/jobs/{id}/retry", response_model=JobOut, status_code=202)
+async def retry_job(id: uuid.UUID, _=Depends(get_current_admin)):
+    stmt = (
+        update(t_job)
+        .where(t_job.c.id == id, t_job.c.status == "failed")
+        .values(status="queued", attempts=0, error=None, finished_at=None, run_after=func.now())
+        .returning(*JOB_COLUMNS)
+    )
+    rows = await execute(stmt)
+    if not rows:
+        raise HTTPException(404, "Failed job not found")
+    jobs.wake()
+    return rows[0]
+
+
 # ---- Admin Search (TRGM) ----
 @admin_router.get("/search", response_model=List[SearchResult])
 async def admin_search(
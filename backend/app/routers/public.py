@@ -1,16 +1,28 @@
 # app/routers/public.py
+import asyncio
+import logging
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Path, Query, Request
-
-from sqlalchemy import select, exists, and_, or_
-from app.db.session import fetch_one, fetch_all
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from sqlalchemy import select, exists, and_, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from app.core.events import hub
+from app.core.jobs import jobs
+from app.core.metrics import cache_result
+from app.core.render import render_body, render_revision
+from app.core.cdn import tag_response
+from app.db.session import fetch_one, fetch_all, execute
 from app.db.models import (
     category as t_category,
     heading as t_heading,
     content as t_content,
     content_image as t_content_image,
+    content_render as t_content_render,
 )
 from app.schemas import (
     ContentPublic,
@@ -19,8 +31,11 @@ from app.schemas import (
     PageOut,
     MenuNode,
     ContentImageOut,
+    RenderedContentOut,
 )
 
+log = logging.getLogger(__name__)
+
 public_router = APIRouter(tags=["public"])
 
 # ========== Helpers (EXISTS koşulları) ==========
@@ -83,7 +98,8 @@ def _exists_l2_has_content_for_h(h_alias):
 # ========== Endpoints ==========
 
 @public_router.get("/categories", response_model=List[CategoryOut])
-async def list_categories():
+async def list_categories(response: Response = None):
+    tag_response(response, "tree")
     stmt = (
         select(
             t_category.c.id, t_category.c.name, t_category.c.slug, t_category.c.sort_order
@@ -95,11 +111,12 @@ async def list_categories():
     return await fetch_all(stmt)
 
 @public_router.get("/categories/{category_slug}/headings", response_model=List[HeadingOut])
-async def list_h1_headings(category_slug: str = Path(...)):
+async def list_h1_headings(category_slug: str = Path(...), response: Response = None):
     cat_stmt = select(t_category.c.id).where(t_category.c.slug == category_slug)
     cat = await fetch_one(cat_stmt)
     if not cat:
         raise HTTPException(404, "Category not found")
+    tag_response(response, "tree", f"category:{cat['id']}")
 
     h = t_heading.alias("h_l1_list")
     stmt = (
@@ -116,7 +133,7 @@ async def list_h1_headings(category_slug: str = Path(...)):
     return await fetch_all(stmt)
 
 @public_router.get("/categories/{category_slug}/{h1_slug}/headings", response_model=List[HeadingOut])
-async def list_h2_under_h1(category_slug: str, h1_slug: str):
+async def list_h2_under_h1(category_slug: str, h1_slug: str, response: Response = None):
     h1 = t_heading.alias("h1_for_l2")
     c = t_category.alias("c_for_l2")
     h1_stmt = (
@@ -128,6 +145,7 @@ async def list_h2_under_h1(category_slug: str, h1_slug: str):
     h1_row = await fetch_one(h1_stmt)
     if not h1_row:
         raise HTTPException(404, "Level-1 heading not found")
+    tag_response(response, "tree", f"heading:{h1_row['id']}")
 
     h = t_heading.alias("h_l2_list")
     stmt = (
@@ -144,7 +162,7 @@ async def list_h2_under_h1(category_slug: str, h1_slug: str):
     return await fetch_all(stmt)
 
 @public_router.get("/page/{category_slug}/{h1_slug}/{h2_slug}", response_model=PageOut)
-async def get_page(category_slug: str, h1_slug: str, h2_slug: str):
+async def get_page(category_slug: str, h1_slug: str, h2_slug: str, response: Response = None):
     c = t_category.alias("c")
     h1 = t_heading.alias("h1")
     h2 = t_heading.alias("h2")
@@ -157,6 +175,11 @@ async def get_page(category_slug: str, h1_slug: str, h2_slug: str):
             h2.c.slug.label("h2"),
             h2.c.title.label("title"),
             ct.c.body.label("body"),
+            # önbellek etiketleri için (PageOut'ta yok, yanıta girmez)
+            c.c.id.label("category_id"),
+            h1.c.id.label("h1_id"),
+            h2.c.id.label("h2_id"),
+            ct.c.id.label("content_id"),
         )
         .select_from(
             c.join(h1, and_(h1.c.category_id == c.c.id, h1.c.level == 1))
@@ -169,17 +192,23 @@ async def get_page(category_slug: str, h1_slug: str, h2_slug: str):
     row = await fetch_one(stmt)
     if not row:
         raise HTTPException(404, "Page not found")
+    tag_response(response, f"category:{row['category_id']}", f"heading:{row['h1_id']}",
+                 f"heading:{row['h2_id']}", f"content:{row['content_id']}")
     return row
 
 @public_router.get("/public/contents", response_model=List[ContentPublic])
-async def list_public_contents(heading_id: UUID = Query(..., description="L1 veya L2 heading id")):
+async def list_public_contents(heading_id: UUID = Query(..., description="L1 veya L2 heading id"),
+                               response: Response = None):
     ct = t_content.alias("ct")
     stmt = (
         select(ct.c.id, ct.c.heading_id, ct.c.body, ct.c.description)
         .where(ct.c.heading_id == heading_id)
         .order_by(ct.c.created_at.asc())
     )
-    return await fetch_all(stmt)
+    rows = await fetch_all(stmt)
+    # Yeni içerik heading:<id> ile, düzenleme content:<id> ile purge edilir
+    tag_response(response, f"heading:{heading_id}", *(f"content:{r['id']}" for r in rows))
+    return rows
 
 # ---- Content Images (Public) ----
 
@@ -215,7 +244,7 @@ def _abs_url(request: Request, url: str) -> str:
 
 
 @public_router.get("/contents/{id}/images", response_model=List[ContentImageOut])
-async def list_images_by_content_id(id: uuid.UUID, request: Request):
+async def list_images_by_content_id(id: uuid.UUID, request: Request, response: Response = None):
     # content var mı kontrolü
     ct_stmt = select(t_content.c.id).where(t_content.c.id == id)
     ct_row = await fetch_one(ct_stmt)
@@ -232,6 +261,8 @@ async def list_images_by_content_id(id: uuid.UUID, request: Request):
             # yeni alanlar
             t_content_image.c.width,
             t_content_image.c.height,
+            t_content_image.c.placeholder,
+            t_content_image.c.dominant_color,
             t_content_image.c.created_at,
             t_content_image.c.updated_at,
         )
@@ -239,6 +270,7 @@ async def list_images_by_content_id(id: uuid.UUID, request: Request):
         .order_by(t_content_image.c.sort_order, t_content_image.c.created_at, t_content_image.c.id)
     )
     rows = await fetch_all(stmt)
+    tag_response(response, f"content:{id}", *(f"content_image:{r['id']}" for r in rows))
     # RowMapping -> dict; url'leri güvenle dönüştür
     result = []
     for r in rows:
@@ -249,48 +281,189 @@ async def list_images_by_content_id(id: uuid.UUID, request: Request):
     return result
 
 
+async def _render_content(id: uuid.UUID, store: bool) -> dict:
+    # Render önbelleği içerik/görsel revizyonu değişmedikçe yeniden kullanılır
+    ct_stmt = (
+        select(
+            t_content.c.id, t_content.c.body, t_content.c.updated_at,
+            t_content_render.c.revision, t_content_render.c.html,
+        )
+        .select_from(
+            t_content.outerjoin(t_content_render, t_content_render.c.content_id == t_content.c.id)
+        )
+        .where(t_content.c.id == id)
+    )
+    row = await fetch_one(ct_stmt)
+    if not row:
+        raise HTTPException(404, "Content not found")
+
+    img_stmt = (
+        select(
+            t_content_image.c.id, t_content_image.c.url, t_content_image.c.alt,
+            t_content_image.c.width, t_content_image.c.height, t_content_image.c.placeholder,
+            t_content_image.c.dominant_color, t_content_image.c.updated_at,
+        )
+        .where(t_content_image.c.content_id == id)
+        .order_by(t_content_image.c.sort_order, t_content_image.c.created_at, t_content_image.c.id)
+    )
+    images = await fetch_all(img_stmt)
+
+    revision = render_revision(row["updated_at"], images)
+    cache_result("content_render", row["revision"] == revision)
+    if row["revision"] == revision:
+        return {"content_id": id, "revision": revision, "html": row["html"]}
+
+    html = await run_in_threadpool(render_body, row["body"], images)
+    if store:
+        upsert = pg_insert(t_content_render).values(content_id=id, revision=revision, html=html)
+        try:
+            await execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[t_content_render.c.content_id],
+                    set_={"revision": upsert.excluded.revision, "html": upsert.excluded.html,
+                          "rendered_at": func.now()},
+                )
+            )
+        except IntegrityError:
+            pass  # içerik bu arada silindi; önbelleğe yazmadan dön
+    return {"content_id": id, "revision": revision, "html": html}
+
+
+@public_router.get("/contents/{id}/html", response_model=RenderedContentOut)
+async def get_content_html(id: uuid.UUID, response: Response = None):
+    # Public GET yazmaz: önbellek ıskalanırsa bu istek için render edilir, kayıt render.refresh işinin
+    rendered = await _render_content(id, store=False)
+    # Görsel değişiklikleri de parent olarak content:<id> yayınlar
+    tag_response(response, f"content:{id}")
+    return rendered
+
+
+@jobs.handler("render.refresh")
+async def _refresh_renders(payload: dict):
+    # Tüm içerikleri (ya da payload["content_ids"]) render önbelleğine ısıt; güncel olanlar atlanır
+    ids = payload.get("content_ids") or [r["id"] for r in await fetch_all(select(t_content.c.id))]
+    for cid in ids:
+        try:
+            await _render_content(uuid.UUID(str(cid)), store=True)
+        except HTTPException:
+            pass  # iş kuyrukta beklerken içerik silindi
+    return {"contents": len(ids)}
+
+
+@jobs.handler("render.backfill")
+async def _backfill_renders(payload: dict):
+    # Render önbelleğinden önce var olan (ya da kaydı hiç yazılmamış) içerikler; sayfa sayfa ilerler
+    rendered = 0
+    last = None
+    while True:
+        stmt = (
+            select(t_content.c.id)
+            .select_from(
+                t_content.outerjoin(t_content_render, t_content_render.c.content_id == t_content.c.id)
+            )
+            .where(t_content_render.c.content_id.is_(None))
+            .order_by(t_content.c.id)
+            .limit(200)
+        )
+        if last is not None:
+            stmt = stmt.where(t_content.c.id > last)
+        rows = await fetch_all(stmt)
+        if not rows:
+            return {"rendered": rendered}
+        for r in rows:
+            try:
+                await _render_content(r["id"], store=True)
+                rendered += 1
+            except HTTPException:
+                pass  # bu arada silindi
+        last = rows[-1]["id"]
+
+
+class RenderRefresher:
+    """Yazan node'da içerik/görsel değişikliklerini toplayıp tek bir render.refresh işi olarak kuyruğa yazar."""
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self._pending: Set[uuid.UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def on_change(self, change) -> None:
+        if change is None:
+            return
+        if change.entity == "content" and change.op != "delete":
+            self._pending.add(change.id)
+        elif change.entity == "content_image" and change.parent_id is not None:
+            self._pending.add(change.parent_id)
+        else:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        # Aynı istekteki ardışık yazmaları (ör. toplu görsel yükleme) tek işte topla
+        await asyncio.sleep(self.delay)
+        ids, self._pending = sorted(str(i) for i in self._pending), set()
+        try:
+            await jobs.enqueue("render.refresh", {"content_ids": ids})
+        except Exception as e:
+            log.warning("render.refresh enqueue failed for %s contents: %s", len(ids), e)
+
+
+renders = RenderRefresher()
+
+
 @public_router.get("/page/{category_slug}/{h1_slug}/{h2_slug}/images", response_model=List[ContentImageOut])
-async def list_images_by_page(category_slug: str, h1_slug: str, h2_slug: str, request: Request):
-    # h2 -> content id çöz
+async def list_images_by_page(category_slug: str, h1_slug: str, h2_slug: str, request: Request,
+                              response: Response = None):
+    # Tek sorgu: sayfa yolu -> content, görseller LEFT JOIN (sayfa var ama görsel yoksa tek boş satır)
     c = t_category.alias("c_img")
     h1 = t_heading.alias("h1_img")
     h2 = t_heading.alias("h2_img")
     ct = t_content.alias("ct_img")
+    ci = t_content_image.alias("ci_img")
 
-    ct_stmt = (
-        select(ct.c.id)
+    stmt = (
+        select(
+            c.c.id.label("page_category_id"),
+            h1.c.id.label("page_h1_id"),
+            h2.c.id.label("page_h2_id"),
+            ct.c.id.label("page_content_id"),
+            ci.c.id,
+            ci.c.content_id,
+            ci.c.url,
+            ci.c.alt,
+            ci.c.sort_order,
+            # yeni alanlar
+            ci.c.width,
+            ci.c.height,
+            ci.c.placeholder,
+            ci.c.dominant_color,
+            ci.c.created_at,
+            ci.c.updated_at,
+        )
         .select_from(
             c.join(h1, and_(h1.c.category_id == c.c.id, h1.c.level == 1))
              .join(h2, and_(h2.c.parent_heading_id == h1.c.id, h2.c.level == 2))
              .join(ct, ct.c.heading_id == h2.c.id)
+             .outerjoin(ci, ci.c.content_id == ct.c.id)
         )
         .where(and_(c.c.slug == category_slug, h1.c.slug == h1_slug, h2.c.slug == h2_slug))
-        .limit(1)
-    )
-    ct_row = await fetch_one(ct_stmt)
-    if not ct_row:
-        raise HTTPException(404, "Page not found")
-
-    stmt = (
-        select(
-            t_content_image.c.id,
-            t_content_image.c.content_id,
-            t_content_image.c.url,
-            t_content_image.c.alt,
-            t_content_image.c.sort_order,
-            # yeni alanlar
-            t_content_image.c.width,
-            t_content_image.c.height,
-            t_content_image.c.created_at,
-            t_content_image.c.updated_at,
-        )
-        .where(t_content_image.c.content_id == ct_row["id"])
-        .order_by(t_content_image.c.sort_order, t_content_image.c.created_at, t_content_image.c.id)
+        .order_by(ci.c.sort_order, ci.c.created_at, ci.c.id)
     )
     rows = await fetch_all(stmt)
+    if not rows:
+        raise HTTPException(404, "Page not found")
+    page = rows[0]
+    tag_response(response, f"category:{page['page_category_id']}", f"heading:{page['page_h1_id']}",
+                 f"heading:{page['page_h2_id']}", f"content:{page['page_content_id']}",
+                 *(f"content_image:{r['id']}" for r in rows if r["id"] is not None))
     result = []
     for r in rows:
+        if r["id"] is None:
+            continue
         d = dict(r)
+        for k in ("page_category_id", "page_h1_id", "page_h2_id", "page_content_id"):
+            d.pop(k)
         if d.get("url"):
             d["url"] = _abs_url(request, d["url"]) 
         result.append(d)
@@ -298,7 +471,8 @@ async def list_images_by_page(category_slug: str, h1_slug: str, h2_slug: str, re
 
 
 @public_router.get("/menu", response_model=List[MenuNode])
-async def menu():
+async def menu(response: Response = None):
+    tag_response(response, "tree")
     cats_stmt = (
         select(
             t_category.c.id, t_category.c.name, t_category.c.slug, t_category.c.sort_order
@@ -346,8 +520,23 @@ async def menu():
         menu_all.extend(sorted(by_cat[c["id"]], key=lambda n: (n["sort_order"], n["title"])))
     return menu_all
 
+@public_router.get("/events")
+async def change_events():
+    """Server-Sent Events: içerik değişiklikleri (entity, id, op, revision)."""
+    if hub.full:
+        raise HTTPException(503, "Too many event stream clients", headers={"Retry-After": "5"})
+    return StreamingResponse(
+        hub.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @public_router.get("/search", response_model=List[dict])
-async def search(q: str = Query(..., min_length=2), limit: int = Query(20, ge=1, le=100)):
+async def search(q: str = Query(..., min_length=2), limit: int = Query(20, ge=1, le=100),
+                 response: Response = None):
+    # Sonuç kümesi herhangi bir yazmayla değişebilir, tek bir anahtarla purge edilemez: edge'de tutulmaz
+    if response is not None:
+        response.headers["Cache-Control"] = "no-store"
     return await fetch_all(
         """
         (
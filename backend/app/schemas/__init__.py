@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, model_validator, HttpUrl
 
@@ -146,10 +146,68 @@ class ContentImageOut(BaseModel):
     sort_order: int
     width: Optional[int] = 300
     height: Optional[int] = 200                   # yeni eklendi
+    placeholder: str = ""      # LQIP data URI: görsel inene kadar bulanık önizleme
+    dominant_color: str = ""   # "#rrggbb": placeholder yoksa düz arka plan
     created_at: datetime
     updated_at: datetime
 
 
+class UploadSessionCreate(BaseModel):
+    content_id: uuid.UUID
+    content_type: str
+    length: int = Field(gt=0)  # toplam bayt
+    alt: Optional[str] = ""
+    sort_order: Optional[int] = None  # boş/0 -> listenin sonuna
+    width: Optional[int] = 0
+    height: Optional[int] = 0
+
+
+class UploadSessionOut(BaseModel):
+    id: str
+    content_id: uuid.UUID
+    content_type: str
+    length: int
+    offset: int
+    expires_at: datetime
+
+
+# ---- Reorder ----
+class ReorderIn(BaseModel):
+    ids: List[uuid.UUID] = Field(min_length=1)  # yeni sıralama, baştan sona
+
+    @model_validator(mode="after")
+    def validate_unique(self):
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError("ids tekrar eden değer içeremez")
+        return self
+
+class ContentImageReorderIn(ReorderIn):
+    content_id: uuid.UUID
+
+
+# ---- Jobs ----
+# Admin panelinden elle tetiklenebilen iş tipleri (diğerleri endpoint'ler tarafından kuyruğa yazılır)
+ManualJobKind = Literal["snapshot.build", "render.refresh", "render.backfill", "uploads.gc", "images.backfill"]
+
+class JobCreate(BaseModel):
+    kind: ManualJobKind
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+class JobOut(BaseModel):
+    id: uuid.UUID
+    kind: str
+    status: str  # queued | running | done | failed
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 # ---- Public/View ----
 class ContentPublic(BaseModel):
     id: UUID
@@ -177,6 +235,11 @@ class PageOut(BaseModel):
     title: str
     body: str
 
+class RenderedContentOut(BaseModel):
+    content_id: uuid.UUID
+    revision: str
+    html: str
+
 from pydantic import Field as PydField
 
 class MenuNode(BaseModel):
@@ -0,0 +1,20 @@
+# bench/__init__.py
+"""Tekrarlanabilir yük/mikro-benchmark araçları (backend/ dizininden çalıştırın).
+
+    python -m bench.seed --reset --categories 5 --l1 8 --l2 10 --images 3 --body 4000
+    RATE_LIMIT_RPS=0 uvicorn main:app --port 8000   # DATABASE_URL seed ile aynı DB'yi göstermeli
+    python -m bench.run --concurrency 16 --requests 500 --out bench/out/HEAD.json
+    python -m bench.compare bench/out/base.json bench/out/HEAD.json
+    python -m bench.importtime --budget-ms 1200   # `import main` soğuk başlangıç bütçesi (DB gerekmez)
+
+seed, DDL.sql'i uygular ve sentetik korpusu yazar; yolları/kimlikleri bench/out/corpus.json
+manifestine koyar. run, manifestteki hedeflere HTTP istekleri atıp senaryo başına
+throughput ve p50/p95/p99'u JSON olarak raporlar; compare iki raporu karşılaştırır.
+"""
+from pathlib import Path
+
+OUT_DIR = Path(__file__).resolve().parent / "out"
+DEFAULT_MANIFEST = OUT_DIR / "corpus.json"
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
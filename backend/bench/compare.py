@@ -0,0 +1,54 @@
+# bench/compare.py
+"""İki bench.run raporunu karşılaştırır: python -m bench.compare base.json head.json
+
+--fail-over verilirse herhangi bir işlemin p95'i o yüzdeden fazla kötüleştiğinde
+çıkış kodu 1 olur (CI'da commit'ler arası gerileme kontrolü için).
+"""
+import argparse
+import json
+from pathlib import Path
+
+
+def _ops(report: dict) -> dict:
+    return {
+        f"{scenario}:{op}": stats
+        for scenario, res in report["scenarios"].items()
+        for op, stats in res["ops"].items()
+    }
+
+
+def _pct(base: float, head: float) -> float:
+    return (head - base) / base * 100 if base else 0.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("base", type=Path)
+    ap.add_argument("head", type=Path)
+    ap.add_argument("--fail-over", type=float, help="p95 gerileme eşiği (%)")
+    args = ap.parse_args()
+
+    base, head = json.loads(args.base.read_text()), json.loads(args.head.read_text())
+    b_ops, h_ops = _ops(base), _ops(head)
+    print(f"base {base['meta']['git_rev']}  ->  head {head['meta']['git_rev']}")
+    print(f"{'operation':<58} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'rps':>14}")
+
+    regressed = []
+    for key in sorted(b_ops.keys() & h_ops.keys()):
+        b, h = b_ops[key], h_ops[key]
+        cols = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            cols.append(f"{h[metric]:>8} ({_pct(b[metric], h[metric]):+5.1f}%)")
+        print(f"{key:<58} " + " ".join(cols))
+        if args.fail_over is not None and _pct(b["p95_ms"], h["p95_ms"]) > args.fail_over:
+            regressed.append(key)
+    for key in sorted(b_ops.keys() ^ h_ops.keys()):
+        print(f"{key:<58} (yalnızca {'base' if key in b_ops else 'head'} raporunda)")
+
+    if regressed:
+        print(f"p95 gerilemesi > %{args.fail_over}: {', '.join(regressed)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
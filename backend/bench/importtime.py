@@ -0,0 +1,90 @@
+# bench/importtime.py
+"""`import main` soğuk başlangıç bütçesi (scale-to-zero container'lar için):
+
+    python -m bench.importtime [--budget-ms 1200] [--runs 5] [--top 15] [--json]
+
+Her koşu ayrı bir `python -X importtime -c "import main"` sürecidir; en hızlı koşunun
+kümülatif süresi bütçeyle karşılaştırılır. Ağır ve yalnızca ilk kullanımda gereken
+modüller (LAZY_MODULES) import anında yüklenmişse ya da bütçe aşılırsa çıkış kodu 1 olur
+(CI'da kontrol olarak çalıştırılır; tests/test_importtime.py aynı kontrolü pytest'te yapar).
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1200"))
+
+# İlk yükleme / login / HTML render anında import edilmeli
+LAZY_MODULES = ("PIL", "passlib", "bcrypt", "markdown", "nh3", "httpx")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure() -> list[dict]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import main başarısız:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append({"module": m[4], "self_us": int(m[1]), "cumulative_us": int(m[2]),
+                         "depth": len(m[3]) // 2})
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    best = None
+    for _ in range(max(1, args.runs)):
+        rows = measure()
+        total = next(r["cumulative_us"] for r in rows if r["module"] == "main")
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total_us, rows = best
+
+    loaded = {r["module"] for r in rows}
+    eager = sorted(m for m in LAZY_MODULES if m in loaded)
+    # importtime çocukları ebeveynden önce yazar: main'in doğrudan import'ları ondan önceki depth=1 satırlar
+    end = next(i for i, r in enumerate(rows) if r["module"] == "main")
+    start = max((i for i in range(end) if rows[i]["depth"] == 0), default=-1) + 1
+    top = sorted((r for r in rows[start:end] if r["depth"] == 1),
+                 key=lambda r: -r["cumulative_us"])[: args.top]
+    result = {
+        "total_ms": round(total_us / 1000, 1),
+        "budget_ms": args.budget_ms,
+        "eager_heavy_modules": eager,
+        "top": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in top],
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import main: {result['total_ms']} ms (bütçe {args.budget_ms} ms, {args.runs} koşunun en iyisi)")
+        for r in result["top"]:
+            print(f"  {r['cumulative_ms']:>8} ms  {r['module']}")
+        if eager:
+            print(f"import anında yüklenen ağır modüller: {', '.join(eager)}")
+
+    if eager or result["total_ms"] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# bench/run.py
+"""Senaryo başına sabit eşzamanlılıkla istek atar; throughput ve p50/p95/p99 raporlar.
+
+Hedefler bench.seed manifestinden gelir. --asgi, uvicorn yerine uygulamayı süreç
+içinde (httpx.ASGITransport) çağırır: ağ/uvicorn maliyeti olmadan mikro-benchmark.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from bench import DEFAULT_MANIFEST
+
+SCENARIOS = ("menu", "page", "page_html", "search", "upload", "admin_crud")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def timed(self, op: str, call: Awaitable[httpx.Response], ok=(200, 201, 204)) -> httpx.Response:
+        t0 = time.perf_counter()
+        try:
+            resp = await call
+        except httpx.HTTPError:
+            self.errors[op] = self.errors.get(op, 0) + 1
+            raise
+        self.latencies.setdefault(op, []).append(time.perf_counter() - t0)
+        if resp.status_code not in ok:
+            self.errors[op] = self.errors.get(op, 0) + 1
+        return resp
+
+    def summary(self, wall: float) -> dict:
+        out = {}
+        for op, values in sorted(self.latencies.items()):
+            v = sorted(values)
+            out[op] = {
+                "requests": len(v),
+                "errors": self.errors.get(op, 0),
+                "rps": round(len(v) / wall, 1) if wall else 0.0,
+                "mean_ms": round(sum(v) / len(v) * 1000, 2),
+                "p50_ms": round(percentile(v, 50) * 1000, 2),
+                "p95_ms": round(percentile(v, 95) * 1000, 2),
+                "p99_ms": round(percentile(v, 99) * 1000, 2),
+                "max_ms": round(v[-1] * 1000, 2),
+            }
+        return out
+
+
+def _png() -> bytes:
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 48), (40, 120, 200)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, manifest: dict, rng: random.Random):
+        self.client = client
+        self.m = manifest
+        self.rng = rng
+        self.auth: Dict[str, str] = {}
+        self.png = b""
+
+    async def login(self) -> None:
+        r = await self.client.post("/admin/login", data={
+            "username": self.m["admin"]["email"], "password": self.m["admin"]["password"],
+        })
+        r.raise_for_status()
+        self.auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    # ---- senaryolar: bir iterasyon = bir ya da birkaç ölçülen istek ----
+    async def menu(self, rec: Recorder) -> None:
+        await rec.timed("GET /menu", self.client.get("/menu"))
+
+    async def page(self, rec: Recorder) -> None:
+        await rec.timed("GET /page/{c}/{h1}/{h2}", self.client.get(self.rng.choice(self.m["pages"])))
+
+    async def page_html(self, rec: Recorder) -> None:
+        cid = self.rng.choice(self.m["content_ids"])
+        await rec.timed("GET /contents/{id}/html", self.client.get(f"/contents/{cid}/html"))
+
+    async def search(self, rec: Recorder) -> None:
+        q = self.rng.choice(self.m["search_terms"])[: self.rng.randint(3, 8)]
+        await rec.timed("GET /search", self.client.get("/search", params={"q": q}))
+
+    async def upload(self, rec: Recorder) -> None:
+        cid = self.rng.choice(self.m["content_ids"])
+        r = await rec.timed("POST /admin/content-images/upload", self.client.post(
+            "/admin/content-images/upload", headers=self.auth,
+            data={"content_id": cid, "alt": "bench upload"},
+            files={"file": ("bench.png", self.png, "image/png")},
+        ))
+        if r.status_code == 201:
+            # Diski ve sort_order'ı büyütmemek için hemen geri al
+            await rec.timed("DELETE /admin/content-images/{id}", self.client.delete(
+                f"/admin/content-images/{r.json()['id']}", headers=self.auth))
+
+    async def admin_crud(self, rec: Recorder) -> None:
+        parent = self.rng.choice(self.m["l1_ids"])
+        title = f"bench {self.rng.getrandbits(48):x}"
+        r = await rec.timed("POST /admin/headings", self.client.post(
+            "/admin/headings", headers=self.auth,
+            json={"level": 2, "parent_heading_id": parent, "title": title},
+        ))
+        if r.status_code != 200:
+            return
+        hid = r.json()["id"]
+        r = await rec.timed("POST /admin/contents", self.client.post(
+            "/admin/contents", headers=self.auth,
+            json={"heading_id": hid, "body": f"# {title}\n\nbench body"},
+        ))
+        if r.status_code == 200:
+            await rec.timed("PUT /admin/contents/{id}", self.client.put(
+                f"/admin/contents/{r.json()['id']}", headers=self.auth,
+                json={"body": f"# {title}\n\nupdated"},
+            ))
+        await rec.timed("DELETE /admin/headings/{id}", self.client.delete(
+            f"/admin/headings/{hid}", headers=self.auth))
+
+
+async def drive(step: Callable[[Recorder], Awaitable[None]], requests: int, concurrency: int,
+                warmup: int) -> dict:
+    warm = Recorder()
+    for _ in range(warmup):
+        try:
+            await step(warm)
+        except httpx.HTTPError:
+            pass
+
+    rec = Recorder()
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            try:
+                await step(rec)
+            except httpx.HTTPError:
+                pass
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    return {"wall_seconds": round(wall, 3), "ops": rec.summary(wall)}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args) -> dict:
+    manifest = json.loads(args.manifest.read_text())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.asgi:
+        from main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    else:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+
+    async with client:
+        bench = Bench(client, manifest, random.Random(args.seed))
+        scenarios = args.scenarios
+        if {"upload", "admin_crud"} & set(scenarios):
+            await bench.login()
+            bench.png = _png()
+
+        results = {}
+        for name in scenarios:
+            results[name] = await drive(getattr(bench, name), args.requests, args.concurrency, args.warmup)
+
+    return {
+        "meta": {
+            "git_rev": _git_rev(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": "asgi" if args.asgi else args.base_url,
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "corpus": manifest["params"],
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--base-url", default="http://localhost:8000")
+    ap.add_argument("--asgi", action="store_true", help="uygulamayı süreç içinde çağır")
+    ap.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    ap.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=500, help="senaryo başına iterasyon")
+    ap.add_argument("--warmup", type=int, default=20)
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", type=Path, help="JSON raporu (verilmezse stdout)")
+    args = ap.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
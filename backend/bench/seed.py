@@ -0,0 +1,190 @@
+# bench/seed.py
+"""Sentetik korpus: kategoriler × L1 × L2 (her L2'de içerik) × görseller × gövde uzunluğu.
+
+--reset, hedef DB'nin public şemasını silip DDL.sql'i baştan uygular; yalnızca
+benchmark için ayrılmış bir veritabanında kullanın (BENCH_DATABASE_URL).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from bench import BENCH_EMAIL, BENCH_PASSWORD, DEFAULT_MANIFEST
+
+DDL_PATH = Path(__file__).resolve().parents[1] / "DDL.sql"
+
+# Arama senaryosu bu kelimelerden sorgu seçer; gövdeler de bunlardan üretilir
+VOCABULARY = [
+    "kurulum", "yapilandirma", "kimlik", "dogrulama", "yetki", "sunucu", "istemci",
+    "veritabani", "indeks", "sorgu", "onbellek", "dagitim", "guncelleme", "yedekleme",
+    "gunluk", "izleme", "metrik", "performans", "guvenlik", "sertifika", "entegrasyon",
+    "webhook", "kuyruk", "zamanlayici", "dosya", "gorsel", "arama", "filtre", "sayfa",
+    "surum", "migration", "transaction", "replication", "cluster", "latency", "throughput",
+]
+IMAGE_PLACEHOLDER = "<--image-->"
+SORT_GAP = 1024
+
+
+def _dsn(url: str) -> str:
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def _body(rng: random.Random, length: int, images: int) -> str:
+    parts, size, n = [], 0, 0
+    while size < length:
+        if n % 6 == 0:
+            parts.append(f"## {rng.choice(VOCABULARY).title()} {n}\n")
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(12)).capitalize() + ".\n"
+        parts.append(sentence)
+        size += len(sentence)
+        n += 1
+    # Yer tutucuları paragraflara eşit aralıkla dağıt
+    step = max(1, len(parts) // (images + 1))
+    for i in range(images, 0, -1):
+        parts.insert(min(len(parts), i * step), f"\n{IMAGE_PLACEHOLDER}\n")
+    return "\n".join(parts)
+
+
+async def _insert_ids(conn, sql: str, *columns) -> list:
+    rows = await conn.fetch(sql, *columns)
+    return [r["id"] for r in rows]
+
+
+async def seed(dsn: str, categories: int, l1: int, l2: int, images: int, body: int,
+               reset: bool, rng_seed: int) -> dict:
+    import asyncpg
+    from passlib.context import CryptContext
+
+    rng = random.Random(rng_seed)
+    conn = await asyncpg.connect(dsn)
+    try:
+        if reset:
+            await conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+            await conn.execute(DDL_PATH.read_text(encoding="utf-8"))
+
+        phash = CryptContext(schemes=["bcrypt"]).hash(BENCH_PASSWORD)
+        await conn.execute(
+            "INSERT INTO admin_user (email, password_hash) VALUES ($1, $2) "
+            "ON CONFLICT (email) DO UPDATE SET password_hash = EXCLUDED.password_hash",
+            BENCH_EMAIL, phash,
+        )
+
+        t0 = time.perf_counter()
+        async with conn.transaction():
+            run = f"{rng_seed}-{int(time.time())}"
+            cat_ids = await _insert_ids(
+                conn,
+                "INSERT INTO category (name, description, sort_order) "
+                "SELECT n, d, s FROM unnest($1::text[], $2::text[], $3::int[]) AS t(n, d, s) RETURNING id",
+                [f"Bench {run} Category {i}" for i in range(categories)],
+                [" ".join(rng.sample(VOCABULARY, 5)) for _ in range(categories)],
+                [(i + 1) * SORT_GAP for i in range(categories)],
+            )
+
+            l1_cat = [c for c in cat_ids for _ in range(l1)]
+            l1_ids = await _insert_ids(
+                conn,
+                "INSERT INTO heading (level, category_id, title, description, sort_order) "
+                "SELECT 1, c, t, d, s FROM unnest($1::uuid[], $2::text[], $3::text[], $4::int[]) "
+                "AS x(c, t, d, s) RETURNING id",
+                l1_cat,
+                [f"Section {i % l1} {rng.choice(VOCABULARY)}" for i in range(len(l1_cat))],
+                [" ".join(rng.sample(VOCABULARY, 4)) for _ in l1_cat],
+                [(i % l1 + 1) * SORT_GAP for i in range(len(l1_cat))],
+            )
+
+            l2_parent = [h for h in l1_ids for _ in range(l2)]
+            l2_ids = await _insert_ids(
+                conn,
+                "INSERT INTO heading (level, parent_heading_id, title, description, sort_order) "
+                "SELECT 2, p, t, d, s FROM unnest($1::uuid[], $2::text[], $3::text[], $4::int[]) "
+                "AS x(p, t, d, s) RETURNING id",
+                l2_parent,
+                [f"Topic {i % l2} {rng.choice(VOCABULARY)}" for i in range(len(l2_parent))],
+                [" ".join(rng.sample(VOCABULARY, 4)) for _ in l2_parent],
+                [(i % l2 + 1) * SORT_GAP for i in range(len(l2_parent))],
+            )
+
+            content_ids = await _insert_ids(
+                conn,
+                "INSERT INTO content (heading_id, body, description) "
+                "SELECT h, b, d FROM unnest($1::uuid[], $2::text[], $3::text[]) AS x(h, b, d) RETURNING id",
+                l2_ids,
+                [_body(rng, body, images) for _ in l2_ids],
+                [" ".join(rng.sample(VOCABULARY, 6)) for _ in l2_ids],
+            )
+
+            if images:
+                img_content = [c for c in content_ids for _ in range(images)]
+                await conn.execute(
+                    "INSERT INTO content_image (content_id, url, alt, sort_order, width, height) "
+                    "SELECT c, u, a, s, 800, 600 FROM unnest($1::uuid[], $2::text[], $3::text[], $4::int[]) "
+                    "AS x(c, u, a, s)",
+                    img_content,
+                    [f"/static/bench/{i}.png" for i in range(len(img_content))],
+                    [f"bench image {i % images}" for i in range(len(img_content))],
+                    [(i % images + 1) * SORT_GAP for i in range(len(img_content))],
+                )
+
+        seeded_s = time.perf_counter() - t0
+        await conn.execute("ANALYZE")
+
+        # Manifest: run.py'nin hedefleri (yalnızca bu çalıştırmanın kategorileri)
+        pages = await conn.fetch(
+            """
+            SELECT c.slug AS c, h1.slug AS h1, h2.slug AS h2, ct.id AS content_id
+            FROM category c
+            JOIN heading h1 ON h1.category_id = c.id AND h1.level = 1
+            JOIN heading h2 ON h2.parent_heading_id = h1.id AND h2.level = 2
+            JOIN content ct ON ct.heading_id = h2.id
+            WHERE c.id = ANY($1::uuid[])
+            """,
+            cat_ids,
+        )
+    finally:
+        await conn.close()
+
+    return {
+        "params": {"categories": categories, "l1": l1, "l2": l2, "images": images,
+                   "body": body, "seed": rng_seed},
+        "seed_seconds": round(seeded_s, 3),
+        "admin": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+        "pages": [f"/page/{p['c']}/{p['h1']}/{p['h2']}" for p in pages],
+        "content_ids": [str(p["content_id"]) for p in pages],
+        "l1_ids": [str(i) for i in l1_ids],
+        "search_terms": VOCABULARY,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL"))
+    ap.add_argument("--categories", type=int, default=5)
+    ap.add_argument("--l1", type=int, default=8, help="kategori başına L1")
+    ap.add_argument("--l2", type=int, default=10, help="L1 başına L2 (her biri içerikli)")
+    ap.add_argument("--images", type=int, default=3, help="içerik başına görsel")
+    ap.add_argument("--body", type=int, default=4000, help="içerik gövdesi (karakter)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--reset", action="store_true", help="public şemasını sil, DDL.sql uygula")
+    ap.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST)
+    args = ap.parse_args()
+    if not args.dsn:
+        raise SystemExit("BENCH_DATABASE_URL / DATABASE_URL ya da --dsn gerekli")
+
+    manifest = asyncio.run(seed(
+        _dsn(args.dsn), args.categories, args.l1, args.l2, args.images, args.body,
+        args.reset, args.seed,
+    ))
+    args.manifest.parent.mkdir(parents=True, exist_ok=True)
+    args.manifest.write_text(json.dumps(manifest, indent=2))
+    print(json.dumps({"manifest": str(args.manifest), "pages": len(manifest["pages"]),
+                      "seed_seconds": manifest["seed_seconds"]}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# bench/slugs.py
+"""Aynı başlıklı N heading eklemenin maliyeti (slug tahsisi):
+
+    python -m bench.slugs --count 10000 [--legacy]
+
+Tek transaction içinde çalışır ve rollback eder; DDL.sql uygulanmış herhangi bir DB'de
+güvenle koşturulabilir. --legacy, eski WHILE EXISTS döngülü set_heading_slug'ı aynı
+transaction içinde geçici olarak yükleyip karşılaştırır (N=10k'da dakikalar sürebilir).
+
+Boş bir DB'de trigger planları (plpgsql ilk satırda önbelleğe alır) boş tablo için seq scan
+seçer ve sonuç gerçekçi olmaz: önce `python -m bench.seed` ve ANALYZE çalıştırın.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from bench.seed import _dsn
+
+LEGACY_SET_HEADING_SLUG = """
+CREATE OR REPLACE FUNCTION set_heading_slug()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE base text; s text; i int := 2;
+BEGIN
+  base := normalize_slug(NEW.title);
+  s := base;
+  IF NEW.level = 1 THEN
+    WHILE EXISTS (
+      SELECT 1 FROM heading h
+      WHERE h.level = 1 AND h.category_id = NEW.category_id AND h.slug = s
+            AND h.id <> COALESCE(NEW.id, '00000000-0000-0000-0000-000000000000'::uuid)
+    ) LOOP
+      s := base || '-' || i; i := i + 1;
+    END LOOP;
+  ELSE
+    WHILE EXISTS (
+      SELECT 1 FROM heading h
+      WHERE h.level = 2 AND h.parent_heading_id = NEW.parent_heading_id AND h.slug = s
+            AND h.id <> COALESCE(NEW.id, '00000000-0000-0000-0000-000000000000'::uuid)
+    ) LOOP
+      s := base || '-' || i; i := i + 1;
+    END LOOP;
+  END IF;
+  NEW.slug := s;
+  RETURN NEW;
+END;$$;
+"""
+
+
+async def _insert_same_titled(conn, label: str, count: int) -> dict:
+    cat_id = await conn.fetchval(
+        "INSERT INTO category (name) VALUES ($1) RETURNING id", f"slug bench {label} {time.time_ns()}")
+    t0 = time.perf_counter()
+    await conn.execute(
+        "INSERT INTO heading (level, category_id, title, sort_order) "
+        "SELECT 1, $1, 'Same Title', g FROM generate_series(1, $2) AS g",
+        cat_id, count,
+    )
+    elapsed = time.perf_counter() - t0
+    distinct, last = await conn.fetchrow(
+        "SELECT count(DISTINCT slug), max(slug) FILTER (WHERE sort_order = $2) "
+        "FROM heading WHERE category_id = $1", cat_id, count)
+    return {
+        "count": count,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(count / elapsed, 1) if elapsed else None,
+        "distinct_slugs": distinct,
+        "last_slug": last,
+    }
+
+
+async def run(dsn: str, count: int, legacy: bool) -> dict:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        tr = conn.transaction()
+        await tr.start()
+        try:
+            result = {"current": await _insert_same_titled(conn, "current", count)}
+            if legacy:
+                await conn.execute(LEGACY_SET_HEADING_SLUG)  # DDL transactional: rollback ile geri döner
+                result["legacy"] = await _insert_same_titled(conn, "legacy", count)
+        finally:
+            await tr.rollback()
+    finally:
+        await conn.close()
+    return result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL"))
+    ap.add_argument("--count", type=int, default=10_000)
+    ap.add_argument("--legacy", action="store_true", help="eski döngülü trigger ile karşılaştır")
+    args = ap.parse_args()
+    if not args.dsn:
+        raise SystemExit("BENCH_DATABASE_URL / DATABASE_URL ya da --dsn gerekli")
+    print(json.dumps(asyncio.run(run(_dsn(args.dsn), args.count, args.legacy)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+# Üretim: gunicorn -c gunicorn.conf.py main:app   (POSIX; Windows/geliştirme için uvicorn main:app --reload)
+#
+# - preload_app: uygulama master'da bir kez import edilir, worker'lar fork ile kopyalar
+#   (hızlı spawn, paylaşılan bellek). Import sırasında DB bağlantısı açılmaz; havuz
+#   post_fork'ta sıfırlanır ve her worker lifespan'de kendi bağlantılarını ısıtır.
+# - Worker, lifespan (app/core/warmup.py) bitmeden bağlantı kabul etmez; /healthz
+#   worker'ın pid/ready durumunu döner.
+# - Kademeli yeniden başlatma: `kill -HUP <master>` yeni worker'ları açar, eskiler
+#   graceful_timeout içinde elindeki istekleri bitirip kapanır. preload_app ile kod
+#   değişikliği için USR2 (yeni master) + eski master'a QUIT kullanın.
+import multiprocessing
+import os
+
+from app.core.config import FORWARDED_ALLOW_IPS, WEB_CONCURRENCY
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = WEB_CONCURRENCY or multiprocessing.cpu_count() * 2 + 1
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# UvicornWorker bunu proxy_headers'a geçirir: istemci IP'si (rate limit anahtarı) güvenilen
+# proxy'lerin X-Forwarded-For'undan gelir
+forwarded_allow_ips = FORWARDED_ALLOW_IPS
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Bellek sızıntılarına karşı worker'ları ara ara yenile (jitter: hepsi aynı anda değil)
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Master'dan kopyalanan havuz durumunu bırak (bağlantıları kapatmadan): her worker kendi havuzunu açar
+    from app.db.session import engine
+
+    engine.sync_engine.dispose(close=False)
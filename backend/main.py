@@ -1,18 +1,85 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from sqlalchemy.exc import DBAPIError
 
 from app.core.config import (
     APP_TITLE, APP_VERSION, FRONTEND_ORIGIN,
-    STATIC_MOUNT_PATH, ABS_UPLOADS_DIR
+    STATIC_MOUNT_PATH, ABS_UPLOADS_DIR, CHANGE_FEED_ENABLED, WARMUP_ENABLED, LASTGOOD_ENABLED
 )
-from app.db.session import fetch_one
+from app.core.admission import AdmissionMiddleware
+from app.core.cancellation import CancelOnDisconnectMiddleware
+from app.core.cdn import cdn, tag_response
+from app.core.changes import changes
+from app.core.events import hub
+from app.core.jobs import jobs
+from app.core.lastgood import LastGoodMiddleware, db_health
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.querybudget import QueryBudgetMiddleware
+from app.core.sharedcache import SharedCacheMiddleware, shared_cache
+from app.core.singleflight import SingleFlightMiddleware
+from app.core.snapshot import snapshots
+from app.core.uploads_gc import schedule_periodic as schedule_uploads_gc
+from app.core.warmup import readiness, warm_up
+from app.db.session import fetch_one, is_statement_timeout, query_cache
 from app.routers.admin import admin_router
-from app.routers.public import public_router
+from app.routers.public import public_router, renders
 
-app = FastAPI(title=APP_TITLE, version=APP_VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import sırasında dosya sistemi yan etkisi yok: upload klasörü burada açılır
+    Path(ABS_UPLOADS_DIR).mkdir(parents=True, exist_ok=True)
+    # Önbellekler hem yerel hem de diğer node'lardaki yazmalardan haberdar olur; snapshot
+    # yenilemesi yalnızca yazmayı yapan süreçte (N worker aynı klasörü N kez üretmesin)
+    changes.subscribe(snapshots.on_change, local_only=True)
+    changes.subscribe(hub.on_change)
+    changes.subscribe(shared_cache.on_change)
+    changes.subscribe(query_cache.on_change)
+    # Purge yalnızca yazmayı yapan node'dan (NOTIFY yankısı diğer node'larda tekrar tetiklemez)
+    changes.subscribe(cdn.on_change, local_only=True)
+    # Render önbelleği public GET'te değil, yazmadan sonra iş kuyruğunda doldurulur
+    changes.subscribe(renders.on_change, local_only=True)
+    if CHANGE_FEED_ENABLED:
+        changes.start()
+    jobs.start()  # JOB_WORKERS=0 ise başlamaz
+    gc_task = asyncio.create_task(schedule_uploads_gc())
+    # Havuz, prepared statement'lar ve sıcak sorgular hazır olmadan trafik kabul etme
+    await warm_up(WARMUP_ENABLED)
+    yield
+    gc_task.cancel()
+    await jobs.stop()
+    await changes.stop()
+    await shared_cache.close()
+    await cdn.stop()
+    await db_health.stop()
 
+app = FastAPI(title=APP_TITLE, version=APP_VERSION, lifespan=lifespan)
+
+# --- Public snapshot: varsa önceden render edilmiş JSON'dan servis et ---
+# (CORS'tan önce eklenir ki CORS bu yanıtları da sarmalasın)
+@app.middleware("http")
+async def serve_snapshot(request: Request, call_next):
+    if request.method == "GET":
+        hit = snapshots.lookup(request.url.path)
+        if hit:
+            request.scope["metrics_route"] = "<snapshot>"
+            response = Response(hit.body, media_type="application/json",
+                                headers={"X-Snapshot": hit.version})
+            # Handler'ın yazıldığı andaki etiketler: CDN purge'ü snapshot yanıtlarını da bulur
+            tag_response(response, *hit.tags)
+            return response
+    return await call_next(request)
+
+# DB kesintisinde son başarılı yanıtlar (single-flight'ın içinde: birleşen istekler aynı yedeği paylaşır)
+app.add_middleware(LastGoodMiddleware)
+# CORS'un içinde: birleşik yanıt her istemciye kendi CORS başlıklarıyla döner
+app.add_middleware(SingleFlightMiddleware)
+# Node'lar arası yanıt önbelleği (SHARED_CACHE_URL); ıskalamalar yukarıdaki single-flight'tan geçer
+app.add_middleware(SharedCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[FRONTEND_ORIGIN, "http://localhost:5173", "http://127.0.0.1:5173"],
@@ -20,19 +87,50 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# İstemci giderse GET işleyicisi (ve uçuştaki sorgusu) iptal edilir; admission slot'u da hemen boşalır
+app.add_middleware(CancelOnDisconnectMiddleware)
+# QUERY_BUDGET_MODE=off iken doğrudan geçer
+app.add_middleware(QueryBudgetMiddleware)
+# Router'lardan (ve DB havuzundan) önce: fazla yük hızlı 429/503/413 ile geri çevrilir
+app.add_middleware(AdmissionMiddleware)
+# En dışta: tüm istekleri (snapshot yanıtları dahil) ölçer
+app.add_middleware(MetricsMiddleware)
 
 # --- Static mount: /static and /api/static -> ABS_UPLOADS_DIR ---
-Path(ABS_UPLOADS_DIR).mkdir(parents=True, exist_ok=True)
-app.mount(STATIC_MOUNT_PATH, StaticFiles(directory=ABS_UPLOADS_DIR), name="static")
-app.mount("/api" + STATIC_MOUNT_PATH, StaticFiles(directory=ABS_UPLOADS_DIR), name="api-static")
+# (klasör lifespan'de oluşturulur; check_dir=False ile import anında var olması gerekmez)
+app.mount(STATIC_MOUNT_PATH, StaticFiles(directory=ABS_UPLOADS_DIR, check_dir=False), name="static")
+app.mount("/api" + STATIC_MOUNT_PATH, StaticFiles(directory=ABS_UPLOADS_DIR, check_dir=False), name="api-static")
 
 app.include_router(admin_router)
 app.include_router(public_router)
 
+@app.exception_handler(DBAPIError)
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    # STATEMENT_TIMEOUTS aşıldı: 500 yerine tekrar denenebilir 503
+    if is_statement_timeout(exc):
+        return JSONResponse({"detail": "Query timed out"}, status_code=503, headers={"Retry-After": "1"})
+    raise exc
+
 @app.get("/healthz", tags=["meta"])
 async def healthz():
+    # Worker başına: pid, ısınma durumu; ısınmamış worker 503 döner (yük dengeleyici readiness'i)
+    if not readiness.ready:
+        return JSONResponse({"ok": False, **readiness.as_dict()}, status_code=503)
+    if db_health.degraded and LASTGOOD_ENABLED:
+        # Kesinti sürüyor: havuz zaman aşımını bekleme, DB'yi arka plandaki probe izler
+        return {"ok": True, **readiness.as_dict(), **db_health.as_dict()}
     try:
         row = await fetch_one("SELECT 1 AS ok")
-        return {"ok": bool(row)}
     except Exception as e:
-        raise HTTPException(500, f"DB error: {e}")
+        db_health.mark_down(e)
+        if not LASTGOOD_ENABLED:
+            return JSONResponse({"ok": False, **readiness.as_dict(), **db_health.as_dict()}, status_code=503)
+        # 200 + degraded: DB kesintisinde tüm node'lar rotasyondan çıkarsa last-good yanıtlar
+        # hiçbir istemciye ulaşmaz
+        return {"ok": True, **readiness.as_dict(), **db_health.as_dict()}
+    db_health.mark_up()
+    return {"ok": bool(row), **readiness.as_dict(), **db_health.as_dict()}
+
+@app.get("/metrics", tags=["meta"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
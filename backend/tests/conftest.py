@@ -0,0 +1,59 @@
+# tests/conftest.py
+"""Ortak test kurulumu.
+
+app.core.config değerleri import anında env'den okunur: uygulama modülleri import
+edilmeden önce test ortamı burada kurulur. DB'ye giden testler TEST_DATABASE_URL
+(DDL.sql uygulanmış, boş ya da bench verili bir Postgres) yoksa atlanır.
+"""
+import os
+import tempfile
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+_tmp = tempfile.mkdtemp(prefix="docs-tests-")
+os.environ.update({
+    "DATABASE_URL": TEST_DATABASE_URL or "postgresql+asyncpg://postgres@localhost:5432/unused",
+    # Bütçe aşımı/N+1 istek içinde QueryBudgetExceeded fırlatır, TestClient bunu teste taşır
+    "QUERY_BUDGET_MODE": "raise",
+    # Arka plan görevleri ve önbellekler kapalı: her istek gerçekten DB'ye gider
+    "CHANGE_FEED_ENABLED": "0",
+    "JOB_WORKERS": "0",
+    "WARMUP_ENABLED": "0",
+    "LASTGOOD_ENABLED": "0",
+    "SINGLEFLIGHT_ENABLED": "0",
+    "SHARED_CACHE_URL": "",
+    "QUERY_CACHE_SIZE": "0",
+    "RATE_LIMIT_RPS": "0",
+    "UPLOADS_GC_INTERVAL_SECONDS": "0",
+    "SNAPSHOT_DIR": os.path.join(_tmp, "snapshots"),
+    "LASTGOOD_DIR": os.path.join(_tmp, "lastgood"),
+    "UPLOADS_DIR": os.path.join(_tmp, "uploads"),
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    # Tek istemci = tek event loop: havuzdaki asyncpg bağlantıları testler arasında paylaşılır
+    with TestClient(app) as c:
+        yield c
+
+
+async def sql(*statements):
+    """Uygulamanın havuzundan bağımsız asyncpg bağlantısında (sorgu, *arg) ifadelerini çalıştırır."""
+    import asyncpg
+    from sqlalchemy.engine import make_url
+
+    dsn = make_url(TEST_DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    conn = await asyncpg.connect(dsn)
+    try:
+        return [await conn.fetchrow(q, *args) for q, *args in statements]
+    finally:
+        await conn.close()
@@ -0,0 +1,20 @@
+# tests/test_importtime.py
+"""`import main` soğuk başlangıç bütçesi (bench/importtime.py; DB gerekmez)."""
+from bench.importtime import BUDGET_MS, LAZY_MODULES, measure
+
+RUNS = 3
+
+
+def _cumulative_ms(rows, module: str) -> float:
+    return next(r["cumulative_us"] for r in rows if r["module"] == module) / 1000
+
+
+def test_heavy_modules_are_not_imported_eagerly():
+    loaded = {r["module"] for r in measure()}
+    assert not sorted(m for m in LAZY_MODULES if m in loaded)
+
+
+def test_import_main_within_budget():
+    # Koşular arası gürültü: bench/importtime gibi en hızlı koşu bütçeyle karşılaştırılır
+    best = min(_cumulative_ms(measure(), "main") for _ in range(RUNS))
+    assert best <= BUDGET_MS, f"import main {best:.1f} ms > budget {BUDGET_MS} ms"
@@ -0,0 +1,25 @@
+# tests/test_jobs.py
+"""İş kuyruğu (app/core/jobs.py): talep commit edilir, aynı iş iki kez alınmaz."""
+import asyncio
+
+from app.core.jobs import JobQueue
+from tests.conftest import sql
+
+
+def test_claimed_job_is_not_claimed_again(client):
+    # Çok eski run_after: kuyrukta bekleyen başka işler olsa da ilk talep bunu alır
+    job, = asyncio.run(sql((
+        "INSERT INTO job (kind, run_after) VALUES ('test.claim', now() - interval '100 years') RETURNING id",)))
+    try:
+        first = client.portal.call(JobQueue()._claim)
+        second = client.portal.call(JobQueue()._claim)
+        row, = asyncio.run(sql(("SELECT status, attempts, locked_by FROM job WHERE id = $1", job["id"])))
+    finally:
+        asyncio.run(sql(("DELETE FROM job WHERE id = $1", job["id"])))
+
+    assert first is not None and first["id"] == job["id"]
+    assert second is None or second["id"] != job["id"]
+    # Talep başka bir bağlantıdan görünür: commit edildi
+    assert row["status"] == "running"
+    assert row["attempts"] == 1
+    assert row["locked_by"]
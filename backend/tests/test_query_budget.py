@@ -0,0 +1,76 @@
+# tests/test_query_budget.py
+"""Public route'ların sorgu bütçesi (QUERY_BUDGET_MODE=raise, app/core/querybudget.py)."""
+import asyncio
+import re
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import QUERY_BUDGET
+from app.core.querybudget import QueryBudgetExceeded, QueryBudgetMiddleware
+from app.db.session import request_query_stats
+from tests.conftest import sql
+
+_SERVER_TIMING = re.compile(r'db;dur=([0-9.]+);desc="(\d+) queries"')
+
+
+def _queries(response) -> int:
+    m = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+    assert m, f"no db Server-Timing entry: {response.headers.get('server-timing')!r}"
+    return int(m.group(2))
+
+
+@pytest.fixture(scope="module")
+def page(client):
+    """Kategori > L1 > L2 > içerik; slug'lar trigger'dan gelir, modül sonunda kategoriyle birlikte silinir."""
+    name = f"budget {uuid.uuid4().hex[:8]}"
+    cat, = asyncio.run(sql(("INSERT INTO category (name) VALUES ($1) RETURNING id, slug", name)))
+    h1, = asyncio.run(sql((
+        "INSERT INTO heading (category_id, level, title) VALUES ($1, 1, 'giris') RETURNING id, slug",
+        cat["id"])))
+    h2, content = asyncio.run(sql(
+        ("INSERT INTO heading (parent_heading_id, level, title) VALUES ($1, 2, 'kurulum') RETURNING id, slug",
+         h1["id"]),
+        ("INSERT INTO content (heading_id, body) SELECT id, '# kurulum' FROM heading "
+         "WHERE parent_heading_id = $1 RETURNING id", h1["id"]),
+    ))
+    yield {"category": cat["slug"], "h1": h1["slug"], "h2": h2["slug"], "content_id": content["id"]}
+    asyncio.run(sql(("DELETE FROM category WHERE id = $1", cat["id"])))
+
+
+@pytest.mark.parametrize("path", [
+    "/categories",
+    "/menu",
+    "/categories/{category}/headings",
+    "/categories/{category}/{h1}/headings",
+    "/page/{category}/{h1}/{h2}",
+    "/page/{category}/{h1}/{h2}/images",
+    "/contents/{content_id}/html",
+])
+def test_public_route_within_query_budget(client, page, path):
+    # raise modunda bütçe aşımı ya da N+1 isteği QueryBudgetExceeded ile düşürür
+    response = client.get(path.format(**page))
+    assert response.status_code == 200
+    assert 1 <= _queries(response) <= QUERY_BUDGET
+
+
+def test_raise_mode_rejects_route_over_budget():
+    async def chatty(request):
+        # Aynı sorguyu üç kez çalıştırmış gibi say (DB gerekmez)
+        stats = request_query_stats.get()
+        stats.count += 3
+        stats.by_fingerprint["abc123"] += 3
+        return PlainTextResponse("ok")
+
+    app = QueryBudgetMiddleware(Starlette(routes=[Route("/chatty", chatty)]), mode="raise", budget=2)
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /chatty: 3 queries > budget 2"):
+        TestClient(app).get("/chatty")
+
+    app.mode = "log"
+    response = TestClient(app).get("/chatty")
+    assert response.status_code == 200
+    assert _queries(response) == 3
@@ -0,0 +1,27 @@
+# tests/test_query_cache.py
+"""Sorgu önbelleği (app/db/session.py QueryCache) geçersiz kılma sayacı."""
+import re
+
+from app.core.metrics import registry
+from app.db.session import QueryCache
+
+
+def _invalidations() -> dict:
+    return {m.group(1): float(m.group(2)) for m in re.finditer(
+        r'^query_cache_invalidations_total\{table="(\w+)"\} ([0-9.]+)$', registry.render(), re.M)}
+
+
+def test_invalidation_counts_each_dropped_entry_once():
+    cache = QueryCache(100)
+    for i in range(3):
+        cache.put(("h", i), frozenset({"heading"}), cache.snapshot(frozenset({"heading"})), i, 60)
+    cache.put(("c", 0), frozenset({"content"}), cache.snapshot(frozenset({"content"})), 0, 60)
+
+    before = _invalidations()
+    # heading yazması content'e de kaskad eder: yine de her giriş tek tabloya sayılır
+    cache.invalidate({"heading", "content"})
+    after = _invalidations()
+
+    delta = {t: after[t] - before.get(t, 0.0) for t in after if after[t] != before.get(t, 0.0)}
+    assert sum(delta.values()) == 4
+    assert not cache._entries
@@ -0,0 +1,26 @@
+# tests/test_render.py
+"""Sunucu tarafı markdown render'ı (app/core/render.py) remark-gfm'in GFM eklentilerini de kapsar."""
+from app.core.render import render_body
+
+
+def test_strikethrough():
+    assert render_body("a ~~b **c**~~ d ~e~", []) == "<p>a <del>b <strong>c</strong></del> d <del>e</del></p>"
+
+
+def test_task_list():
+    html = render_body("- [ ] one\n- [x] two\n- three", [])
+    assert '<li><input disabled="" type="checkbox"> one</li>' in html
+    assert '<li><input checked="" disabled="" type="checkbox"> two</li>' in html
+    assert "<li>three</li>" in html
+
+
+def test_bare_urls_are_linked_once():
+    html = render_body("see https://x.com/a_b. and www.ex.com [https://y.io](https://y.io) `https://z`", [])
+    assert '<a href="https://x.com/a_b" rel="noopener noreferrer">https://x.com/a_b</a>.' in html
+    assert '<a href="http://www.ex.com" rel="noopener noreferrer">www.ex.com</a>' in html
+    assert html.count("https://y.io</a>") == 1 and "<a><a" not in html
+    assert "<code>https://z</code>" in html
+
+
+def test_only_checkbox_inputs_survive_sanitizing():
+    assert render_body('<input type="text" value="x">', []) == "<p><input></p>"
@@ -0,0 +1,40 @@
+# tests/test_snapshot.py
+"""Snapshot yanıtları (app/core/snapshot.py) DB yanıtlarıyla aynı surrogate key'leri taşır."""
+import asyncio
+import uuid
+
+from app.core.snapshot import snapshots
+from tests.conftest import sql
+
+
+def test_snapshot_response_keeps_surrogate_keys(client):
+    cat, = asyncio.run(sql((
+        "INSERT INTO category (name) VALUES ($1) RETURNING id, slug", f"snap {uuid.uuid4().hex[:8]}")))
+    try:
+        h1, = asyncio.run(sql((
+            "INSERT INTO heading (category_id, level, title) VALUES ($1, 1, 'giris') RETURNING id, slug",
+            cat["id"])))
+        h2, _ = asyncio.run(sql(
+            ("INSERT INTO heading (parent_heading_id, level, title) VALUES ($1, 2, 'kurulum') RETURNING id, slug",
+             h1["id"]),
+            ("INSERT INTO content (heading_id, body) SELECT id, 'x' FROM heading WHERE parent_heading_id = $1",
+             h1["id"]),
+        ))
+        paths = [f"/categories/{cat['slug']}/headings", f"/page/{cat['slug']}/{h1['slug']}/{h2['slug']}"]
+        from_db = {p: client.get(p) for p in paths}
+
+        # Yalnızca bu kategoriyi içeren bir versiyon yayınla (tam build bench verisinde yavaş)
+        async def render(out):
+            await snapshots._render_category(out, cat["slug"])
+
+        client.portal.call(snapshots._publish, render)
+        try:
+            for p in paths:
+                response = client.get(p)
+                assert response.headers.get("x-snapshot")
+                assert response.headers["surrogate-key"] == from_db[p].headers["surrogate-key"]
+                assert response.json() == from_db[p].json()
+        finally:
+            snapshots.drop()
+    finally:
+        asyncio.run(sql(("DELETE FROM category WHERE id = $1", cat["id"])))
@@ -36,6 +36,7 @@ import {
   ContentsApi,
   ContentImagesApi,
 } from "../shared/api/admin";
+import { subscribeChanges } from "../shared/api/events";
 
 import type {
   UUID,
@@ -161,6 +162,29 @@ export default function App() {
       .catch(() => {});
   }, [token]);
 
+  // Başka admin/worker'ın yazıları: yalnızca etkilenen listeyi yeniden çek
+  useEffect(() => {
+    if (!token) return;
+    const refreshAll = () => {
+      fetchCats().catch(() => {});
+      if (activeCat) fetchH1s(activeCat.id).catch(() => {});
+      if (activeH1) fetchH2s(activeH1.id).catch(() => {});
+      if (currentHeadingId) fetchContentsByHeading(currentHeadingId).catch(() => {});
+    };
+    return subscribeChanges((ev) => {
+      if (ev.entity === "category") {
+        fetchCats().catch(() => {});
+      } else if (ev.entity === "heading") {
+        if (activeCat && ev.parent_id === activeCat.id) fetchH1s(activeCat.id).catch(() => {});
+        if (activeH1 && ev.parent_id === activeH1.id) fetchH2s(activeH1.id).catch(() => {});
+      } else if (ev.entity === "content") {
+        if (currentHeadingId && ev.parent_id === currentHeadingId)
+          fetchContentsByHeading(currentHeadingId).catch(() => {});
+      }
+    }, refreshAll);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [token, activeCat?.id, activeH1?.id, currentHeadingId]);
+
   // -------- CRUD helpers --------
   // Category
   const [modal, setModal] = useState<{
@@ -6,6 +6,9 @@ import { ContentImagesApi } from "../../shared/api/admin";
 import type { UUID, ContentImage } from "../../shared/types/models";
 import type { ContentImageCreateDTO } from "../../shared/types/dto";
 
+// backend UPLOAD_BATCH_MAX_FILES: tek upload-batch isteğindeki en fazla dosya
+const UPLOAD_BATCH_MAX_FILES = 20;
+
 interface ContentImageManagerProps {
   contentId: UUID;
   onNotification: (
@@ -177,7 +180,9 @@ export default function ContentImageManager({
     width: 200,
     height: 150,
   });
-  const [selectedFile, setSelectedFile] = useState<File | null>(null);
+  const [selectedFiles, setSelectedFiles] = useState<File[]>([]);
+  // Tek dosya: önizleme/boyut ayarı ile tekli upload; birden çok dosya upload-batch ile gider
+  const selectedFile = selectedFiles.length === 1 ? selectedFiles[0] : null;
 
   const fetchImages = async () => {
     try {
@@ -214,14 +219,53 @@ export default function ContentImageManager({
   useEffect(() => {
     setImages([]);
     setNewImage({ url: "", alt: "", sort_order: 0, width: 200, height: 150 });
-    setSelectedFile(null);
+    setSelectedFiles([]);
     fetchImages();
   }, [contentId]);
 
+  const resetForm = () => {
+    setSelectedFiles([]);
+    setNewImage({ url: "", alt: "", sort_order: 0, width: 200, height: 150 });
+    const fileInput = document.getElementById("file-input") as HTMLInputElement;
+    if (fileInput) {
+      fileInput.value = "";
+    }
+  };
+
   const handleAddImage = async (e: React.FormEvent) => {
     e.preventDefault();
 
-    if (selectedFile) {
+    if (selectedFiles.length > 1) {
+      try {
+        setUploading(true);
+        // Dosya başına istek yerine UPLOAD_BATCH_MAX_FILES'lık gruplar; her grup tek transaction,
+        // seçim sırasıyla listenin sonuna eklenir
+        let uploaded = 0;
+        for (let i = 0; i < selectedFiles.length; i += UPLOAD_BATCH_MAX_FILES) {
+          const batch = selectedFiles.slice(i, i + UPLOAD_BATCH_MAX_FILES);
+          const created = await ContentImagesApi.uploadBatch(
+            batch,
+            contentId,
+            batch.map(() => newImage.alt)
+          );
+          uploaded += created.length;
+        }
+        resetForm();
+        await fetchImages();
+        onNotification(`${uploaded} resim başarıyla yüklendi`, "success");
+      } catch (error) {
+        // Önceki gruplar kaydedilmiş olabilir: listeyi tazele
+        await fetchImages();
+        onNotification(
+          `Resimler yüklenirken hata oluştu: ${
+            error instanceof Error ? error.message : "Bilinmeyen hata"
+          }`,
+          "error"
+        );
+      } finally {
+        setUploading(false);
+      }
+    } else if (selectedFile) {
       try {
         setUploading(true);
         console.log("[v0] Starting file upload:", {
@@ -241,22 +285,7 @@ export default function ContentImageManager({
 
         console.log("[v0] Upload successful:", uploadedImage);
 
-        setSelectedFile(null);
-        setNewImage({
-          url: "",
-          alt: "",
-          sort_order: 0,
-          width: 200,
-          height: 150,
-        });
-
-        const fileInput = document.getElementById(
-          "file-input"
-        ) as HTMLInputElement;
-        if (fileInput) {
-          fileInput.value = "";
-        }
-
+        resetForm();
         await fetchImages();
         onNotification("Resim başarıyla yüklendi", "success");
       } catch (error) {
@@ -319,31 +348,33 @@ export default function ContentImageManager({
   };
 
   const handleFileSelect = (e: React.ChangeEvent<HTMLInputElement>) => {
-    const files = e.target.files;
-    if (files && files.length > 0) {
-      const file = files[0];
+    const files = Array.from(e.target.files ?? []);
+    if (files.length === 0) return;
 
+    const accepted = files.filter((file) => {
       if (!file.type.startsWith("image/")) {
-        onNotification("Lütfen sadece resim dosyası seçin", "error");
-        e.target.value = "";
-        return;
+        onNotification(`${file.name}: lütfen sadece resim dosyası seçin`, "error");
+        return false;
       }
-
       if (file.size > 10 * 1024 * 1024) {
-        onNotification("Dosya boyutu 10MB'dan küçük olmalı", "error");
-        e.target.value = "";
-        return;
+        onNotification(`${file.name}: dosya boyutu 10MB'dan küçük olmalı`, "error");
+        return false;
       }
+      return true;
+    });
 
-      console.log("[v0] File selected:", {
-        name: file.name,
-        size: file.size,
-        type: file.type,
-      });
-
-      setSelectedFile(file);
-      setNewImage((prev) => ({ ...prev, url: "" }));
+    if (accepted.length === 0) {
+      e.target.value = "";
+      return;
     }
+
+    console.log(
+      "[v0] Files selected:",
+      accepted.map((file) => ({ name: file.name, size: file.size, type: file.type }))
+    );
+
+    setSelectedFiles(accepted);
+    setNewImage((prev) => ({ ...prev, url: "" }));
   };
 
   const handleImageSizeChange = async (
@@ -390,7 +421,7 @@ export default function ContentImageManager({
               onChange={(e) => {
                 setNewImage((prev) => ({ ...prev, url: e.target.value }));
                 if (e.target.value.trim()) {
-                  setSelectedFile(null);
+                  setSelectedFiles([]);
                 }
               }}
               className="w-full rounded-xl border border-gray-300/60 dark:border-gray-700/60 bg-white/90 dark:bg-gray-800/80 px-4 py-3 text-sm focus:ring-2 focus:ring-blue-500/20 focus:border-blue-500 transition-all duration-200 text-gray-900 dark:text-white"
@@ -403,6 +434,7 @@ export default function ContentImageManager({
               <input
                 type="file"
                 accept="image/*"
+                multiple
                 onChange={handleFileSelect}
                 className="hidden"
                 id="file-input"
@@ -413,9 +445,11 @@ export default function ContentImageManager({
               >
                 📁 Bilgisayardan Seç
               </label>
-              {selectedFile && (
+              {selectedFiles.length > 0 && (
                 <span className="text-sm text-green-600 dark:text-green-400">
-                  {selectedFile.name}
+                  {selectedFile
+                    ? selectedFile.name
+                    : `${selectedFiles.length} dosya seçildi`}
                 </span>
               )}
             </div>
@@ -540,10 +574,14 @@ export default function ContentImageManager({
 
         <button
           type="submit"
-          disabled={(!newImage.url.trim() && !selectedFile) || uploading}
+          disabled={(!newImage.url.trim() && selectedFiles.length === 0) || uploading}
           className="w-full px-4 py-3 rounded-xl bg-gradient-to-r from-blue-600 to-indigo-600 hover:from-blue-700 hover:to-indigo-700 disabled:from-gray-400 disabled:to-gray-500 disabled:cursor-not-allowed text-white font-semibold shadow-lg hover:shadow-xl transition-all duration-200 transform hover:scale-[1.02] disabled:transform-none"
         >
-          {uploading ? "Yükleniyor..." : "Resim Ekle"}
+          {uploading
+            ? "Yükleniyor..."
+            : selectedFiles.length > 1
+            ? `${selectedFiles.length} Resim Ekle`
+            : "Resim Ekle"}
         </button>
       </form>
 
@@ -1,5 +1,5 @@
 // frontend/src/shared/api/admin.ts
-import { http } from "./client";
+import { http, qs } from "./client";
 import type {
   TokenOut,
   AdminUser,
@@ -7,6 +7,7 @@ import type {
   Heading,
   Content,
   ContentImage,
+  Job,
 } from "../types/models";
 
 // --- Auth ---
@@ -91,6 +92,10 @@ export const HeadingsApi = {
   update(id: string, payload: HeadingUpdate) {
     return http.put<Heading>(`/admin/headings/${id}`, payload);
   },
+  // Aynı ebeveynin tüm kardeş başlıkları, yeni sırayla
+  reorder(ids: string[]) {
+    return http.put<Heading[]>("/admin/headings/reorder", { ids });
+  },
   remove(id: string) {
     return http.delete<void>(`/admin/headings/${id}`);
   },
@@ -154,6 +159,13 @@ export const ContentImagesApi = {
   update(id: string, payload: ContentImageUpdate) {
     return http.put<ContentImage>(`/admin/content-images/${id}`, payload);
   },
+  // İçeriğin tüm görselleri, yeni sırayla (tek istekte)
+  reorder(content_id: string, ids: string[]) {
+    return http.put<ContentImage[]>("/admin/content-images/reorder", {
+      content_id,
+      ids,
+    });
+  },
   remove(id: string) {
     return http.delete<void>(`/admin/content-images/${id}`);
   },
@@ -176,4 +188,35 @@ export const ContentImagesApi = {
 
     return http.post<ContentImage>("/admin/content-images/upload", formData);
   },
+  // Tek istek, tek transaction: görseller listenin sonuna seçim sırasıyla eklenir
+  uploadBatch(files: File[], content_id: string, alts?: string[]) {
+    const formData = new FormData();
+    formData.append("content_id", content_id);
+    files.forEach((file, i) => {
+      formData.append("files", file);
+      formData.append("alts", alts?.[i] ?? "");
+    });
+
+    return http.post<ContentImage[]>("/admin/content-images/upload-batch", formData);
+  },
+};
+
+// --- Background jobs ---
+export const JobsApi = {
+  list: (params?: { status?: Job["status"]; kind?: string; limit?: number }) =>
+    http.get<Job[]>(`/admin/jobs${qs(params)}`),
+  get: (id: string) => http.get<Job>(`/admin/jobs/${id}`),
+  create: (kind: "snapshot.build" | "render.refresh", payload: Record<string, unknown> = {}) =>
+    http.post<Job>("/admin/jobs", { kind, payload }),
+  retry: (id: string) => http.post<Job>(`/admin/jobs/${id}/retry`, {}),
+  // done/failed olana kadar (ya da süre dolana kadar) yoklar; son durumu döner
+  async wait(id: string, timeoutMs = 30000, intervalMs = 500): Promise<Job> {
+    const deadline = Date.now() + timeoutMs;
+    let job = await JobsApi.get(id);
+    while ((job.status === "queued" || job.status === "running") && Date.now() < deadline) {
+      await new Promise((r) => setTimeout(r, intervalMs));
+      job = await JobsApi.get(id);
+    }
+    return job;
+  },
 };
@@ -0,0 +1,34 @@
+// frontend/src/shared/api/events.ts
+import { API_BASE } from "./client";
+import type { UUID } from "../types/models";
+
+export interface ChangeEvent {
+  entity: "category" | "heading" | "content" | "content_image";
+  id: UUID;
+  op: "insert" | "update" | "delete";
+  parent_entity?: string | null;
+  parent_id?: UUID | null;
+  revision: number;
+}
+
+/**
+ * /events SSE akışına abone olur. `onReset`: sunucu olay kaçırdığımızı bildirdi
+ * (yavaş istemci / yeniden bağlanma) -> listeleri baştan çek.
+ * Dönen fonksiyon aboneliği kapatır.
+ */
+export function subscribeChanges(
+  onChange: (ev: ChangeEvent) => void,
+  onReset?: () => void
+): () => void {
+  if (typeof EventSource === "undefined") return () => {};
+  const es = new EventSource(`${API_BASE}/events`);
+  es.addEventListener("change", (e) => {
+    try {
+      onChange(JSON.parse((e as MessageEvent).data) as ChangeEvent);
+    } catch {
+      /* ignore bad payload */
+    }
+  });
+  es.addEventListener("reset", () => onReset?.());
+  return () => es.close();
+}
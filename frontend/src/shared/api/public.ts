@@ -7,6 +7,7 @@ import type {
   SearchHit,
   ContentPublic as Content,
   MenuNode,
+  RenderedContent,
 } from "../types/public";
 import type { ContentImage } from "../types/models";
 
@@ -26,4 +27,7 @@ export const PublicApi = {
   contentImages: (contentId: string) => {
     return http.get<ContentImage[]>(`/contents/${contentId}/images`);
   },
+  // Sunucuda render + sanitize edilmiş HTML (görseller yerleştirilmiş)
+  contentHtml: (contentId: string) =>
+    http.get<RenderedContent>(`/contents/${contentId}/html`),
 };
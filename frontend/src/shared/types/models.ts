@@ -41,6 +41,8 @@ export interface ContentImage {
   sort_order: number;
   width?: number | null;
   height?: number | null;
+  placeholder?: string;
+  dominant_color?: string;
   created_at: string;
   updated_at: string;
 }
@@ -55,3 +57,20 @@ export interface TokenOut {
   access_token: string;
   token_type: "bearer";
 }
+
+export type JobStatus = "queued" | "running" | "done" | "failed";
+
+export interface Job {
+  id: UUID;
+  kind: string;
+  status: JobStatus;
+  payload: Record<string, unknown>;
+  attempts: number;
+  max_attempts: number;
+  run_after: string;
+  result?: Record<string, unknown> | null;
+  error?: string | null;
+  created_at: string;
+  updated_at: string;
+  finished_at?: string | null;
+}
@@ -46,3 +46,9 @@ export interface MenuNode {
   sort_order: number;
   children?: MenuNode[];
 }
+
+export interface RenderedContent {
+  content_id: UUID;
+  revision: string;
+  html: string;
+}
@@ -3,6 +3,7 @@
 // frontend/src/public/PublicApp.tsx
 import React, { useEffect, useMemo, useRef, useState } from "react";
 import { PublicApi } from "../shared/api/public";
+import { subscribeChanges } from "../shared/api/events";
 import { cx } from "../shared/utils/cx";
 import { slugify } from "../shared/utils/slug";
 import ContentBody from "./components/ContentBody";
@@ -44,6 +45,7 @@ export default function App() {
   const [contents, setContents] = useState<Content[]>([]); // L1 content list (H2 yoksa)
   const [pageContentId, setPageContentId] = useState<UUID | null>(null);
   const [loading, setLoading] = useState(false);
+  const [liveRev, setLiveRev] = useState(0); // SSE ile gelen içerik değişikliklerinde artar
 
   // search
   const [q, setQ] = useState("");
@@ -129,6 +131,23 @@ export default function App() {
     }
   }
 
+  // -------- live updates (SSE) --------
+  // Açık sayfanın içeriği/görselleri değişince yalnızca o sayfayı tazele
+  useEffect(() => {
+    if (!pageContentId || !activeCat || !activeH1 || !activeH2) return;
+    const refresh = () => {
+      PublicApi.page(activeCat.slug, activeH1.slug, activeH2.slug)
+        .then((p) => {
+          setPage(p);
+          setLiveRev((r) => r + 1);
+        })
+        .catch(() => {});
+    };
+    return subscribeChanges((ev) => {
+      if (ev.id === pageContentId || ev.parent_id === pageContentId) refresh();
+    }, refresh);
+  }, [pageContentId, activeCat?.slug, activeH1?.slug, activeH2?.slug]);
+
   // -------- initial load --------
   useEffect(() => {
     PublicApi.categories()
@@ -576,6 +595,7 @@ export default function App() {
                 </p>
               )}
               <ContentBody
+                key={liveRev}
                 md={page.body}
                 linkClass={palette.link}
                 contentId={pageContentId || undefined}
@@ -22,6 +22,10 @@ export default function ContentBody({
 }) {
   const contentRef = useRef<HTMLDivElement>(null);
   const [processedMarkdown, setProcessedMarkdown] = useState(md);
+  const [html, setHtml] = useState<string | null>(null);
+  // contentId varken sunucu HTML'i ya da yedek markdown gelene kadar iskelet göster
+  // (önce ReactMarkdown çizip sonra HTML'e geçmek sayfayı iki kez boyar)
+  const [loading, setLoading] = useState(Boolean(contentId));
 
   type HProps = React.DetailedHTMLProps<
     React.HTMLAttributes<HTMLHeadingElement>,
@@ -29,28 +33,47 @@ export default function ContentBody({
   >;
 
   useEffect(() => {
+    setHtml(null);
     if (!contentId) {
       setProcessedMarkdown(md);
+      setLoading(false);
       return;
     }
+    setLoading(true);
+    let cancelled = false;
 
-    PublicApi.contentImages(contentId)
-      .then((images) => {
-        let processed = md;
-        images.forEach((image, index) => {
-          const imageMarkdown = `![${image.alt || "Image"}](${image.url}${
-            image.width && image.height ? ` "${image.width}x${image.height}"` : ""
-          })`;
+    // Önce sunucuda render edilmiş HTML; olmazsa eski istemci tarafı yola düş
+    PublicApi.contentHtml(contentId)
+      .then((rendered) => {
+        if (cancelled) return;
+        setHtml(rendered.html);
+        setLoading(false);
+      })
+      .catch(() =>
+        PublicApi.contentImages(contentId)
+          .then((images) => {
+            let processed = md;
+            images.forEach((image) => {
+              const imageMarkdown = `![${image.alt || "Image"}](${image.url}${
+                image.width && image.height ? ` "${image.width}x${image.height}"` : ""
+              })`;
 
-          // İlk bulunan <--image--> placeholder'ını bu resimle değiştir
-          processed = processed.replace("<--image-->", imageMarkdown);
-        });
+              // İlk bulunan <--image--> placeholder'ını bu resimle değiştir
+              processed = processed.replace("<--image-->", imageMarkdown);
+            });
 
-        setProcessedMarkdown(processed);
-      })
-      .catch((error) => {
-        setProcessedMarkdown(md);
-      });
+            return processed;
+          })
+          .catch(() => md)
+          .then((processed) => {
+            if (cancelled) return;
+            setProcessedMarkdown(processed);
+            setLoading(false);
+          })
+      );
+    return () => {
+      cancelled = true;
+    };
   }, [md, contentId]);
 
   // Metin içinde arama terimini vurgula
@@ -129,7 +152,7 @@ export default function ContentBody({
         firstHighlight.classList.remove("animate-pulse");
       }, 2000);
     }
-  }, [highlightText, processedMarkdown]);
+  }, [highlightText, processedMarkdown, html]);
 
   const makeHeading = (Tag: "h1" | "h2" | "h3" | "h4") => (props: HProps) => {
     const text = React.Children.toArray(props.children)
@@ -171,20 +194,42 @@ export default function ContentBody({
       </pre>
     );
 
+  const proseClass = cx(
+    "prose prose-gray dark:prose-invert max-w-none prose-headings:font-semibold",
+    "prose-code:bg-neutral-100 dark:prose-code:bg-neutral-800 prose-code:px-1.5 prose-code:py-0.5 prose-code:rounded",
+    "prose-pre:bg-neutral-50 dark:prose-pre:bg-neutral-900 prose-pre:border prose-pre:border-neutral-200 dark:prose-pre:border-neutral-800",
+    "prose-a:no-underline hover:prose-a:underline",
+    "prose-img:rounded-xl prose-img:shadow-lg prose-img:border prose-img:border-gray-200 dark:prose-img:border-gray-700",
+    "prose-img:max-w-full prose-img:h-auto prose-img:mx-auto prose-img:my-6",
+    `prose-a:${linkClass.split(" ").join(":")}`
+  );
+
+  if (loading) {
+    return (
+      <div ref={contentRef} className="animate-pulse space-y-4" aria-busy="true">
+        <div className="h-6 w-2/3 rounded bg-gray-200 dark:bg-gray-800" />
+        <div className="h-4 w-full rounded bg-gray-200 dark:bg-gray-800" />
+        <div className="h-4 w-11/12 rounded bg-gray-200 dark:bg-gray-800" />
+        <div className="h-4 w-4/5 rounded bg-gray-200 dark:bg-gray-800" />
+      </div>
+    );
+  }
+
+  // Sunucu HTML'i zaten sanitize edilmiş geliyor (app/core/render.py)
+  if (html !== null) {
+    return (
+      <div ref={contentRef}>
+        <div className={proseClass} dangerouslySetInnerHTML={{ __html: html }} />
+      </div>
+    );
+  }
+
   return (
     <div ref={contentRef}>
       <ReactMarkdown
         remarkPlugins={[remarkGfm]}
         rehypePlugins={[rehypeSanitize]}
-        className={cx(
-          "prose prose-gray dark:prose-invert max-w-none prose-headings:font-semibold",
-          "prose-code:bg-neutral-100 dark:prose-code:bg-neutral-800 prose-code:px-1.5 prose-code:py-0.5 prose-code:rounded",
-          "prose-pre:bg-neutral-50 dark:prose-pre:bg-neutral-900 prose-pre:border prose-pre:border-neutral-200 dark:prose-pre:border-neutral-800",
-          "prose-a:no-underline hover:prose-a:underline",
-          "prose-img:rounded-xl prose-img:shadow-lg prose-img:border prose-img:border-gray-200 dark:prose-img:border-gray-700",
-          "prose-img:max-w-full prose-img:h-auto prose-img:mx-auto prose-img:my-6",
-          `prose-a:${linkClass.split(" ").join(":")}`
-        )}
+        className={proseClass}
         components={{
           h1: makeHeading("h1"),
           h2: makeHeading("h2"),